@@ -57,21 +57,12 @@ def run_notepad():
 
     start = time.time()
 
-    run_with_appdata = False
-    if len(sys.argv) > 1 and sys.argv[1].lower() == 'language':
-        run_with_appdata = True
-
     scriptdir = os.path.split(os.path.abspath(__file__))[0]
-    if run_with_appdata:
-        print("\nRunning this script so it will load application data and run")
-        print("against any lanuguage version of Notepad/Windows")
+    hints_file = os.path.join(scriptdir, "Notepad_fast.hints")
 
-        # make sure that the app data gets read from the same folder as 
-        # the script
-        app = application.Application(
-            os.path.join(scriptdir, "Notepad_fast.pkl"))
-    else:
-        app = application.Application()
+    # the resolution hints recorded by the previous run let
+    # the dialogs and controls be found without fuzzy matching
+    app = application.Application(datafilename = hints_file)
 
     ## for distribution we don't want to connect to anybodies application
     ## because we may mess up something they are working on!
@@ -260,8 +251,8 @@ def run_notepad():
     # exit notepad
     app.Notepad.menu_select("File->Exit")
 
-    if not run_with_appdata:
-        app.WriteAppData(os.path.join(scriptdir, "Notepad_fast.pkl"))
+    app.WriteAppData(hints_file)
+    print("Resolution hints hit rate: %.0f%%"% (app.hints.hit_rate * 100))
 
 
 
@@ -32,6 +32,7 @@ import win32process
 from . import win32functions
 from . import win32defines
 from . import win32structures
+from . import processhandles
 from .actionlogger import ActionLogger
 
 class AccessDenied(RuntimeError):
@@ -41,12 +42,18 @@ class AccessDenied(RuntimeError):
 #====================================================================
 class RemoteMemoryBlock(object):
     "Class that enables reading and writing memory in a different process"
+
+    _access = win32defines.PROCESS_VM_OPERATION | \
+        win32defines.PROCESS_VM_READ | \
+        win32defines.PROCESS_VM_WRITE
+
     #----------------------------------------------------------------
     def __init__(self, ctrl, size = 4096): #4096): #16384):
         "Allocate the memory"
         self.memAddress = 0
         self.size = size
         self.process = 0
+        self.process_id = 0
         self.handle = ctrl.handle
         
         if self.handle == 0xffffffff80000000:
@@ -59,13 +66,9 @@ class RemoteMemoryBlock(object):
             raise AccessDenied(
                 str(ctypes.WinError()) + " Cannot get process ID from handle.")
 
-        self.process = win32functions.OpenProcess(
-                win32defines.PROCESS_VM_OPERATION |
-                win32defines.PROCESS_VM_READ |
-                win32defines.PROCESS_VM_WRITE,
-                0,
-                process_id
-                )
+        # the process handle is reused from the cache
+        self.process = processhandles.cache.acquire(process_id, self._access)
+        self.process_id = process_id
 
         if not self.process:
             raise AccessDenied(
@@ -109,13 +112,10 @@ class RemoteMemoryBlock(object):
 
     #----------------------------------------------------------------
     def _CloseHandle(self):
-        "Close the handle to the process."
-        ret = win32functions.CloseHandle(self.process)
-        #win32api.CloseHandle(self.process)
-
-        if ret == 0:
-            ActionLogger().log('Warning: cannot close process handle!')
-            #raise ctypes.WinError()
+        "Release the handle to the process (it's closed by the cache)"
+        if self.process:
+            processhandles.cache.release(self.process_id, self._access)
+            self.process = 0
 
     #----------------------------------------------------------------
     def CleanUp(self):
@@ -138,9 +138,8 @@ class RemoteMemoryBlock(object):
                 #self._CloseHandle()
                 raise ctypes.WinError()
             self.memAddress = 0
-            #self._CloseHandle()
-        else:
-            pass #ActionLogger().log('\nWARNING: Cannot call VirtualFreeEx! process_id == 0.')
+
+        self._CloseHandle()
 
 
     #----------------------------------------------------------------
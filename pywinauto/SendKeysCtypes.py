@@ -35,7 +35,12 @@ import ctypes
 import win32api
 
 from . import six
+from . import keyparser
+from . import win32functions
 from . import win32structures
+from .timings import Timings, PacingController
+from .keyparser import KeySequenceError, CODES, CODE_NAMES, MODIFIERS
+from .keyparser import VK_SHIFT, VK_CONTROL, VK_MENU
 
 __all__ = ['KeySequenceError', 'SendKeys']
 
@@ -54,192 +59,77 @@ VkKeyScan = ctypes.windll.user32.VkKeyScanW
 VkKeyScan.restype = ctypes.c_short
 VkKeyScan.argtypes = [ctypes.c_wchar]
 
+GetForegroundWindow = ctypes.windll.user32.GetForegroundWindow
+
+
+# the maximum number of INPUT structures sent by one SendInput call in the burst mode
+BURST_CHUNK_SIZE = 1000
 
 INPUT_KEYBOARD = 1
 KEYEVENTF_EXTENDEDKEY = 1
 KEYEVENTF_KEYUP       = 2
 KEYEVENTF_UNICODE     = 4
 KEYEVENTF_SCANCODE    = 8
-VK_SHIFT        = 16
-VK_CONTROL      = 17
-VK_MENU         = 18
-
-# 'codes' recognized as {CODE( repeat)?}
-CODES = {
-    'BACK':     8,
-    'BACKSPACE':8,
-    'BKSP':     8,
-    'BREAK':    3,
-    'BS':       8,
-    'CAP':      20,
-    'CAPSLOCK': 20,
-    'DEL':      46,
-    'DELETE':   46,
-    'DOWN':     40,
-    'END':      35,
-    'ENTER':    13,
-    'ESC':      27,
-    'F1':       112,
-    'F2':       113,
-    'F3':       114,
-    'F4':       115,
-    'F5':       116,
-    'F6':       117,
-    'F7':       118,
-    'F8':       119,
-    'F9':       120,
-    'F10':      121,
-    'F11':      122,
-    'F12':      123,
-    'F13':      124,
-    'F14':      125,
-    'F15':      126,
-    'F16':      127,
-    'F17':      128,
-    'F18':      129,
-    'F19':      130,
-    'F20':      131,
-    'F21':      132,
-    'F22':      133,
-    'F23':      134,
-    'F24':      135,
-    'HELP':     47,
-    'HOME':     36,
-    'INS':      45,
-    'INSERT':   45,
-    'LEFT':     37,
-    'LWIN':     91,
-    'NUMLOCK':  144,
-    'PGDN':     34,
-    'PGUP':     33,
-    'PRTSC':    44,
-    'RIGHT':    39,
-    'RMENU':    165,
-    'RWIN':     92,
-    'SCROLLLOCK':145,
-    'SPACE':     32,
-    'TAB':       9,
-    'UP':        38,
-
-    'VK_ACCEPT': 30,
-    'VK_ADD':    107,
-    'VK_APPS':    93,
-    'VK_ATTN':    246,
-    'VK_BACK':    8,
-    'VK_CANCEL':  3,
-    'VK_CAPITAL': 20,
-    'VK_CLEAR':   12,
-    'VK_CONTROL': 17,
-    'VK_CONVERT': 28,
-    'VK_CRSEL':   247,
-    'VK_DECIMAL': 110,
-    'VK_DELETE':  46,
-    'VK_DIVIDE':  111,
-    'VK_DOWN':    40,
-    'VK_END':     35,
-    'VK_EREOF':   249,
-    'VK_ESCAPE':  27,
-    'VK_EXECUTE': 43,
-    'VK_EXSEL':   248,
-    'VK_F1':      112,
-    'VK_F2':      113,
-    'VK_F3':      114,
-    'VK_F4':      115,
-    'VK_F5':      116,
-    'VK_F6':      117,
-    'VK_F7':      118,
-    'VK_F8':      119,
-    'VK_F9':      120,
-    'VK_F10':     121,
-    'VK_F11':     122,
-    'VK_F12':     123,
-    'VK_F13':     124,
-    'VK_F14':     125,
-    'VK_F15':     126,
-    'VK_F16':     127,
-    'VK_F17':     128,
-    'VK_F18':     129,
-    'VK_F19':     130,
-    'VK_F20':     131,
-    'VK_F21':     132,
-    'VK_F22':     133,
-    'VK_F23':     134,
-    'VK_F24':     135,
-    'VK_FINAL':   24,
-    'VK_HANGEUL':  21,
-    'VK_HANGUL':   21,
-    'VK_HANJA':    25,
-    'VK_HELP':     47,
-    'VK_HOME':     36,
-    'VK_INSERT':   45,
-    'VK_JUNJA':    23,
-    'VK_KANA':     21,
-    'VK_KANJI':    25,
-    'VK_LBUTTON':   1,
-    'VK_LCONTROL':162,
-    'VK_LEFT':     37,
-    'VK_LMENU':   164,
-    'VK_LSHIFT':  160,
-    'VK_LWIN':     91,
-    'VK_MBUTTON':    4,
-    'VK_MENU':        18,
-    'VK_MODECHANGE':  31,
-    'VK_MULTIPLY':   106,
-    'VK_NEXT':        34,
-    'VK_NONAME':     252,
-    'VK_NONCONVERT':  29,
-    'VK_NUMLOCK':    144,
-    'VK_NUMPAD0':     96,
-    'VK_NUMPAD1':     97,
-    'VK_NUMPAD2':     98,
-    'VK_NUMPAD3':     99,
-    'VK_NUMPAD4':    100,
-    'VK_NUMPAD5':    101,
-    'VK_NUMPAD6':    102,
-    'VK_NUMPAD7':    103,
-    'VK_NUMPAD8':    104,
-    'VK_NUMPAD9':    105,
-    'VK_OEM_CLEAR':  254,
-    'VK_PA1':        253,
-    'VK_PAUSE':       19,
-    'VK_PLAY':       250,
-    'VK_PRINT':       42,
-    'VK_PRIOR':       33,
-    'VK_PROCESSKEY': 229,
-    'VK_RBUTTON':      2,
-    'VK_RCONTROL':   163,
-    'VK_RETURN':      13,
-    'VK_RIGHT':       39,
-    'VK_RMENU':      165,
-    'VK_RSHIFT':     161,
-    'VK_RWIN':        92,
-    'VK_SCROLL':     145,
-    'VK_SELECT':      41,
-    'VK_SEPARATOR':  108,
-    'VK_SHIFT':       16,
-    'VK_SNAPSHOT':    44,
-    'VK_SPACE':       32,
-    'VK_SUBTRACT':   109,
-    'VK_TAB':          9,
-    'VK_UP':          38,
-    'ZOOM':          251,
-}
-# reverse the CODES dict to make it easy to look up a particular code name
-CODE_NAMES = dict((entry[1], entry[0]) for entry in CODES.items())
-
-# modifier keys
-MODIFIERS = {
-    '+': VK_SHIFT,
-    '^': VK_CONTROL,
-    '%': VK_MENU,
-}
-
-
-class KeySequenceError(Exception):
-    """Exception raised when a key sequence string has a syntax error"""
 
-    def __str__(self):
-        return ' '.join(self.args)
+def key_info(kind, code):
+    """Return virtual_key, scan_code, and flags for a key of a KeyProgram"""
+    if kind == keyparser.KEY_VIRTUAL:
+        # copied more or less verbatim from
+        # http://www.pinvoke.net/default.aspx/user32.sendinput
+        if 33 <= code <= 46 or 91 <= code <= 93:
+            flags = KEYEVENTF_EXTENDEDKEY
+        else:
+            flags = 0
+        # This works for %{F4} - ALT + F4
+        #return code, 0, 0
+
+        # this works for Tic Tac Toe i.e. +{RIGHT} SHIFT + RIGHT
+        return code, MapVirtualKey(code, 0), flags
+
+    if kind == keyparser.KEY_ESCAPED:
+        # escaped keys are not sent as Unicode and the vk and
+        # scan code are generated differently
+        vkey_scan = LoByte(VkKeyScan(six.unichr(code)))
+        return vkey_scan, MapVirtualKey(vkey_scan, 0), 0
+
+    return 0, code, KEYEVENTF_UNICODE
+
+
+def build_inputs(vk, scan, flags, down = True, up = True):
+    "Build the INPUT structures for a press and/or release of the key"
+    actions = 1
+    # if both up and down
+    if up and down:
+        actions = 2
+
+    inputs = (win32structures.INPUT * actions)()
+
+    for inp in inputs:
+        inp.type = INPUT_KEYBOARD
+
+        inp.ki.wVk = vk
+        inp.ki.wScan = scan
+        inp.ki.dwFlags |= flags
+
+        # it seems to return 0 every time but it's required by MSDN specification
+        # so call it just in case
+        inp.ki.dwExtraInfo = GetMessageExtraInfo()
+
+    # if we are releasing - then let it up
+    if up:
+        inputs[-1].ki.dwFlags |= KEYEVENTF_KEYUP
+
+    return inputs
+
+
+def send_inputs(inputs):
+    "Send the INPUT array by one SendInput call"
+    # SendInput() supports all Unicode symbols
+    num_inserted_events = SendInput(len(inputs), ctypes.byref(inputs),
+                                    ctypes.sizeof(win32structures.INPUT))
+    if num_inserted_events != len(inputs):
+        raise RuntimeError('SendInput() inserted only ' + str(num_inserted_events) +
+                           ' out of ' + str(len(inputs)) + ' keyboard events')
 
 
 class KeyAction(object):
@@ -260,47 +150,16 @@ class KeyAction(object):
         """Return virtual_key, scan_code, and flags for the action
         
         This is one of the methods that will be overridden by sub classes"""
-        #print(self.key)
-        return 0, ord(self.key), KEYEVENTF_UNICODE
+        return key_info(keyparser.KEY_UNICODE, ord(self.key))
 
     def GetInput(self):
         "Build the INPUT structure for the action"
-        actions = 1
-        # if both up and down
-        if self.up and self.down:
-            actions = 2
-
-        inputs = (win32structures.INPUT * actions)()
-
         vk, scan, flags = self._get_key_info()
-
-        for inp in inputs:
-            inp.type = INPUT_KEYBOARD
-
-            inp.ki.wVk = vk
-            inp.ki.wScan = scan
-            inp.ki.dwFlags |= flags
-            
-            # it seems to return 0 every time but it's required by MSDN specification
-            # so call it just in case
-            inp.ki.dwExtraInfo = GetMessageExtraInfo()
-
-        # if we are releasing - then let it up
-        if self.up:
-            inputs[-1].ki.dwFlags |= KEYEVENTF_KEYUP
-
-        return inputs
+        return build_inputs(vk, scan, flags, self.down, self.up)
 
     def Run(self):
         "Execute the action"
-        inputs = self.GetInput()
-
-        # SendInput() supports all Unicode symbols
-        num_inserted_events = SendInput(len(inputs), ctypes.byref(inputs),
-                                        ctypes.sizeof(win32structures.INPUT))
-        if num_inserted_events != len(inputs):
-            raise RuntimeError('SendInput() inserted only ' + str(num_inserted_events) +
-                               ' out of ' + str(len(inputs)) + ' keyboard events')
+        send_inputs(self.GetInput())
 
     def _get_down_up_string(self):
         """Return a string that will show whether the string is up or down
@@ -349,18 +208,7 @@ class VirtualKeyAction(KeyAction):
 
     def _get_key_info(self):
         "Virtual keys have extended flag set"
-
-        # copied more or less verbatim from 
-        # http://www.pinvoke.net/default.aspx/user32.sendinput
-        if 33 <= self.key <= 46 or 91 <= self.key <= 93:
-            flags = KEYEVENTF_EXTENDEDKEY
-        else:
-            flags = 0
-        # This works for %{F4} - ALT + F4
-        #return self.key, 0, 0
-
-        # this works for Tic Tac Toe i.e. +{RIGHT} SHIFT + RIGHT
-        return self.key, MapVirtualKey(self.key, 0), flags
+        return key_info(keyparser.KEY_VIRTUAL, self.key)
 
     def Run(self):
         "Execute the action"
@@ -378,9 +226,7 @@ class EscapedKeyAction(KeyAction):
     def _get_key_info(self):
         """EscapedKeyAction doesn't send it as Unicode and the vk and 
         scan code are generated differently"""
-        vkey_scan = LoByte(VkKeyScan(self.key))
-
-        return (vkey_scan, MapVirtualKey(vkey_scan, 0), 0)
+        return key_info(keyparser.KEY_ESCAPED, ord(self.key))
 
     def key_description(self):
         "Return a description of the key"
@@ -410,52 +256,23 @@ class PauseAction(KeyAction):
     __repr__ = __str__
 
 
-def handle_code(code):
-    "Handle a key or sequence of keys in braces"
+def key_action(kind, code, state):
+    "Return the action object for a (kind, code, state) key of a KeyProgram"
+    if kind == keyparser.KEY_PAUSE:
+        return PauseAction(code)
 
-    code_keys = []
-    # it is a known code (e.g. {DOWN}, {ENTER}, etc)
-    if code in CODES:
-        code_keys.append(VirtualKeyAction(CODES[code]))
-
-    # it is an escaped modifier e.g. {%}, {^}, {+}
-    elif len(code) == 1:
-        code_keys.append(KeyAction(code))
-
-    # it is a repetition or a pause  {DOWN 5}, {PAUSE 1.3}
-    elif ' ' in code:
-        to_repeat, count = code.rsplit(None, 1)
-        if to_repeat == "PAUSE":
-            try:
-                pause_time = float(count)
-            except ValueError:
-                raise KeySequenceError('invalid pause time %s'% count)
-            code_keys.append(PauseAction(pause_time))
+    down = bool(state & keyparser.KEY_DOWN)
+    up = bool(state & keyparser.KEY_UP)
+    if kind == keyparser.KEY_VIRTUAL:
+        return VirtualKeyAction(code, down = down, up = up)
+    if kind == keyparser.KEY_ESCAPED:
+        return EscapedKeyAction(six.unichr(code), down = down, up = up)
+    return KeyAction(six.unichr(code), down = down, up = up)
 
-        else:
-            try:
-                count = int(count)
-            except ValueError:
-                raise KeySequenceError(
-                    'invalid repetition count %s'% count)
-
-            # If the value in to_repeat is a VK e.g. DOWN
-            # we need to add the code repeated
-            if to_repeat in CODES:
-                code_keys.extend(
-                    [VirtualKeyAction(CODES[to_repeat])] * count)
-            # otherwise parse the keys and we get back a KeyAction
-            else:
-                to_repeat = parse_keys(to_repeat)
-                if isinstance(to_repeat, list):
-                    keys = to_repeat * count
-                else:
-                    keys = [to_repeat] * count
-                code_keys.extend(keys)
-    else:
-        raise RuntimeError("Unknown code: %s"% code)
 
-    return code_keys
+def handle_code(code):
+    "Handle a key or sequence of keys in braces"
+    return [key_action(*key) for key in keyparser.expand(keyparser.parse_code(code))]
 
 
 def parse_keys(string,
@@ -464,110 +281,180 @@ def parse_keys(string,
                 with_newlines = False,
                 modifiers = None):
     "Return the parsed keys"
+    keys = keyparser.parse(string, with_spaces, with_tabs, with_newlines, modifiers)
+    return [key_action(*key) for key in keyparser.expand(keys)]
 
-    keys = []
-    if not modifiers:
-        modifiers = []
-    index = 0
-    while index < len(string):
-
-        c = string[index]
-        index += 1
-        # check if one of CTRL, SHIFT, ALT has been pressed
-        if c in MODIFIERS.keys():
-            modifier = MODIFIERS[c]
-            # remember that we are currently modified
-            modifiers.append(modifier)
-            # hold down the modifier key
-            keys.append(VirtualKeyAction(modifier, up = False))
-            if DEBUG:
-                print("MODS+", modifiers)
+def LoByte(val):
+    "Return the low byte of the value"
+    return val & 0xff
+
+def HiByte(val):
+    "Return the high byte of the value"
+    return (val & 0xff00) >> 8
+
+def _program_inputs(program):
+    """Iterate the (kind, INPUT array) pairs of the expanded keys of the program
+
+    The INPUT arrays of the repeated keys are built once.
+    """
+    built = {}
+    for key in program:
+        kind, code, state = key
+        if kind == keyparser.KEY_PAUSE:
+            yield kind, code
             continue
 
-        # Apply modifiers over a bunch of characters (not just one!)
-        elif c == "(":
-            # find the end of the bracketed text
-            end_pos = string.find(")", index)
-            if end_pos == -1:
-                raise KeySequenceError('`)` not found')
-            keys.extend(
-                parse_keys(string[index:end_pos], modifiers = modifiers))
-            index = end_pos + 1
-
-        # Escape or named key
-        elif c == "{":
-            # We start searching from index + 1 to account for the case {}}
-            end_pos = string.find("}", index+1)
-            if end_pos == -1:
-                raise KeySequenceError('`}` not found')
-
-            code = string[index:end_pos]
-            index = end_pos + 1
-            keys.extend(handle_code(code))
-
-        # unmatched ")"
-        elif c == ')':
-            raise KeySequenceError('`)` should be preceeded by `(`')
-
-        # unmatched "}"
-        elif c == '}':
-            raise KeySequenceError('`}` should be preceeded by `{`')
-
-        # so it is a normal character
+        inputs = built.get(key)
+        if inputs is None:
+            vk, scan, flags = key_info(kind, code)
+            inputs = build_inputs(vk, scan, flags,
+                                  state & keyparser.KEY_DOWN, state & keyparser.KEY_UP)
+            built[key] = inputs
+        yield kind, inputs
+
+def iter_burst(program, chunk_size = BURST_CHUNK_SIZE):
+    """Iterate the contiguous INPUT arrays of the KeyProgram
+
+    Yield INPUT arrays (of chunk_size inputs at most) and PauseAction
+    objects. Only the pauses split the inputs. The repetitions are
+    expanded chunk by chunk, so a long repetition is never kept in memory.
+    """
+    inputs = []
+    for kind, item in _program_inputs(program):
+        if kind == keyparser.KEY_PAUSE:
+            if inputs:
+                yield (win32structures.INPUT * len(inputs))(*inputs)
+                inputs = []
+            yield PauseAction(item)
+            continue
+
+        inputs.extend(item)
+        while len(inputs) >= chunk_size:
+            chunk, inputs = inputs[:chunk_size], inputs[chunk_size:]
+            yield (win32structures.INPUT * chunk_size)(*chunk)
+
+    if inputs:
+        yield (win32structures.INPUT * len(inputs))(*inputs)
+
+def compile_burst(program, chunk_size = BURST_CHUNK_SIZE):
+    """Compile the KeyProgram into contiguous INPUT arrays
+
+    Return the list of the items of iter_burst().
+    """
+    return list(iter_burst(program, chunk_size))
+
+def send_burst(compiled):
+    "Send the arrays of compile_burst() or iter_burst() with one SendInput call per array"
+    for item in compiled:
+        if isinstance(item, PauseAction):
+            item.Run()
         else:
-            # don't output white space unless flags to output have been set
-            if (c == ' ' and not with_spaces or \
-                    c == '\t' and not with_tabs or \
-                    c == '\n' and not with_newlines):
-                continue
-            
-            # output newline
-            if c in ('~', '\n'):
-                keys.append(VirtualKeyAction(CODES["ENTER"]))
-
-            # safest are the virtual keys - so if our key is a virtual key
-            # use a VirtualKeyAction
-            #if ord(c) in CODE_NAMES:
-            #    keys.append(VirtualKeyAction(ord(c)))
-                
-            elif modifiers:
-                keys.append(EscapedKeyAction(c))
-                
-            else:
-                keys.append(KeyAction(c))
+            send_inputs(item)
+
+def send_key_inputs(kind, inputs):
+    "Send the INPUT array of one key of the given kind"
+    if kind == keyparser.KEY_UNICODE:
+        send_inputs(inputs)
+    else:
+        # it works more stable for virtual keys than SendInput
+        for inp in inputs:
+            win32api.keybd_event(inp.ki.wVk, inp.ki.wScan, inp.ki.dwFlags)
 
-        # as we have handled the text - release the modifiers
-        while modifiers:
-            if DEBUG:
-                print("MODS-", modifiers)
-            keys.append(VirtualKeyAction(modifiers.pop(), down = False))
+def run_program(program, pause = 0.05):
+    "Type the keys of the KeyProgram one by one"
+    for kind, item in _program_inputs(program):
+        if kind == keyparser.KEY_PAUSE:
+            time.sleep(item)
+        else:
+            send_key_inputs(kind, item)
+        time.sleep(pause)
 
-    # just in case there were any modifiers left pressed - release them
-    while modifiers:
-        keys.append(VirtualKeyAction(modifiers.pop(), down = False))
+def wait_window_idle(handle):
+    """Wait for the GUI thread of the window to become idle
 
-    return keys
+    Return the time it took (None if it didn't become idle
+    within ``Timings.pacing_idle_timeout``).
+    """
+    start = time.time()
+    if not win32functions.WaitGuiThreadIdle(handle, Timings.pacing_idle_timeout):
+        return None
+    return time.time() - start
 
-def LoByte(val):
-    "Return the low byte of the value"
-    return val & 0xff
+def wait_foreground_idle():
+    """Wait for the GUI thread of the foreground window to become idle
 
-def HiByte(val):
-    "Return the high byte of the value"
-    return (val & 0xff00) >> 8
+    It's used when the target window is not known (see wait_window_idle()).
+    """
+    return wait_window_idle(GetForegroundWindow())
+
+def send_paced(program, wait_idle = wait_foreground_idle, pacer = None):
+    """Send the keys of the KeyProgram in bursts paced by the target
+
+    **wait_idle** is called after each burst, it waits for the target
+    to become idle and returns the time it took (None if it didn't).
+    The burst sizes are adapted by **pacer** (a new PacingController
+    by default). Return the pacer.
+    """
+    if pacer is None:
+        pacer = PacingController(maximum = BURST_CHUNK_SIZE // 2)
+
+    burst = []
+
+    def flush():
+        "Send the burst and adapt the size of the next one"
+        if not burst:
+            return
+        inputs = [inp for item in burst for inp in item]
+        send_inputs((win32structures.INPUT * len(inputs))(*inputs))
+        pacer.update(wait_idle())
+        del burst[:]
+
+    for kind, item in _program_inputs(program):
+        if kind == keyparser.KEY_PAUSE:
+            flush()
+            time.sleep(item)
+        else:
+            burst.append(item)
+            if len(burst) >= pacer.burst_size:
+                flush()
+    flush()
+    return pacer
+
+def send_program(program, pause = 0.05, burst = False, paced = False,
+                 wait_idle = wait_foreground_idle):
+    "Type the keys of the KeyProgram (see SendKeys() for the modes)"
+    if paced:
+        send_paced(program, wait_idle)
+    elif burst:
+        send_burst(iter_burst(program))
+    else:
+        run_program(program, pause)
 
 def SendKeys(keys,
              pause=0.05,
              with_spaces=False,
              with_tabs=False,
              with_newlines=False,
-             turn_off_numlock=True):
-    "Parse the keys and type them"
-    keys = parse_keys(keys, with_spaces, with_tabs, with_newlines)
-
-    for k in keys:
-        k.Run()
-        time.sleep(pause)
+             turn_off_numlock=True,
+             burst=False,
+             paced=False,
+             wait_idle=wait_foreground_idle):
+    """Parse the keys and type them
+
+    The keys are compiled into a KeyProgram once, the programs of the
+    recently typed strings are taken from ``keyparser.program_cache``.
+
+    In the burst mode the keys are sent in large chunks with no pause
+    between them (only the explicit {PAUSE n} actions are waited for).
+
+    In the paced mode the keys are sent in bursts and the target is
+    waited for to become idle after each burst by **wait_idle** (the
+    foreground window by default, see send_paced()). The bursts grow while
+    the target keeps up and shrink when it's busy (see
+    ``timings.PacingController``), the **pause** is not used.
+    """
+    program = keyparser.compile_keys(keys, with_spaces, with_tabs, with_newlines)
+    send_program(program, pause, burst, paced, wait_idle)
 
 
 def main(): #pragma: no cover
@@ -27,16 +27,23 @@ Python package for automating GUI manipulation on Windows
 
 __version__ = "0.5.4"
 
-from . import findwindows
-WindowAmbiguousError = findwindows.WindowAmbiguousError
-ElementNotFoundError = findwindows.ElementNotFoundError
+import sys
 
-from .sysinfo import UIA_support
-if UIA_support:
+# The Win32 parts are imported on Windows only. The modules which don't
+# need the Win32 API (e.g. keyparser, timings, actionstream and the Xlib
+# back-end of mouse) import the package too, so they can be used and
+# tested on the other platforms.
+if sys.platform == 'win32':
+    from . import findwindows
+    WindowAmbiguousError = findwindows.WindowAmbiguousError
     ElementNotFoundError = findwindows.ElementNotFoundError
-    ElementAmbiguousError = findwindows.ElementAmbiguousError
 
-from . import findbestmatch
-MatchError = findbestmatch.MatchError
+    from .sysinfo import UIA_support
+    if UIA_support:
+        ElementNotFoundError = findwindows.ElementNotFoundError
+        ElementAmbiguousError = findwindows.ElementAmbiguousError
 
-from .application import Application, WindowSpecification
+    from . import findbestmatch
+    MatchError = findbestmatch.MatchError
+
+    from .application import Application, WindowSpecification
@@ -0,0 +1,316 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"""Compact binary streams of recorded key and mouse actions
+
+A recorded session can be long (e.g. a whole day of typing), keeping it
+as a list of KeyAction objects or as a text of keys to parse again costs
+memory and time. The stream is a versioned header followed by fixed size
+little endian records, so the file can be memory mapped and replayed
+straight from the mapped buffer (no object is built per action)::
+
+    writer = ActionStreamWriter()
+    writer.add_keys('{VK_LWIN}notepad{ENTER}')
+    writer.add_pause(2)
+    writer.add_mouse('left', (100, 200))
+    writer.add_keys('{a 100000}')  # one record, not 100000
+    writer.save('session.actions')
+
+    with open_stream('session.actions') as stream:
+        stream.replay(pause=0)
+
+The header is the magic ``PWAS``, the format version, the size of a
+record and the number of the records. The repetitions of a KeyProgram are
+kept as a record with a count, a repeated group of keys is a group record
+prefixed by the number of its records.
+"""
+from __future__ import unicode_literals
+
+import mmap
+import time
+import struct
+import itertools
+
+from . import six
+from . import keyparser
+
+
+STREAM_MAGIC = b'PWAS'
+STREAM_FORMAT_VERSION = 1
+
+# magic, version, record size, number of the records
+HEADER = struct.Struct('<4sHHI')
+# type, flags, kind or button, code or x, count or y, seconds or wheel distance
+RECORD = struct.Struct('<BBHiid')
+
+ACTION_KEY = 1      # flags: state, kind, code, count
+ACTION_PAUSE = 2    # count, seconds
+ACTION_MOUSE = 3    # flags: MOUSE_*, button index, x, y, wheel distance
+ACTION_GROUP = 4    # number of the records of the group, count
+
+MOUSE_DOWN = 1
+MOUSE_UP = 2
+MOUSE_DOUBLE = 4
+
+MOUSE_BUTTONS = ('left', 'right', 'middle', 'move', 'wheel', 'x')
+
+
+#=========================================================================
+class ActionStreamWriter(object):
+    """Build a binary stream of key, pause and mouse actions"""
+
+    def __init__(self):
+        """Initialize an empty stream"""
+        self._records = []
+
+    def __len__(self):
+        "Return the number of the records"
+        return len(self._records)
+
+    def add_keys(self,
+                 keys,
+                 with_spaces = False,
+                 with_tabs = False,
+                 with_newlines = False):
+        """Add the keys (a string of keys or a KeyProgram)"""
+        if isinstance(keys, six.string_types):
+            keys = keyparser.compile_keys(keys, with_spaces, with_tabs, with_newlines)
+        self._records.extend(self._program_records(keys))
+
+    def _program_records(self, program):
+        "Return the packed records of the nodes of the KeyProgram"
+        records = []
+        for kind, code, state, count in program.nodes():
+            if kind == keyparser.KEY_GROUP:
+                group = self._program_records(code)
+                records.append(RECORD.pack(ACTION_GROUP, 0, 0, len(group), count, 0.))
+                records.extend(group)
+            elif kind == keyparser.KEY_PAUSE:
+                records.append(RECORD.pack(ACTION_PAUSE, 0, 0, 0, count, code))
+            else:
+                records.append(RECORD.pack(ACTION_KEY, state, kind, code, count, 0.))
+        return records
+
+    def add_key_actions(self, actions):
+        """Add the KeyAction objects (e.g. returned by SendKeysCtypes.parse_keys)"""
+        from . import SendKeysCtypes
+
+        for action in actions:
+            if isinstance(action, SendKeysCtypes.PauseAction):
+                self.add_pause(action.how_long)
+                continue
+
+            if isinstance(action, SendKeysCtypes.VirtualKeyAction):
+                kind, code = keyparser.KEY_VIRTUAL, action.key
+            elif isinstance(action, SendKeysCtypes.EscapedKeyAction):
+                kind, code = keyparser.KEY_ESCAPED, ord(action.key)
+            else:
+                kind, code = keyparser.KEY_UNICODE, ord(action.key)
+            state = (action.down and keyparser.KEY_DOWN) | (action.up and keyparser.KEY_UP)
+            self._records.append(RECORD.pack(ACTION_KEY, state, kind, code, 1, 0.))
+
+    def add_pause(self, seconds):
+        "Add a pause"
+        self._records.append(RECORD.pack(ACTION_PAUSE, 0, 0, 0, 1, seconds))
+
+    def add_mouse(self,
+                  button = 'left',
+                  coords = (0, 0),
+                  double = False,
+                  button_down = True,
+                  button_up = True,
+                  wheel_dist = 0):
+        """Add a mouse action (the arguments of mouse._perform_click_input)"""
+        if button not in MOUSE_BUTTONS:
+            raise ValueError('Unknown mouse button: "{0}"'.format(button))
+        flags = ((button_down and MOUSE_DOWN) | (button_up and MOUSE_UP) |
+                 (double and MOUSE_DOUBLE))
+        self._records.append(RECORD.pack(ACTION_MOUSE, flags, MOUSE_BUTTONS.index(button),
+                                         int(coords[0]), int(coords[1]), wheel_dist))
+
+    def to_bytes(self):
+        "Return the stream"
+        header = HEADER.pack(STREAM_MAGIC, STREAM_FORMAT_VERSION, RECORD.size,
+                             len(self._records))
+        return header + b''.join(self._records)
+
+    def save(self, filename):
+        "Save the stream to a file"
+        with open(filename, 'wb') as stream_file:
+            stream_file.write(self.to_bytes())
+
+
+#=========================================================================
+def _key_sender():
+    """Return a function sending a (kind, code, state) key by SendInput
+
+    The INPUT arrays of the keys are built once per replay.
+    """
+    from . import SendKeysCtypes
+
+    built = {}
+
+    def send_key(kind, code, state):
+        "Send the key"
+        key = (kind, code, state)
+        inputs = built.get(key)
+        if inputs is None:
+            vk, scan, flags = SendKeysCtypes.key_info(kind, code)
+            inputs = SendKeysCtypes.build_inputs(vk, scan, flags,
+                                                 state & keyparser.KEY_DOWN,
+                                                 state & keyparser.KEY_UP)
+            built[key] = inputs
+        SendKeysCtypes.send_key_inputs(kind, inputs)
+
+    return send_key
+
+
+def _click(button, coords, double, button_down, button_up, wheel_dist):
+    "Perform a mouse action by mouse._perform_click_input"
+    from . import mouse
+
+    mouse._perform_click_input(button = button, coords = coords, double = double,
+                               button_down = button_down, button_up = button_up,
+                               wheel_dist = wheel_dist)
+
+
+#=========================================================================
+class ActionStream(object):
+    """Read only view of a binary stream of actions
+
+    * **buffer** - the bytes or the memory mapped file of the stream
+
+    Raise ValueError if the buffer is not a stream of a supported version.
+    """
+
+    def __init__(self, buffer):
+        """Check the header of the stream"""
+        if len(buffer) < HEADER.size:
+            raise ValueError('The buffer is too short for a stream of actions')
+        magic, version, record_size, count = HEADER.unpack_from(buffer, 0)
+        if magic != STREAM_MAGIC:
+            raise ValueError('The buffer is not a stream of actions')
+        if version != STREAM_FORMAT_VERSION or record_size < RECORD.size:
+            raise ValueError('Unsupported version of the stream of actions: {0}'.format(version))
+        if len(buffer) < HEADER.size + record_size * count:
+            raise ValueError('The stream of actions is truncated: {0} records expected'.format(count))
+
+        self.buffer = buffer
+        self.record_size = record_size
+        self.count = count
+
+    def __len__(self):
+        "Return the number of the records"
+        return self.count
+
+    def records(self):
+        "Iterate the unpacked records in the order of the stream"
+        offset = HEADER.size
+        for _ in itertools.repeat(None, self.count):
+            yield RECORD.unpack_from(self.buffer, offset)
+            offset += self.record_size
+
+    def replay(self, pause = 0.05, send_key = None, click = None):
+        """Perform the actions of the stream
+
+        * **pause** - seconds to wait after each key
+        * **send_key** - the function sending a (kind, code, state) key
+          (sent by SendInput by default)
+        * **click** - the function performing a mouse action, it takes the
+          arguments of ActionStreamWriter.add_mouse() (performed by
+          mouse._perform_click_input by default)
+        """
+        if send_key is None:
+            send_key = _key_sender()
+        if click is None:
+            click = _click
+        start = HEADER.size
+        self._replay(start, start + self.count * self.record_size, pause, send_key, click)
+
+    def _replay(self, start, end, pause, send_key, click):
+        "Perform the actions of the records between the offsets"
+        buffer = self.buffer
+        record_size = self.record_size
+        offset = start
+        while offset < end:
+            action, flags, small, first, second, real = RECORD.unpack_from(buffer, offset)
+            offset += record_size
+            if action == ACTION_KEY:
+                for _ in itertools.repeat(None, second):
+                    send_key(small, first, flags)
+                    if pause:
+                        time.sleep(pause)
+            elif action == ACTION_PAUSE:
+                time.sleep(real * second)
+            elif action == ACTION_MOUSE:
+                if small >= len(MOUSE_BUTTONS):
+                    raise ValueError('Unknown mouse button {0} at the offset {1}'.format(
+                        small, offset - record_size))
+                click(MOUSE_BUTTONS[small], (first, second), bool(flags & MOUSE_DOUBLE),
+                      bool(flags & MOUSE_DOWN), bool(flags & MOUSE_UP), int(real))
+            elif action == ACTION_GROUP:
+                group_end = offset + first * record_size
+                if first < 0 or group_end > end:
+                    raise ValueError('The group of {0} records at the offset {1} '
+                                     'is out of the stream'.format(first, offset - record_size))
+                for _ in itertools.repeat(None, second):
+                    self._replay(offset, group_end, pause, send_key, click)
+                offset = group_end
+            else:
+                raise ValueError('Unknown action {0} at the offset {1}'.format(
+                    action, offset - record_size))
+
+
+#=========================================================================
+class MappedActionStream(ActionStream):
+    """Stream of actions memory mapped from a file
+
+    Close it (or use it as a context manager) to unmap the file.
+    """
+
+    def __init__(self, filename):
+        """Map the file"""
+        self._file = open(filename, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access = mmap.ACCESS_READ)
+            ActionStream.__init__(self, self._map)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        "Unmap and close the file"
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        "Return the stream to use it in a with block"
+        return self
+
+    def __exit__(self, *args):
+        "Unmap the file at the end of the with block"
+        self.close()
+
+
+def open_stream(filename):
+    "Map the stream of actions saved by ActionStreamWriter.save()"
+    return MappedActionStream(filename)
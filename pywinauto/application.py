@@ -56,8 +56,10 @@ in almost exactly the same ways. ::
 """
 from __future__ import print_function
 
+import sys
 import os.path
-import pickle
+import json
+import operator
 import time
 import warnings
 
@@ -75,10 +77,14 @@ from . import controls
 from . import findbestmatch
 from . import findwindows
 from . import handleprops
+from . import processhandles
 from .backend import registry
 
 from .actionlogger import ActionLogger
 from .timings import Timings, WaitUntil, TimeoutError, WaitUntilPasses
+from .resolutionhints import ResolutionHints
+from .cpusampler import CPUUsageSampler, ProcessTimesSource
+from . import timings
 from .sysinfo import is_x64_Python
 
 
@@ -122,10 +128,12 @@ class WindowSpecification(object):
                          'active': ('is_active',),
                          }
 
-    def __init__(self, search_criteria):
+    def __init__(self, search_criteria, hints = None):
         """Initialize the class
 
         :param search_criteria: the criteria to match a dialog
+        :param hints: :class:`pywinauto.resolutionhints.ResolutionHints`
+            to resolve the specification without fuzzy matching (optional)
         """
 
         # kwargs will contain however to find this window
@@ -134,6 +142,7 @@ class WindowSpecification(object):
         self.criteria = [search_criteria, ]
         self.actions = ActionLogger()
         self.backend = registry.backends[search_criteria['backend']]
+        self.hints = hints
 
     def __call__(self, *args, **kwargs):
         "No __call__ so return a usefull error"
@@ -153,7 +162,51 @@ class WindowSpecification(object):
 
 
     def __get_ctrl(self, criteria_):
-        """Get the control based on the various criteria"""
+        """Get the control based on the various criteria
+
+        The resolution hints are tried first if the specification has them.
+        """
+        if self.hints is None:
+            return self.__find_ctrl(criteria_)
+
+        ctrls = self.__get_ctrl_by_hints(criteria_)
+        if ctrls is None:
+            ctrls = self.__find_ctrl(criteria_)
+            self.hints.record(criteria_, [ctrl.element_info for ctrl in ctrls])
+        return ctrls
+
+    def __get_ctrl_by_hints(self, criteria):
+        """Get the control by the stored locators (None if they don't match)
+
+        The locators which don't match any more are forgotten
+        so the full search records them again.
+        """
+        locators = self.hints.get(criteria)
+        if locators is None or len(locators) != len(criteria):
+            return None
+
+        try:
+            ctrls = self.__find_ctrl(self.hints.hinted_criteria(criteria, locators))
+        except (findwindows.ElementNotFoundError,
+                findwindows.WindowAmbiguousError,
+                findbestmatch.MatchError,
+                controls.InvalidWindowHandle,
+                controls.InvalidElement,
+                IndexError):
+            ctrls = None
+
+        if ctrls is not None and all(
+                self.hints.matches(ctrl.element_info, locator, criterion)
+                for ctrl, locator, criterion in zip(ctrls, locators, criteria)):
+            self.hints.hits += 1
+            return ctrls
+
+        self.hints.misses += 1
+        self.hints.forget(criteria)
+        return None
+
+    def __find_ctrl(self, criteria_):
+        """Find the control by the criteria (without the hints)"""
         # make a copy of the criteria
         criteria = [crit.copy() for crit in criteria_]
         # find the dialog
@@ -196,24 +249,26 @@ class WindowSpecification(object):
         * **timeout** -  maximum length of time to try to find the controls (default 5)
         * **retry_interval** - how long to wait between each retry (default .2)
         """
+        setting = 'window_find_timeout' if timeout is None else None
         if timeout is None:
             timeout = Timings.window_find_timeout
         if retry_interval is None:
             retry_interval = Timings.window_find_retry
 
-        try:
-            ctrl = WaitUntilPasses(
-                timeout,
-                retry_interval,
-                self.__get_ctrl,
-                (findwindows.ElementNotFoundError,
-                findbestmatch.MatchError,
-                controls.InvalidWindowHandle,
-                controls.InvalidElement),
-                criteria)
+        with timings.calibration.sample(setting):
+            try:
+                ctrl = WaitUntilPasses(
+                    timeout,
+                    retry_interval,
+                    self.__get_ctrl,
+                    (findwindows.ElementNotFoundError,
+                    findbestmatch.MatchError,
+                    controls.InvalidWindowHandle,
+                    controls.InvalidElement),
+                    criteria)
 
-        except TimeoutError as e:
-            raise e.original_exception
+            except TimeoutError as e:
+                raise e.original_exception
 
         return ctrl
 
@@ -236,7 +291,7 @@ class WindowSpecification(object):
         if 'top_level_only' not in criteria:
             criteria['top_level_only'] = False
 
-        new_item = WindowSpecification(self.criteria[0])
+        new_item = WindowSpecification(self.criteria[0], self.hints)
         new_item.criteria.append(criteria)
 
         return new_item
@@ -283,7 +338,7 @@ class WindowSpecification(object):
 
         # if we get here then we must have only had one criteria so far
         # so create a new :class:`WindowSpecification` for this control
-        new_item = WindowSpecification(self.criteria[0])
+        new_item = WindowSpecification(self.criteria[0], self.hints)
 
         # add our new criteria
         new_item.criteria.append({"best_match" : key})
@@ -349,6 +404,7 @@ class WindowSpecification(object):
 
         # set the current timings -couldn't set as defaults as they are
         # evaluated at import time - and timings may be changed at any time
+        setting = 'exists_timeout' if timeout is None else None
         if timeout is None:
             timeout = Timings.exists_timeout
         if retry_interval is None:
@@ -363,8 +419,8 @@ class WindowSpecification(object):
             criterion['visible_only'] = False
 
         try:
-            self.__resolve_control(exists_criteria, timeout, retry_interval)
-
+            with timings.calibration.sample(setting):
+                self.__resolve_control(exists_criteria, timeout, retry_interval)
             return True
         except (
             findwindows.ElementNotFoundError,
@@ -373,6 +429,11 @@ class WindowSpecification(object):
             controls.InvalidElement):
             return False
 
+    def exists_async(self, timeout = None, retry_interval = None):
+        "Awaitable version of :func:`WindowSpecification.Exists` (Python 3.5+)"
+        from . import asyncwait
+        return asyncwait.exists_async(self, timeout, retry_interval)
+
     @classmethod
     def __parse_wait_args(cls, wait_conditions, timeout, retry_interval):
         """
@@ -429,6 +490,18 @@ class WindowSpecification(object):
         # All the checks have been done
         return True
 
+    def _check_conditions_now(self, wait_for):
+        """Check the wait conditions only once (without any waiting)
+
+        Nested waits (like resolving of the control) make a single attempt.
+        It's used by :func:`Application.wait_any` and :func:`Application.wait_all`.
+        """
+        check_method_names, _, _ = self.__parse_wait_args(wait_for, 0, 0)
+        # a single check is not a wait to learn the timings from
+        with timings.calibration.sample(None):
+            with timings.deadline(0):
+                return self.__check_all_conditions(check_method_names)
+
     def Wait(self, wait_for, timeout=None, retry_interval=None):
         """Wait for the window to be in a particular state/states.
 
@@ -443,6 +516,8 @@ class WindowSpecification(object):
 
         :param timeout: Raise an :func:`pywinauto.timings.TimeoutError` if the window
             is not in the appropriate state after this number of seconds.
+            Nested waits (e.g. resolving the control for every check) are
+            limited by this timeout too, see :func:`pywinauto.timings.deadline`.
 
         :param retry_interval: How long to sleep between each retry.
         Default: :py:attr:`pywinauto.timings.Timings.window_find_retry`.
@@ -458,11 +533,29 @@ class WindowSpecification(object):
            :func:`pywinauto.timings.TimeoutError`
         """
 
+        setting = 'window_find_timeout' if timeout is None else None
         check_method_names, timeout, retry_interval = self.__parse_wait_args(wait_for, timeout, retry_interval)
-        WaitUntil(timeout, retry_interval, lambda: self.__check_all_conditions(check_method_names))
+        # the whole Wait is one sample (not the nested resolving of the control)
+        with timings.calibration.sample(setting):
+            # the nested control resolving can't outlive the timeout of the Wait
+            with timings.deadline(timeout):
+                WaitUntil(timeout, retry_interval, lambda: self.__check_all_conditions(check_method_names))
+
+            # Return the wrapped control
+            return self.WrapperObject()
+
+    def wait_async(self, wait_for, timeout=None, retry_interval=None):
+        """Awaitable version of :func:`WindowSpecification.Wait` (Python 3.5+)
 
-        # Return the wrapped control
-        return self.WrapperObject()
+        The conditions are checked in a thread pool and the coroutine
+        sleeps with ``asyncio.sleep`` between the checks. e.g. ::
+
+            ctrl = await app.Dialog.wait_async('ready', timeout = 10)
+
+        .. seealso:: :mod:`pywinauto.asyncwait`
+        """
+        from . import asyncwait
+        return asyncwait.wait_async(self, wait_for, timeout, retry_interval)
 
     def WaitNot(self, wait_for_not, timeout=None, retry_interval=None):
         """Wait for the window to not be in a particular state/states.
@@ -494,287 +587,219 @@ class WindowSpecification(object):
 
         check_method_names, timeout, retry_interval = \
             self.__parse_wait_args(wait_for_not, timeout, retry_interval)
-        WaitUntil(timeout, retry_interval, lambda: not self.__check_all_conditions(check_method_names))
+        with timings.deadline(timeout):
+            WaitUntil(timeout, retry_interval, lambda: not self.__check_all_conditions(check_method_names))
         # None return value, since we are waiting for a `negative` state of the control.
         # Expect that you will have nothing to do with the window closed, disabled, etc.
 
-    def _ctrl_identifiers(self):
+    def wait_not_async(self, wait_for_not, timeout=None, retry_interval=None):
+        "Awaitable version of :func:`WindowSpecification.WaitNot` (Python 3.5+)"
+        from . import asyncwait
+        return asyncwait.wait_not_async(self, wait_for_not, timeout, retry_interval)
 
-        ctrls = self.__resolve_control(self.criteria)
+    def _all_ctrl_identifiers(self):
+        """Return the list of (control, names) of the controls to print
 
-        if ctrls[-1].is_dialog():
+        The names are taken from the map of the whole dialog built
+        by findbestmatch.build_unique_dict (including the "name0" and
+        "name1" aliases of the first of several controls with the same name).
+        """
+        ctrl = self.__resolve_control(self.criteria)[-1]
+        if ctrl.is_dialog():
             # dialog controls are all the control on the dialog
-            dialog_controls = ctrls[-1].children()
-
-            ctrls_to_print = dialog_controls[:]
+            dialog_controls = ctrl.children()
             # filter out hidden controls
-            ctrls_to_print = [
-                ctrl for ctrl in ctrls_to_print if ctrl.is_visible()]
+            ctrls_to_print = [ctrl_ for ctrl_ in dialog_controls if ctrl_.is_visible()]
         else:
-            dialog_controls = ctrls[-1].top_level_parent().children()
-            ctrls_to_print = [ctrls[-1]]
+            dialog_controls = ctrl.top_level_parent().children()
+            ctrls_to_print = [ctrl]
 
         # build the list of disambiguated list of control names
         name_control_map = findbestmatch.build_unique_dict(dialog_controls)
 
         # swap it around so that we are mapped off the controls
         control_name_map = {}
-        for name, ctrl in name_control_map.items():
-            control_name_map.setdefault(ctrl, []).append(name)
-
-        return control_name_map
-
-    def PrintControlIdentifiers(self):
-        """Prints the 'identifiers'
+        for name, ctrl_ in name_control_map.items():
+            control_name_map.setdefault(ctrl_, []).append(name)
+        return [(ctrl_, sorted(control_name_map[ctrl_])) for ctrl_ in ctrls_to_print]
 
-        If you pass in a control then it just prints the identifiers
-        for that control
-
-        If you pass in a dialog then it prints the identifiers for all
-        controls in the dialog.
+    def _ctrl_identifiers(self, depth = None, filter = None):
+        """Yield (control, names) of the controls to print one by one
 
-        .. note:: The identifiers printed by this method have not been made
-               unique. So if you have 2 edit boxes, they will both have "Edit"
-               listed in their identifiers. In reality though the first one
-               can be refered to as "Edit", "Edit0", "Edit1" and the 2nd
-               should be refered to as "Edit2".
+        The names of a control are made unique among all the controls
+        of the dialog (as for the attribute access) but they are yielded
+        as soon as they are known.
         """
+        ctrl = self.__resolve_control(self.criteria)[-1]
 
-        #name_control_map = self._ctrl_identifiers()
-        ctrls = self.__resolve_control(self.criteria)
-
-        if ctrls[-1].is_dialog():
+        if ctrl.is_dialog():
             # dialog controls are all the control on the dialog
-            dialog_controls = ctrls[-1].children()
+            dialog_controls = ctrl.children()
 
-            ctrls_to_print = dialog_controls[:]
-            # filter out hidden controls
-            ctrls_to_print = [
-                ctrl for ctrl in ctrls_to_print if ctrl.is_visible()]
+            # filter out hidden controls and the controls below the depth
+            def to_print(ctrl_):
+                if depth is not None and not _is_within_depth(ctrl_, ctrl, depth):
+                    return False
+                return ctrl_.is_visible()
         else:
-            dialog_controls = ctrls[-1].top_level_parent().children()
-            ctrls_to_print = [ctrls[-1]]
+            dialog_controls = ctrl.top_level_parent().children()
 
-        # build the list of disambiguated list of control names
-        name_control_map = findbestmatch.build_unique_dict(dialog_controls)
-
-        # swap it around so that we are mapped off the controls
-        control_name_map = {}
-        for name, ctrl in name_control_map.items():
-            control_name_map.setdefault(ctrl, []).append(name)
+            def to_print(ctrl_):
+                return ctrl_ == ctrl
 
-        print("Control Identifiers:")
-        for ctrl in ctrls_to_print:
+        for ctrl_, names in findbestmatch.iter_unique_names(dialog_controls):
+            if to_print(ctrl_) and (filter is None or filter(ctrl_)):
+                yield ctrl_, sorted(names)
 
-            print("{class_name} - '{text}'   {rect}\t".format(
-                class_name=ctrl.friendly_class_name(),
-                text=ctrl.window_text(),
-                rect=str(ctrl.rectangle())))
+    def PrintControlIdentifiers(self, depth = None, filter = None, output = None, format = 'text'):
+        """Prints the 'identifiers'
 
-            names = control_name_map[ctrl]
-            names.sort()
-            for name in names:
-                print("'{0}' ".format(name), end='')
-            print("\n")
+        If you pass in a control then it just prints the identifiers
+        for that control
 
+        If you pass in a dialog then it prints the identifiers for all
+        controls in the dialog.
 
-#        for ctrl in ctrls_to_print:
-#            print "%s - '%s'   %s"% (
-#                ctrl.class_name(), ctrl.window_text(), str(ctrl.rectangle()))
-#
-#            print "\t",
-#            for text in findbestmatch.get_control_names(
-#                ctrl, dialog_controls):
-#
-#                print "'%s'" % text.encode("unicode_escape"),
-#            print
+        * **depth** - the depth of the controls of the dialog to print
+          (1 - only the immediate children, default: all the children)
+        * **filter** - a callable taking a control wrapper, only the
+          controls it returns True for are printed
+        * **output** - a file-like object to write to (default: sys.stdout)
+        * **format** - 'text' or 'json' (one JSON object per line)
+
+        With a depth, a filter or the JSON format the identifiers of each
+        control are written (and flushed) as soon as they are known, so
+        huge dialogs are not kept in memory.
+
+        .. note:: The streamed output prints the first of several controls
+               with the same identifier with that identifier only. In reality
+               it can also be refered to as "Edit0" or "Edit1" (as printed
+               by the default output) while the 2nd should be refered to
+               as "Edit2".
+        """
+        if format not in ('text', 'json'):
+            raise ValueError('Unknown format "{0}" (should be "text" or "json")'.format(format))
+        if output is None:
+            output = sys.stdout
+
+        if format == 'text':
+            output.write("Control Identifiers:\n")
+        if depth is None and filter is None and format == 'text':
+            # the default output (with the aliases of the duplicated names)
+            identifiers = self._all_ctrl_identifiers()
+        else:
+            identifiers = self._ctrl_identifiers(depth, filter)
+
+        for ctrl, names in identifiers:
+            rect = ctrl.rectangle()
+            if format == 'text':
+                output.write("{class_name} - '{text}'   {rect}\t\n".format(
+                    class_name=ctrl.friendly_class_name(),
+                    text=ctrl.window_text(),
+                    rect=str(rect)))
+                output.write("".join("'{0}' ".format(name) for name in names) + "\n\n")
+            else:
+                output.write(json.dumps({
+                    'class_name': ctrl.class_name(),
+                    'friendly_class_name': ctrl.friendly_class_name(),
+                    'text': ctrl.window_text(),
+                    'rectangle': [rect.left, rect.top, rect.right, rect.bottom],
+                    'names': names,
+                    }, sort_keys = True) + "\n")
+            if hasattr(output, 'flush'):
+                output.flush()
 
     print_control_identifiers = PrintControlIdentifiers
 
 
-cur_item = 0
-
-def _resolve_from_appdata(
-    criteria_, app, timeout = None, retry_interval = None):
-    "Should not be used at the moment!"
-    # TODO: take a look into this functionality
-
-    if timeout is None:
-        timeout = Timings.window_find_timeout
-    if retry_interval is None:
-        retry_interval = Timings.window_find_retry
-
-    global cur_item
-    # get the stored item corresponding to this request
-    matched_control = app.GetMatchHistoryItem(cur_item)
-
-    cur_item += 1
-    # remove parameters from the original search  that changes each time
-    criteria = [crit.copy() for crit in criteria_]
-
-    # Remove any attributes from the current search that are
-    # completely language dependent
-    for unloc_attrib in ['title_re', 'title', 'best_match']:
-        for c in criteria:
-            if unloc_attrib in c.keys():
-                del c[unloc_attrib]
-
-
-    #found_criteria = item[0]
-    #for c in found_criteria:
-    #    if c.has_key('process'):
-    #        del c['process']
-    #
-    # They should match - so if they don't print it out.
-    #if found_criteria != search_criteria:
-    #    print "\t\t", matched[cur_index - 3][0]
-    #    print "\t" ,matched[cur_index - 2][0]
-    #    print search_criteria
-    #    print "---"
-    #    print found_criteria
-    #    raise RuntimeError("Mismatch")
-
-    # so let's use the ID from the matched control...
-    #print item[1]
-
-    # we need to try and get a good match for the dialog
-    # this could be done by matching
-    # - number/positoin of controls
-    # - class
-    # anything else?
-
-    dialog_criterion = criteria[0]
-    #print list(matched_control)
-    dialog_criterion['class_name'] = matched_control[1]['class_name']
-
-    # find all the windows in the process
-    process_elems = findwindows.find_elements(**dialog_criterion)
-
-    dialog = None
-    ctrl = None
-    if process_elems:
-        #similar_child_count = [e for e in process_elems
-        #    if matched_control[1]['control_count'] -2 <=
-        #            len(e.children) and
-        #        matched_control[1]['control_count'] +2 >=
-        #            len(e.children)]
-
-        #if similar_child_count:
-        #    process_hwnds = similar_child_count
-        #else:
-        #    print("None Similar child count!!???")
-        #    print(matched_control[1]['control_count'], len(handleprops.children(h)))
-
-        for e in process_elems:
-            #print controls.WrapHandle(h).get_properties()
-            #print "======", h, h, h
-
-            dialog = registry.wrapper_class(e)
-            #dialog = BaseWrapper(e)
-
-            # if a control was specified also
-            if len(criteria_) > 1:
-                # find it in the original data
-                #print item[2]
-
-                # remove those criteria which are langauge specific
-                ctrl_criterion = criteria[1]
-
-                #def has_same_id(other_ctrl):
-                #    print "==="*20
-                #    print "testing", item[2]['control_id'],
-                #    print "against", other_ctrl
-                #    return item[2]['control_id'] == \
-                #    handleprops.controlid(other_ctrl)
-
-                ctrl_criterion['class_name'] = matched_control[2]['class_name']
-                ctrl_criterion['parent'] = dialog.handle
-                ctrl_criterion['top_level_only'] = False
-                #ctrl_criterion['predicate_func'] = has_same_id
-                #print "CTRLCTRJL", ctrl_criterion
-                ctrl_elems = findwindows.find_elements(**ctrl_criterion)
-
-                if len(ctrl_elems) > 1:
-                    same_ids = \
-                        [elem for elem in ctrl_elems
-                         if elem.control_id == \
-                         matched_control[2]['control_id']]
-
-                    if same_ids:
-                        ctrl_elems = same_ids
-
-                try:
-                    ctrl = registry.wrapper_class(ctrl_elems[0])
-                    #ctrl = BaseWrapper(ctrl_elems[0])
-                except IndexError:
-                    print("-+-+=_" * 20)
-                    #print(found_criteria)
-                    raise
+#=========================================================================
+def _is_within_depth(ctrl, dialog, depth):
+    """Return True if the control is not deeper than the depth below the dialog
+
+    Depth 1 means the immediate children only.
+    """
+    level = 1
+    parent = ctrl.element_info.parent
+    while parent is not None and not parent == dialog.element_info:
+        if level >= depth:
+            return False
+        level += 1
+        parent = parent.parent
+    return parent is not None and level <= depth
 
-                break
 
+#=========================================================================
+class StartupProfile(object):
+    """Timestamps of the phases of the application start
 
+    The phases (in order) are:
 
-    # it is possible that the dialog will not be found - so we
-    # should raise an error
-    if dialog is None:
-        raise findwindows.ElementNotFoundError()
-
-    if len(criteria_) == 2 and ctrl is None:
-        raise findwindows.ElementNotFoundError()
-
-    if ctrl:
-        return dialog, ctrl
-    else:
-        return (dialog, )
-
-    #print process_hwnds
-
-
-##
-##        # if best match was specified for the dialog
-##        # then we need to replace it with other values
-##        # for now we will just use class_name
-##        for crit in ['best_match', 'title', 'title_re']:
-##            if crit in criteria[0]:
-##                del(criteria[0][crit])
-##                criteria[0]['class_name'] = app_data[0].class_name()#['class_name']
-##
-##            if len(criteria) > 1:
-##                # find the best match of the application data
-##                if criteria[1].has_key('best_match'):
-##                    best_match = findbestmatch.find_best_control_matches(
-##                        criteria[1]['best_match'], app_data)[0]
-##
-##                    #visible_controls = [ctrl in app_data if ctrl.is_visible()]
-##
-##                    #find the index of the best match item
-##                    ctrl_index = app_data.index(best_match)
-##                    #print best_match[0].window_text()
-##                    ctrl_index, best_match.window_text()
-##
-##                    criteria[1]['ctrl_index'] = ctrl_index -1
-##                    #criteria[1]['class_name'] = best_match.class_name()
-##                    #del(criteria[1]['best_match'])
-##
-## One idea here would be to run the new criteria on the app_data dialog and
-## if it returns more then one control then you figure out which one would be
-## best - so that you have that info when running on the current dialog
-##
-##            #for criterion in criteria[1:]:
-##                # this part is weird - we now have to go off and find the
-##                # index, class, text of the control in the app_data
-##                # and then find the best match for this control in the
-##                # current dialog
-##            #    pass
-##
-##
-
-#    dialog = None
-
-    #return _resolve_control(criteria_, timeout, retry_interval)
+    * **process_created** - CreateProcess has returned
+    * **input_idle** - WaitForInputIdle has returned
+    * **top_window** - the first top level window of the process exists
+    * **cpu_idle** - the CPU usage of the process is below the threshold
+    * **spec_ready** - the window specification exists
 
+    Only the phases requested in :func:`Application.start` are recorded.
+    If a phase has timed out it's stored in ``failed_phase``.
+    """
 
+    PHASES = ('process_created', 'input_idle', 'top_window', 'cpu_idle', 'spec_ready')
+
+    def __init__(self, start_time = None):
+        """Start the profile (now if the start time is not specified)"""
+        if start_time is None:
+            start_time = time.time()
+        self.start_time = start_time
+        self.phases = []  # [(phase, timestamp), ...]
+        self.failed_phase = None
+
+    def mark(self, phase, timestamp = None):
+        "Record that the phase is reached"
+        if phase not in self.PHASES:
+            raise ValueError('Unknown phase "{0}"'.format(phase))
+        if timestamp is None:
+            timestamp = time.time()
+        self.phases.append((phase, timestamp))
+
+    def elapsed(self, phase):
+        "Return seconds from the start to the phase (None if it isn't reached)"
+        for name, timestamp in self.phases:
+            if name == phase:
+                return timestamp - self.start_time
+        return None
+
+    def durations(self):
+        "Return a list of (phase, seconds since the previous phase)"
+        durations = []
+        previous = self.start_time
+        for name, timestamp in self.phases:
+            durations.append((name, timestamp - previous))
+            previous = timestamp
+        return durations
+
+    @property
+    def total(self):
+        "Seconds from the start to the last reached phase"
+        if not self.phases:
+            return 0.
+        return self.phases[-1][1] - self.start_time
+
+    def as_dict(self):
+        "Return the profile as a dictionary (e.g. to save it as JSON)"
+        return {
+            'start_time': self.start_time,
+            'phases': [[name, timestamp - self.start_time] for name, timestamp in self.phases],
+            'failed_phase': self.failed_phase,
+            'total': self.total,
+            }
+
+    def __str__(self):
+        "Return the durations of the phases"
+        lines = ['{0}: +{1:.3f} s'.format(name, duration) for name, duration in self.durations()]
+        if self.failed_phase:
+            lines.append('{0}: timed out'.format(self.failed_phase))
+        return '\n'.join(lines)
 
 
 #=========================================================================
@@ -792,24 +817,29 @@ class Application(object):
         Initialize the Appliction object
         
         * **backend** is a name of used back-end (values: "native", "uia").
-        * **datafilename** is a file name for reading matching history.
+        * **datafilename** is a file name for reading and writing
+          the resolution hints (see :mod:`pywinauto.resolutionhints`).
+          The hints are used only if the file name is specified.
         """
         self.process = None
         self.xmlpath = ''
 
-        self.match_history = []
-        self.use_history = False
+        self.hints = None
+        self.cpu_sampler = None
+        self.startup_profile = None
         self.actions = ActionLogger()
         if backend not in registry.backends:
             raise ValueError('Backend "{0}" is not registered!'.format(backend))
         self.backend = registry.backends[backend]
 
-        # load the match history if a file was specifed
+        # load the resolution hints if a file was specifed
         # and it exists
-        if datafilename and os.path.exists(datafilename):
-            with open(datafilename, "rb") as datafile:
-                self.match_history = pickle.load(datafile)
-            self.use_history = True
+        if datafilename:
+            try:
+                self.hints = ResolutionHints(datafilename)
+            except ValueError as exc:
+                warnings.warn('{0}, the hints are recorded from scratch'.format(exc), UserWarning)
+                self.hints = ResolutionHints()
 
     def __connect(self, **kwargs):
         """
@@ -887,9 +917,27 @@ class Application(object):
     Start_ = __start  # A deprecated name. Should be removed in 0.6.X
 
     def start(self, cmd_line, timeout=None, retry_interval=None,
-              create_new_console=False, wait_for_idle=True):
+              create_new_console=False, wait_for_idle=True,
+              wait_for_window=False, cpu_threshold=None, ready_spec=None):
         """
         Starts the application giving in cmd_line
+
+        The application is ready when all the requested phases are passed
+        (WaitForInputIdle is not enough for many .NET and Java applications):
+
+        * **wait_for_idle** - wait until the process is waiting for user input
+        * **wait_for_window** - wait for the first top level window of the process
+        * **cpu_threshold** - wait until the CPU usage of the process is lower
+          than the threshold (in percents)
+        * **ready_spec** - wait until the :class:`WindowSpecification`
+          (or the best_match name of the application's dialog) exists
+
+        All the phases share the timeout (default: ``Timings.app_start_timeout``).
+        The timestamps of the phases are recorded in the
+        :class:`StartupProfile` object ``startup_profile``::
+
+            app = Application().start('dotnet_app.exe', wait_for_window=True, cpu_threshold=5)
+            print(app.startup_profile)
         """
 
         # try to parse executable name and check it has correct bitness
@@ -897,6 +945,7 @@ class Application(object):
             exe_name = cmd_line.split('.exe')[0] + '.exe'
             _warn_incorrect_binary_bitness(exe_name)
 
+        calibrated = timeout is None
         if timeout is None:
             timeout = Timings.app_start_timeout
         if retry_interval is None:
@@ -908,6 +957,9 @@ class Application(object):
         # by the function
         command_line = cmd_line
 
+        profile = StartupProfile()
+        self.startup_profile = profile
+
         # Actually create the process
         dwCreationFlags = 0
         if create_new_console:
@@ -931,16 +983,20 @@ class Application(object):
             raise AppStartError(message)
 
         self.process = dwProcessId
+        profile.mark('process_created')
 
         self.__warn_incorrect_bitness()
 
         def app_idle():
             """Return true when the application is ready to start"""
+            start = time.time()
             result = win32event.WaitForInputIdle(
-                hProcess, int(timeout * 1000))
+                hProcess, int(timings.clip_timeout(timeout) * 1000))
 
             # wait completed successfully
             if result == 0:
+                if calibrated:
+                    timings.calibration.record('app_start_timeout', time.time() - start)
                 return True
 
             # the wait returned because it timed out
@@ -949,14 +1005,46 @@ class Application(object):
 
             return bool(self.windows_())
 
-        # Wait until the application is ready after starting it
-        if wait_for_idle and not app_idle():
-            raise RuntimeWarning('Application is not loaded correctly (WaitForInputIdle failed)')
+        def has_top_window():
+            "Return True if the process has a top level window"
+            return bool(findwindows.find_elements(process = self.process, backend = self.backend.name))
+
+        # all the phases share the timeout
+        with timings.deadline(timeout):
+            # Wait until the application is ready after starting it
+            if wait_for_idle:
+                if not app_idle():
+                    profile.failed_phase = 'input_idle'
+                    raise RuntimeWarning('Application is not loaded correctly (WaitForInputIdle failed)')
+                profile.mark('input_idle')
+
+            if wait_for_window:
+                self.__startup_phase(profile, 'top_window',
+                    WaitUntil, timeout, retry_interval, has_top_window)
+
+            if cpu_threshold is not None:
+                self.__startup_phase(profile, 'cpu_idle',
+                    self.WaitCPUUsageLower, cpu_threshold, timeout)
+
+            if ready_spec is not None:
+                spec = self.__specifications([ready_spec])[0]
+                self.__startup_phase(profile, 'spec_ready',
+                    spec.Wait, 'exists', timeout, retry_interval)
 
         return self
 
     Start = start
 
+    @staticmethod
+    def __startup_phase(profile, phase, wait, *args):
+        "Call the wait and mark the phase (or store it as failed)"
+        try:
+            wait(*args)
+        except Exception:
+            profile.failed_phase = phase
+            raise
+        profile.mark(phase)
+
     def __warn_incorrect_bitness(self):
         if self.is64bit() != is_x64_Python():
             if is_x64_Python():
@@ -976,46 +1064,135 @@ class Application(object):
         return handleprops.is64bitprocess(self.process)
 
     def CPUUsage(self, interval = None):
-        "Return CPU usage percentage during specified number of seconds"
-        
-        WIN32_PROCESS_TIMES_TICKS_PER_SECOND = 1e7
+        """Return CPU usage percentage during specified number of seconds
+
+        If the CPU usage sampler is running and the interval is not
+        specified the last sample is returned without waiting
+        (see :func:`Application.start_cpu_sampler`).
+        """
+
+        if interval is None and self.cpu_sampler is not None and self.cpu_sampler.is_running:
+            usage = self.cpu_sampler.latest
+            if usage is None:
+                usage = self.cpu_sampler.wait_sample()
+            if usage is not None:
+                return usage
         
         if interval is None:
             interval = Timings.cpu_usage_interval
         
-        if not self.process:
-            raise RuntimeError('Application instance is not connected to any process!')
-        hProcess = win32api.OpenProcess(win32con.MAXIMUM_ALLOWED, 0, self.process)
-        
-        times_dict = win32process.GetProcessTimes(hProcess)
-        UserTime_start, KernelTime_start = times_dict['UserTime'], times_dict['KernelTime']
+        cpu_time_start = self._process_cpu_time()
         
         time.sleep(interval)
         
-        times_dict = win32process.GetProcessTimes(hProcess)
-        UserTime_end, KernelTime_end = times_dict['UserTime'], times_dict['KernelTime']
-        
-        total_time = (UserTime_end - UserTime_start) / WIN32_PROCESS_TIMES_TICKS_PER_SECOND + \
-                     (KernelTime_end - KernelTime_start) / WIN32_PROCESS_TIMES_TICKS_PER_SECOND
+        total_time = self._process_cpu_time() - cpu_time_start
         
-        win32api.CloseHandle(hProcess)
         return 100.0 * (total_time / (float(interval) * multiprocessing.cpu_count()))
 
+    def _process_cpu_time(self):
+        "Return CPU time (user + kernel) consumed by the process in seconds"
+        if not self.process:
+            raise RuntimeError('Application instance is not connected to any process!')
+
+        # the process handle is reused from the cache
+        with processhandles.query_handle(self.process) as hProcess:
+            if not hProcess:
+                raise ProcessNotFoundError(
+                    "Process with ID '{0}' could not be opened".format(self.process))
+            times_dict = win32process.GetProcessTimes(hProcess)
+
+        WIN32_PROCESS_TIMES_TICKS_PER_SECOND = 1e7
+        return (times_dict['UserTime'] + times_dict['KernelTime']) / WIN32_PROCESS_TIMES_TICKS_PER_SECOND
+
     def WaitCPUUsageLower(self, threshold = 2.5, timeout = None, usage_interval = None):
-        "Wait until process CPU usage percentage is less than specified threshold"
+        """Wait until process CPU usage percentage is less than specified threshold
+
+        If the CPU usage sampler is running the moving average of its
+        samples is used instead of measuring the CPU usage on each check.
+        """
         
         if usage_interval is None:
             usage_interval = Timings.cpu_usage_interval
+        calibrated = timeout is None
         if timeout is None:
             timeout = Timings.cpu_usage_wait_timeout
+        timeout = timings.clip_timeout(timeout)
         
         start_time = time.time()
         
+        if self.cpu_sampler is not None and self.cpu_sampler.is_running:
+            self.__wait_sampled_cpu_usage_lower(threshold, timeout, start_time, usage_interval)
+        else:
+            self.__wait_polled_cpu_usage_lower(threshold, timeout, start_time, usage_interval)
+
+        if calibrated:
+            timings.calibration.record('cpu_usage_wait_timeout', time.time() - start_time)
+        return self
+
+    def __wait_polled_cpu_usage_lower(self, threshold, timeout, start_time, usage_interval):
+        "Measure the CPU usage until it is lower than the threshold"
         while self.CPUUsage(usage_interval) > threshold:
             if time.time() - start_time > timeout:
                 raise RuntimeError('Waiting CPU load <= ' + str(threshold) + '% timed out!')
-        
-        return self
+
+    def __wait_sampled_cpu_usage_lower(self, threshold, timeout, start_time, usage_interval):
+        "Wait until the moving average of the CPU usage samples is lower than the threshold"
+        sampler = self.cpu_sampler
+        sample_count = sampler.sample_count
+        usage = sampler.average
+        while usage is None or usage > threshold:
+            time_left = timeout - (time.time() - start_time)
+            if time_left <= 0:
+                raise RuntimeError('Waiting CPU load <= ' + str(threshold) + '% timed out!')
+            if sampler.error is not None:
+                raise RuntimeError('CPU usage sampler has stopped: ' + str(sampler.error))
+            if not sampler.is_running:
+                # stopped by another thread - no more samples will come
+                self.__wait_polled_cpu_usage_lower(threshold, timeout, start_time, usage_interval)
+                return
+
+            sampler.wait_sample(sample_count, time_left)
+            sample_count = sampler.sample_count
+            usage = sampler.average
+
+    def start_cpu_sampler(self, interval = None, size = 10, source = None):
+        """Start sampling of the CPU usage of the process in a background thread
+
+        * **interval** - how often to take a sample (default: ``Timings.cpu_usage_interval``)
+        * **size** - the number of the last samples to keep for the moving average
+        * **source** - a callable returning the cumulative CPU time of the process
+          in seconds (default: GetProcessTimes through one reusable process handle)
+
+        :func:`Application.CPUUsage` and :func:`Application.WaitCPUUsageLower`
+        use the samples while the sampler is running.
+        Return the :class:`pywinauto.cpusampler.CPUUsageSampler` object.
+        """
+        if not self.process:
+            raise RuntimeError('Application instance is not connected to any process!')
+        self.stop_cpu_sampler()
+
+        if source is None:
+            source = ProcessTimesSource(self.process)
+        self.cpu_sampler = CPUUsageSampler(source, interval, size)
+        return self.cpu_sampler.start()
+
+    def stop_cpu_sampler(self):
+        "Stop sampling of the CPU usage (do nothing if the sampler is not started)"
+        if self.cpu_sampler is not None:
+            self.cpu_sampler.stop()
+            self.cpu_sampler = None
+
+    def wait_cpu_usage_lower_async(self, threshold = 2.5, timeout = None, usage_interval = None):
+        """Awaitable version of :func:`Application.WaitCPUUsageLower` (Python 3.5+)
+
+        The CPU usage is measured with ``asyncio.sleep`` between the samples
+        so the event loop is free to run other coroutines. If the CPU usage
+        sampler is running the moving average of its samples is used::
+
+            await app.wait_cpu_usage_lower_async(threshold = 5)
+        """
+        from . import asyncwait
+        return asyncwait.wait_cpu_usage_lower_async(self, threshold, timeout, usage_interval)
 
     def top_window_(self):
         "Return the current top window of the application"
@@ -1023,9 +1200,11 @@ class Application(object):
             raise AppNotConnected("Please use start or connect before trying "
                                   "anything else")
 
-        timeout = Timings.window_find_timeout
+        timeout = timings.clip_timeout(Timings.window_find_timeout)
         while timeout >= 0:
-            windows = findwindows.find_elements(process = self.process, backend = self.backend.name)
+            # each poll enumerates the windows and reads their processes once
+            with findwindows.top_level_snapshot():
+                windows = findwindows.find_elements(process = self.process, backend = self.backend.name)
             if windows:
                 break
             time.sleep(Timings.window_find_retry)
@@ -1042,17 +1221,100 @@ class Application(object):
 
         return WindowSpecification(criteria)
 
-    def active_(self):
-        "Return the active window of the application"
+    def __specifications(self, specs):
+        "Return a list of WindowSpecification objects (best_match for strings)"
+        return [spec if isinstance(spec, WindowSpecification) else self[spec]
+                for spec in specs]
+
+    def wait_any(self, specs, wait_for = 'exists', timeout = None, retry_interval = None):
+        """Wait until any of the window specifications is in the state
+
+        * **specs** a list of :class:`WindowSpecification` objects
+          (a string is used as a best_match name of the application's dialog)
+        * **wait_for** the state(s) to wait for (see :func:`WindowSpecification.Wait`)
+        * **timeout** how long to wait (default: ``Timings.window_find_timeout``)
+        * **retry_interval** how long to sleep between the checks
+          (default: ``Timings.window_find_retry``)
+
+        All the specifications are checked in turn on each poll sharing
+        one enumeration of the top level windows. Return the first
+        specification that matched. Raise a TimeoutError otherwise. e.g. ::
+
+            dlg = app.wait_any([app.SaveAs, app.Error], 'ready', timeout=10)
+        """
+        specs = self.__specifications(specs)
+        if timeout is None:
+            timeout = Timings.window_find_timeout
+        if retry_interval is None:
+            retry_interval = Timings.window_find_retry
+
+        def first_matched():
+            "Return the first specification in the state (or None)"
+            with findwindows.top_level_snapshot():
+                for spec in specs:
+                    if spec._check_conditions_now(wait_for):
+                        return spec
+            return None
+
+        return WaitUntil(timeout, retry_interval, first_matched, None, operator.ne)
+
+    def wait_all(self, specs, wait_for = 'exists', timeout = None, retry_interval = None):
+        """Wait until all the window specifications are in the state
+
+        Parameters are the same as for :func:`Application.wait_any`.
+        All the specifications must be in the state at the same poll.
+        Return the list of the specifications. Raise a TimeoutError otherwise.
+        """
+        specs = self.__specifications(specs)
+        if timeout is None:
+            timeout = Timings.window_find_timeout
+        if retry_interval is None:
+            retry_interval = Timings.window_find_retry
+
+        def all_matched():
+            "Return True if all the specifications are in the state"
+            with findwindows.top_level_snapshot():
+                for spec in specs:
+                    if not spec._check_conditions_now(wait_for):
+                        return False
+            return True
+
+        WaitUntil(timeout, retry_interval, all_matched)
+        return specs
+
+    def active_(self, timeout = None, retry_interval = None):
+        """Return the active window of the application
+
+        Wait until a window of the process becomes active and return
+        as soon as it is found (no delay if it is active already).
+
+        * **timeout** how long to wait for an active window
+          (default: ``Timings.window_find_timeout``)
+        * **retry_interval** how long to sleep between the checks
+          (default: ``Timings.window_find_retry``)
+
+        Raise a RuntimeError if no window of the application becomes active.
+
+        .. note:: Previous versions always slept
+           ``Timings.window_find_timeout`` (5 sec. by default) before the check.
+        """
         if not self.process:
             raise AppNotConnected("Please use start or connect before trying "
                                   "anything else")
 
-        time.sleep(Timings.window_find_timeout)
-        # very simple
-        windows = findwindows.find_elements(process = self.process, active_only = True, backend = self.backend.name)
+        if timeout is None:
+            timeout = Timings.window_find_timeout
+        if retry_interval is None:
+            retry_interval = Timings.window_find_retry
 
-        if not windows:
+        def active_windows():
+            "Return the active windows of the process"
+            return findwindows.find_elements(
+                process = self.process, active_only = True, backend = self.backend.name)
+
+        try:
+            windows = WaitUntil(timeout, retry_interval, active_windows, [], operator.ne)
+        except TimeoutError:
             raise RuntimeError("No Windows of that application are active")
 
         criteria = {}
@@ -1104,13 +1366,13 @@ class Application(object):
         kwargs['backend'] = self.backend.name
 
         if not self.process:
-            win_spec = WindowSpecification(kwargs)
+            win_spec = WindowSpecification(kwargs, self.hints)
             self.process = win_spec.WrapperObject().process_id()
         # add the restriction for this particular process
         else:
             kwargs['process'] = self.process
 
-            win_spec = WindowSpecification(kwargs)
+            win_spec = WindowSpecification(kwargs, self.hints)
 
         return win_spec
     Window_ = window_
@@ -1137,13 +1399,14 @@ class Application(object):
         return self[attr_name]
 
     def WriteAppData(self, filename):
-        "Should not be used - part of application data implementation"
-        with open(filename, "wb") as f:
-            pickle.dump(self.match_history, f)
+        """Save the resolution hints to the file
 
-    def GetMatchHistoryItem(self, index):
-        "Should not be used - part of application data implementation"
-        return self.match_history[index]
+        The hit rate of the hints is available as ``app.hints.hit_rate``.
+        """
+        if self.hints is None:
+            raise RuntimeError('Resolution hints are not used, '
+                               'please specify datafilename in the Application constructor')
+        self.hints.save(filename)
 
 
     def Kill_(self):
@@ -1154,6 +1417,7 @@ class Application(object):
         this should only be used when it is OK to kill the process like you
         would in task manager.
         """
+        self.stop_cpu_sampler()
 
         windows = self.windows_(visible_only = True)
 
@@ -1208,6 +1472,9 @@ class Application(object):
 
         win32api.CloseHandle(process_wait_handle)
 
+        # close the cached handles of the killed process
+        processhandles.cache.purge()
+
         return killed
 
     kill_ = Kill_
@@ -0,0 +1,266 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"""Awaitable counterparts of the blocking waits (Python 3.5+ only)
+
+The coroutines sleep with ``asyncio.sleep`` between the polls and run
+the blocking back-end calls in a small thread pool, so one event loop
+can supervise many applications at once::
+
+    await asyncio.gather(app1.Dialog.wait_async('ready'),
+                         app2.wait_cpu_usage_lower_async())
+
+Usually the module is not used directly: see
+:func:`pywinauto.application.WindowSpecification.wait_async`,
+:func:`pywinauto.application.WindowSpecification.exists_async` and
+:func:`pywinauto.application.Application.wait_cpu_usage_lower_async`.
+
+.. note:: The module uses the ``async``/``await`` syntax, so it can be
+   imported by Python 3.5 or later only (the rest of the package
+   supports Python 2.6 - 3.4 too). Neither ``pywinauto`` nor
+   ``pywinauto.application`` import it, the ``*_async`` methods import
+   it when they are called.
+
+The timings overrides (:func:`pywinauto.timings.TimeConfig.override`)
+and the deadline (:func:`pywinauto.timings.deadline`) are kept per
+thread, while all the coroutines of a loop share one thread. So the
+waits take the timeouts, the overrides and the deadline of the caller
+at the call time (not when the coroutine starts) and the blocking calls
+run in the executor threads with them.
+"""
+
+import asyncio
+import multiprocessing
+import operator
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import timings
+from .timings import Timings, TimeoutError
+
+
+#: the number of threads for the blocking back-end calls
+MAX_WORKERS = 4
+
+_executor = None
+
+
+#=========================================================================
+def get_executor():
+    "Return the executor for the blocking calls (create it at the first call)"
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers = MAX_WORKERS)
+    return _executor
+
+
+#=========================================================================
+def set_executor(executor):
+    "Use another executor for the blocking calls (None means the default one)"
+    global _executor
+    _executor = executor
+
+
+#=========================================================================
+def _running_loop():
+    "Return the event loop running the current coroutine"
+    try:
+        return asyncio.get_running_loop()
+    except AttributeError:
+        # Python 3.5 and 3.6
+        return asyncio.get_event_loop()
+
+
+#=========================================================================
+class CallerTimings(object):
+    """The timings overrides and the deadline of the calling thread
+
+    They are captured when the object is created and restored around
+    the blocking calls done in the executor threads.
+    """
+
+    def __init__(self):
+        """Capture the overrides and the deadline of the current thread"""
+        self.overrides = Timings.overrides()
+        self.deadline = timings.current_deadline()
+
+    def end_time(self, timeout):
+        "Return the end time of a wait for the timeout limited by the deadline"
+        end_time = time.time() + timeout
+        if self.deadline is not None:
+            end_time = min(end_time, self.deadline)
+        return end_time
+
+    def call(self, func, *args):
+        "Call ``func(*args)`` with the captured overrides and deadline"
+        with Timings.override(self.overrides):
+            if self.deadline is None:
+                return func(*args)
+            with timings.deadline(max(self.deadline - time.time(), 0)):
+                return func(*args)
+
+
+#=========================================================================
+async def run_blocking(func, *args, caller = None):
+    """Call ``func(*args)`` in the executor and return its result
+
+    * **caller** - the CallerTimings to call the function with
+      (captured when the coroutine runs by default)
+    """
+    if caller is None:
+        caller = CallerTimings()
+    return await _running_loop().run_in_executor(get_executor(), caller.call, func, *args)
+
+
+#=========================================================================
+def wait_until_async(timeout, retry_interval, func, value = True, op = operator.eq, *args):
+    """Awaitable version of :func:`pywinauto.timings.WaitUntil`
+
+    ``func(*args)`` is called in the executor, the polls are separated by
+    ``asyncio.sleep(retry_interval)``. Raise a
+    :func:`pywinauto.timings.TimeoutError` if ``op(func(*args), value)``
+    is still False after the timeout.
+    """
+    caller = CallerTimings()
+    return _wait_until(caller, caller.end_time(timeout), retry_interval, func, value, op, args)
+
+
+async def _wait_until(caller, end_time, retry_interval, func, value, op, args):
+    "Poll the function until the end time"
+    func_val = await run_blocking(func, *args, caller = caller)
+    while not op(func_val, value):
+        time_left = end_time - time.time()
+        if time_left > 0:
+            await asyncio.sleep(min(retry_interval, time_left))
+            func_val = await run_blocking(func, *args, caller = caller)
+        else:
+            err = TimeoutError("timed out")
+            err.function_value = func_val
+            raise err
+
+    return func_val
+
+
+#=========================================================================
+def wait_async(spec, wait_for, timeout = None, retry_interval = None):
+    "Wait for the window specification to be in the state, return the wrapper"
+    if timeout is None:
+        timeout = Timings.window_find_timeout
+    if retry_interval is None:
+        retry_interval = Timings.window_find_retry
+
+    caller = CallerTimings()
+    return _wait(caller, caller.end_time(timeout), retry_interval, spec, wait_for)
+
+
+async def _wait(caller, end_time, retry_interval, spec, wait_for):
+    "Wait for the state and return the wrapper"
+    await _wait_until(caller, end_time, retry_interval, spec._check_conditions_now,
+                      True, operator.eq, (wait_for, ))
+    return await run_blocking(spec.WrapperObject, caller = caller)
+
+
+#=========================================================================
+def wait_not_async(spec, wait_for_not, timeout = None, retry_interval = None):
+    "Wait for the window specification to not be in the state"
+    if timeout is None:
+        timeout = Timings.window_find_timeout
+    if retry_interval is None:
+        retry_interval = Timings.window_find_retry
+
+    caller = CallerTimings()
+    return _wait_until(caller, caller.end_time(timeout), retry_interval,
+                       spec._check_conditions_now, False, operator.eq, (wait_for_not, ))
+
+
+#=========================================================================
+def exists_async(spec, timeout = None, retry_interval = None):
+    "Return True if the window specification exists (wait up to the timeout)"
+    if timeout is None:
+        timeout = Timings.exists_timeout
+    if retry_interval is None:
+        retry_interval = Timings.exists_retry
+
+    caller = CallerTimings()
+    return _exists(caller, caller.end_time(timeout), retry_interval, spec)
+
+
+async def _exists(caller, end_time, retry_interval, spec):
+    "Return True if the window specification exists until the end time"
+    try:
+        await _wait_until(caller, end_time, retry_interval, spec._check_conditions_now,
+                          True, operator.eq, ('exists', ))
+    except TimeoutError:
+        return False
+    return True
+
+
+#=========================================================================
+def wait_cpu_usage_lower_async(app, threshold = 2.5, timeout = None, usage_interval = None):
+    """Wait until CPU usage of the application is less than the threshold
+
+    If the CPU usage sampler of the application is running the moving
+    average of its samples is used (as by the blocking wait).
+    """
+    if usage_interval is None:
+        usage_interval = Timings.cpu_usage_interval
+    if timeout is None:
+        timeout = Timings.cpu_usage_wait_timeout
+
+    caller = CallerTimings()
+    end_time = caller.end_time(timeout)
+    if app.cpu_sampler is not None and app.cpu_sampler.is_running:
+        return _wait_sampled_cpu_usage_lower(caller, end_time, app, threshold, usage_interval)
+    return _wait_cpu_usage_lower(caller, end_time, app, threshold, usage_interval)
+
+
+async def _wait_cpu_usage_lower(caller, end_time, app, threshold, usage_interval):
+    "Sample the CPU usage until it's lower than the threshold"
+    while True:
+        cpu_start = await run_blocking(app._process_cpu_time, caller = caller)
+        interval_start = time.time()
+        await asyncio.sleep(usage_interval)
+        cpu_end = await run_blocking(app._process_cpu_time, caller = caller)
+        interval = max(time.time() - interval_start, usage_interval)
+
+        usage = 100.0 * (cpu_end - cpu_start) / (interval * multiprocessing.cpu_count())
+        if usage <= threshold:
+            return app
+        if time.time() > end_time:
+            raise RuntimeError('Waiting CPU load <= ' + str(threshold) + '% timed out!')
+
+
+async def _wait_sampled_cpu_usage_lower(caller, end_time, app, threshold, usage_interval):
+    "Poll the moving average of the CPU usage samples until it's lower than the threshold"
+    sampler = app.cpu_sampler
+    usage = sampler.average
+    while usage is None or usage > threshold:
+        time_left = end_time - time.time()
+        if time_left <= 0:
+            raise RuntimeError('Waiting CPU load <= ' + str(threshold) + '% timed out!')
+        if sampler.error is not None:
+            raise RuntimeError('CPU usage sampler has stopped: ' + str(sampler.error))
+        if not sampler.is_running:
+            # stopped by another thread - no more samples will come
+            return await _wait_cpu_usage_lower(caller, end_time, app, threshold, usage_interval)
+
+        await asyncio.sleep(min(sampler.interval, time_left))
+        usage = sampler.average
+    return app
@@ -14,10 +14,12 @@ except ImportError:
     ImageGrab = None
 
 from . import SendKeysCtypes as SendKeys
+from . import keyparser
 from . import six
 from . import win32defines, win32structures, win32functions
-from .timings import Timings
+from .timings import Timings, TimeoutError
 from .actionlogger import ActionLogger
+from . import mouse
 from .mouse import _perform_click_input
 
 #=========================================================================
@@ -736,8 +738,19 @@ class BaseWrapper(object):
                          press_coords = (0, 0),
                          release_coords = (0, 0),
                          pressed = "",
-                         absolute = False):
-        "Drag the mouse"
+                         absolute = False,
+                         steps = None,
+                         speed = None,
+                         easing = 'linear'):
+        """Drag the mouse
+
+        If **steps** or **speed** is specified the mouse is moved through
+        the points of mouse.path() (10 steps by default) by one batch of
+        input (see mouse.move_path()) with no wait between the steps. The
+        **speed** is in pixels per second, without it the whole movement
+        is sent at once. Then the **button** is one of ``mouse.DRAG_BUTTONS``
+        (ValueError is raised for the others).
+        """
 
         if isinstance(press_coords, win32structures.POINT):
             press_coords = (press_coords.x, press_coords.y)
@@ -745,6 +758,19 @@ class BaseWrapper(object):
         if isinstance(release_coords, win32structures.POINT):
             release_coords = (release_coords.x, release_coords.y)
 
+        if steps is not None or speed is not None:
+            mouse._check_drag_button(button)
+            self.press_mouse_input(button, press_coords, pressed, absolute=absolute, key_up=False)
+            time.sleep(Timings.before_drag_wait)
+            start, end = press_coords, release_coords
+            if not absolute:
+                start, end = self.client_to_screen(start), self.client_to_screen(end)
+            mouse.move_path(mouse.path(start, end, steps or 10, easing), speed)
+            time.sleep(Timings.before_drop_wait)
+            self.release_mouse_input(button, release_coords, pressed, absolute=absolute, key_down=False)
+            time.sleep(Timings.after_drag_n_drop_wait)
+            return self
+
         self.press_mouse_input(button, press_coords, pressed, absolute=absolute)
         time.sleep(Timings.before_drag_wait)
         for i in range(5):
@@ -775,16 +801,50 @@ class BaseWrapper(object):
         with_tabs = False,
         with_newlines = False,
         turn_off_numlock = True,
-        set_foreground = True):
+        set_foreground = True,
+        burst = False,
+        paced = False,
+        fast_text = False):
         """
         Type keys to the element using SendKeys
 
         This uses the SendKeys python module from
         http://www.rutherfurd.net/python/sendkeys/ .This is the best place
         to find documentation on what to use for the **keys**
+
+        If **burst** is True the keys are sent by large chunks of SendInput
+        with no pause between the keys (e.g. for long texts), only the
+        explicit {PAUSE n} actions are waited for.
+
+        If **paced** is True the keys are sent in bursts adapted to the
+        speed of the application: the GUI thread is waited for after each
+        burst and the bursts grow while it keeps up (**pause** is not used).
+
+        If **fast_text** is True and the keys are printable characters only
+        (no modifiers, virtual keys or pauses), a control which supports it
+        (e.g. an Edit control) gets the text by a message instead of the
+        keyboard input. The other keys are typed as usual.
         """
         self.verify_actionable()
 
+        if isinstance(keys, six.text_type):
+            aligned_keys = keys
+        elif isinstance(keys, six.binary_type):
+            aligned_keys = keys.decode(locale.getpreferredencoding())
+        else:
+            # convert a non-string input
+            aligned_keys = six.text_type(keys)
+
+        path = ''
+        if fast_text:
+            text = keyparser.literal_text(keyparser.compile_keys(
+                aligned_keys + '\n', with_spaces, with_tabs, with_newlines))
+            if text is not None and self._replace_selection(text):
+                self.actions.log('Typed text to the ' + self.friendly_class_name() +
+                                 ' by a message: ' + aligned_keys)
+                return self
+            path = ' by the keyboard (fast_text is not applicable)'
+
         if pause is None:
             pause = Timings.after_sendkeys_key_wait
 
@@ -800,14 +860,6 @@ class BaseWrapper(object):
             # TODO: UIA stuff maybe
             pass
 
-        if isinstance(keys, six.text_type):
-            aligned_keys = keys
-        elif isinstance(keys, six.binary_type):
-            aligned_keys = keys.decode(locale.getpreferredencoding())
-        else:
-            # convert a non-string input
-            aligned_keys = six.text_type(keys)
-
         # Play the keys to the active window
         SendKeys.SendKeys(
             aligned_keys + '\n',
@@ -815,7 +867,10 @@ class BaseWrapper(object):
             with_spaces,
             with_tabs,
             with_newlines,
-            turn_off_numlock)
+            turn_off_numlock,
+            burst,
+            paced,
+            self._paced_wait_idle())
 
         # detach the python process from the window's process
         if self.element_info.handle:
@@ -831,11 +886,100 @@ class BaseWrapper(object):
             # TODO: get WaitGuiThreadIdle function for elements without handle
             pass
 
-        self.actions.log('Typed text to the ' + self.friendly_class_name() + ': ' + aligned_keys)
+        self.actions.log('Typed text to the ' + self.friendly_class_name() + path + ': ' + aligned_keys)
         return self
     # Non PEP-8 alias
     TypeKeys = type_keys
 
+    #-----------------------------------------------------------
+    def _paced_wait_idle(self):
+        """Return the function which waits for the element after a paced burst
+
+        The GUI thread of the element's window is waited for, the foreground
+        window only if the element has no handle.
+        """
+        if self.element_info.handle:
+            handle = self.handle
+            return lambda: SendKeys.wait_window_idle(handle)
+        return SendKeys.wait_foreground_idle
+
+    #-----------------------------------------------------------
+    def _replace_selection(self, text):
+        """Replace the selection by the text without the keyboard input
+
+        Return False if the element doesn't support it (the fast path
+        of type_keys() is not used then).
+        """
+        return False
+
+    #-----------------------------------------------------------
+    def type_keys_stream(
+        self,
+        source,
+        chunk_size = keyparser.STREAM_CHUNK_SIZE,
+        pause = None,
+        with_spaces = False,
+        with_tabs = False,
+        with_newlines = False,
+        set_foreground = True,
+        burst = True,
+        paced = False):
+        """
+        Type keys from a large source chunk by chunk
+
+        **source** is a string, a file-like object or an iterable of strings
+        (byte strings are decoded with the preferred encoding). The keys are
+        parsed and sent by chunks of about **chunk_size** characters, so the
+        memory doesn't depend on the size of the source. The next chunk is
+        not sent until the GUI thread has processed the previous one, a
+        TimeoutError is raised if it takes longer than
+        ``Timings.stream_idle_timeout``. A ValueError is raised if a group
+        or braces are not closed in ``keyparser.STREAM_MAX_KEY_SIZE``
+        characters. Only the number of the typed keys and the rate are logged.
+
+        The rest arguments are the same as for type_keys() but the keys
+        are sent in the burst mode by default.
+        """
+        self.verify_actionable()
+
+        if pause is None:
+            pause = Timings.after_sendkeys_key_wait
+
+        if set_foreground:
+            self.set_focus()
+
+        # attach the Python process with the process that self is in
+        if self.element_info.handle:
+            window_thread_id, pid = win32process.GetWindowThreadProcessId(int(self.handle))
+            win32functions.AttachThreadInput(win32functions.GetCurrentThreadId(), window_thread_id, win32defines.TRUE)
+
+        start = time.time()
+        typed = 0
+        try:
+            for chunk in keyparser.iter_key_chunks(
+                    source, chunk_size, with_spaces, with_tabs, with_newlines):
+                # the chunks are not memoized, they are typed only once
+                program = keyparser.KeyProgram(
+                    keyparser.parse(chunk, with_spaces, with_tabs, with_newlines))
+                SendKeys.send_program(program, pause, burst, paced, self._paced_wait_idle())
+                typed += len(program)
+
+                # let the application process the chunk before the next one
+                if self.element_info.handle and not win32functions.WaitGuiThreadIdle(
+                        self.handle, Timings.stream_idle_timeout):
+                    raise TimeoutError('The {0} did not process the typed keys in {1} s '
+                                       '({2} keys typed)'.format(self.friendly_class_name(),
+                                                                 Timings.stream_idle_timeout, typed))
+        finally:
+            # detach the python process from the window's process
+            if self.element_info.handle:
+                win32functions.AttachThreadInput(win32functions.GetCurrentThreadId(), window_thread_id, win32defines.FALSE)
+
+        elapsed = time.time() - start
+        self.actions.log('Typed {0} keys to the {1} in {2:.2f} s ({3:.0f} keys/s)'.format(
+            typed, self.friendly_class_name(), elapsed, typed / elapsed if elapsed else 0))
+        return self
+
     #-----------------------------------------------------------
     def set_focus(self):
         "Set the focus to this element"
@@ -0,0 +1,129 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+"""Bounded caches and versioned JSON files shared by the pywinauto modules
+
+* :class:`LRUCache` keeps the most recently used values only
+  (e.g. the compiled key programs, the best_match results).
+* :func:`save_versioned` and :func:`load_versioned` store the data with
+  the version of its format (e.g. the timings profiles, the resolution
+  hints, the best_match memo).
+"""
+from __future__ import unicode_literals
+
+import json
+import threading
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python 2.6
+    from ordereddict import OrderedDict
+
+
+#=========================================================================
+class LRUCache(object):
+    """Thread safe bounded cache (the least recently used values are dropped)
+
+    * **size** - the maximum number of the values to keep
+    * **hits** - the number of the values found in the cache
+    * **misses** - the number of the keys which were not in the cache
+    """
+
+    def __init__(self, size):
+        """Initialize an empty cache"""
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        # key: value, the least recently used first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        "Return the number of the values"
+        return len(self._entries)
+
+    def get(self, key):
+        "Return the value of the key (None if unknown)"
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries[key] = value
+            return value
+
+    def put(self, key, value):
+        "Remember the value (drop the least recently used values)"
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+            while len(self._entries) > self.size:
+                self._entries.popitem(last = False)
+
+    def pop(self, key):
+        "Remove the value of the key and return it (None if unknown)"
+        with self._lock:
+            return self._entries.pop(key, None)
+
+    def remove_if(self, predicate):
+        "Remove the values of the keys matching the predicate"
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def items(self):
+        "Return the list of (key, value) pairs, the least recently used first"
+        with self._lock:
+            return list(self._entries.items())
+
+    def clear(self):
+        "Remove all the values"
+        with self._lock:
+            self._entries.clear()
+
+
+#=========================================================================
+def save_versioned(filename, version, field, data):
+    """Save the data to a JSON file as the field next to the format version"""
+    with open(filename, 'w') as data_file:
+        json.dump({'version': version, field: data}, data_file,
+                  indent = 2, sort_keys = True)
+
+
+def load_versioned(filename, version, field, description):
+    """Return the field of a JSON file saved by save_versioned()
+
+    * **description** - what the file keeps (for the error messages)
+
+    Raise ValueError if it is not a JSON file of the version.
+    """
+    with open(filename, 'r') as data_file:
+        try:
+            data = json.load(data_file)
+        except ValueError:
+            raise ValueError('"{0}" is not a file of {1}'.format(filename, description))
+
+    if not isinstance(data, dict) or data.get('version') != version or field not in data:
+        raise ValueError('Unsupported version of {0} in "{1}"'.format(description, filename))
+    return data[field]
@@ -1123,11 +1123,13 @@ class HwndWrapper(BaseWrapper):
 
                 # ensure foreground window has changed to the target
                 # or is 0(no foreground window) before the threads detaching
+                start = time.time()
                 timings.WaitUntil(
                     Timings.setfocus_timeout,
                     Timings.setfocus_retry,
                     lambda: win32gui.GetForegroundWindow()
                     in [self.top_level_parent().handle, 0])
+                timings.calibration.record('setfocus_timeout', time.time() - start)
 
                 # get the threads again to check they are still valid.
                 cur_fore_thread = win32process.GetWindowThreadProcessId(
@@ -832,6 +832,21 @@ class EditWrapper(HwndWrapper.HwndWrapper):
     SetText = set_edit_text
     SetEditText = set_edit_text
 
+    #-----------------------------------------------------------
+    def _replace_selection(self, text):
+        "Replace the selection by the text with EM_REPLACESEL (the fast path of type_keys)"
+        if six.PY3:
+            buffer = ctypes.create_unicode_buffer(text, size=len(text) + 1)
+        else:
+            try:
+                text = text.encode(locale.getpreferredencoding())
+            except UnicodeEncodeError:
+                # the ANSI message can't pass the text, type it
+                return False
+            buffer = ctypes.create_string_buffer(text, size=len(text) + 1)
+        self.send_message(win32defines.EM_REPLACESEL, True, ctypes.byref(buffer))
+        return True
+
     #-----------------------------------------------------------
     def select(self, start = 0, end = None):
         "Set the edit selection of the edit control"
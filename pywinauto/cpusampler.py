@@ -0,0 +1,186 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"""Background sampling of the CPU usage of a process
+
+A sampler thread measures the CPU usage of the process every interval and
+keeps the last samples in a ring buffer, so checking of the CPU usage is
+an instant read instead of a sleep for the whole interval::
+
+    app.start_cpu_sampler()
+    app.WaitCPUUsageLower(threshold=5)  # uses the samples
+    print(app.cpu_sampler.average)
+    app.stop_cpu_sampler()
+
+Any callable returning the cumulative CPU time of the process (in seconds)
+can be used as a source of the samples.
+"""
+
+import sys
+import time
+import threading
+import multiprocessing
+from collections import deque
+
+if sys.platform == 'win32':
+    import win32process
+
+from . import processhandles
+from .timings import Timings
+
+
+#=========================================================================
+class ProcessTimesSource(object):
+    "Cumulative CPU time of the process read through one reusable handle"
+
+    def __init__(self, pid):
+        """Acquire the process handle from the cache"""
+        self.pid = pid
+        self.handle, self.access = processhandles.cache.acquire_query(pid)
+        if not self.handle:
+            raise RuntimeError("Process with ID '{0}' could not be opened".format(pid))
+
+    def __call__(self):
+        "Return user + kernel time of the process in seconds"
+        times_dict = win32process.GetProcessTimes(self.handle)
+        return (times_dict['UserTime'] + times_dict['KernelTime']) / 1e7
+
+    def close(self):
+        "Release the process handle"
+        if self.handle:
+            processhandles.cache.release(self.pid, self.access)
+            self.handle = None
+
+
+#=========================================================================
+class CPUUsageSampler(object):
+    """Measure the CPU usage of a process in a background thread
+
+    * **source** - a callable returning the cumulative CPU time in seconds
+    * **interval** - how often to take a sample (default: ``Timings.cpu_usage_interval``)
+    * **size** - the number of the last samples to keep
+    * **cpu_count** - the number of processors (default: ``multiprocessing.cpu_count()``)
+
+    The samples are CPU usage percentages of all the processors during
+    the interval (the same as :func:`pywinauto.application.Application.CPUUsage`).
+    """
+
+    def __init__(self, source, interval = None, size = 10, cpu_count = None):
+        """Initialize the sampler (it's not started)"""
+        if interval is None:
+            interval = Timings.cpu_usage_interval
+        if cpu_count is None:
+            cpu_count = multiprocessing.cpu_count()
+
+        self.source = source
+        self.interval = interval
+        self.cpu_count = cpu_count
+        self.samples = deque(maxlen = size)
+        self.sample_count = 0
+        self.error = None
+
+        self._new_sample = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def is_running(self):
+        "Return True if the sampler thread is alive"
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        "Start the sampler thread (do nothing if it's running already)"
+        if self.is_running:
+            return self
+        self._stop_event.clear()
+        self.error = None
+        self._thread = threading.Thread(target = self._run, name = 'CPUUsageSampler')
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        "Stop the sampler thread and close the source if it can be closed"
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+        if hasattr(self.source, 'close'):
+            self.source.close()
+
+    def _run(self):
+        "Take samples until stopped (or until the source fails)"
+        try:
+            last_cpu_time = self.source()
+            last_time = time.time()
+            while True:
+                self._stop_event.wait(self.interval)
+                if self._stop_event.is_set():
+                    break
+
+                cpu_time = self.source()
+                now = time.time()
+                elapsed = max(now - last_time, 1e-6)
+                usage = 100.0 * (cpu_time - last_cpu_time) / (elapsed * self.cpu_count)
+                last_cpu_time, last_time = cpu_time, now
+
+                with self._new_sample:
+                    self.samples.append(usage)
+                    self.sample_count += 1
+                    self._new_sample.notify_all()
+        except Exception as exc:
+            # e.g. the process has exited
+            self.error = exc
+            with self._new_sample:
+                self._new_sample.notify_all()
+
+    @property
+    def latest(self):
+        "Return the last sample (None if there are no samples)"
+        with self._new_sample:
+            if not self.samples:
+                return None
+            return self.samples[-1]
+
+    @property
+    def average(self):
+        "Return the moving average of the samples (None if there are no samples)"
+        with self._new_sample:
+            if not self.samples:
+                return None
+            return sum(self.samples) / len(self.samples)
+
+    def wait_sample(self, after_count = 0, timeout = None):
+        """Wait until the number of samples is more than after_count
+
+        Return the last sample or None if the timeout has expired
+        or the sampler is not running.
+        """
+        if timeout is None:
+            timeout = self.interval * 2 + Timings.cpu_usage_interval
+        end_time = time.time() + timeout
+
+        with self._new_sample:
+            while self.sample_count <= after_count:
+                time_left = end_time - time.time()
+                if time_left <= 0 or self.error is not None or not self.is_running:
+                    return None
+                self._new_sample.wait(min(time_left, self.interval))
+            return self.samples[-1]
@@ -0,0 +1,221 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"""Page objects: dialogs described by named controls resolved at once
+
+Each attribute of a window specification resolves the control again
+(walking the dialog and matching the names every time). A DialogSpec
+describes the controls of a dialog by logical names and resolves all
+of them with one walk of the dialog and one build of the names map::
+
+    save_as = DialogSpec({
+        'file_name': 'FileNameEdit',                         # best_match
+        'save': {'title': 'Save', 'class_name': 'Button'},   # criteria
+        })
+
+    page = save_as.bind(app.SaveAs)
+    page.file_name.type_keys('report.txt')
+    page.save.click()
+
+The controls of a bound dialog are already resolved wrappers. Before a
+control is returned it's checked cheaply (its class name, handle and
+control id are compared) and the whole dialog is bound again if the
+control has gone.
+"""
+
+from . import six
+from . import findwindows
+from . import findbestmatch
+from . import controls
+from . import timings
+from .timings import Timings, WaitUntilPasses, TimeoutError
+
+
+_RESOLUTION_ERRORS = (findwindows.ElementNotFoundError,
+                      findwindows.WindowAmbiguousError,
+                      findbestmatch.MatchError,
+                      controls.InvalidWindowHandle,
+                      controls.InvalidElement)
+
+
+#=========================================================================
+class DialogSpec(object):
+    """Mapping of logical names to the controls of a dialog
+
+    * **controls** - a dictionary of logical names to best_match strings
+      or dictionaries of criteria (see :func:`pywinauto.findwindows.find_elements`)
+    """
+
+    def __init__(self, controls):
+        """Check the criteria of the controls"""
+        self.controls = {}
+        for name, criteria in controls.items():
+            if isinstance(criteria, six.string_types):
+                criteria = {'best_match': criteria}
+            elif not isinstance(criteria, dict):
+                raise TypeError('Criteria of "{0}" should be a string or a dict, not {1}'.format(
+                    name, type(criteria)))
+            self.controls[name] = criteria
+
+    def bind(self, dialog, timeout = None, retry_interval = None):
+        """Resolve all the controls of the dialog and return a :class:`BoundDialog`
+
+        * **dialog** - a WindowSpecification of the dialog (or its wrapper)
+        * **timeout** - how long to wait for the controls (default: ``Timings.window_find_timeout``)
+        * **retry_interval** - how long to sleep between the attempts
+          (default: ``Timings.window_find_retry``)
+        """
+        return BoundDialog(self, dialog, timeout, retry_interval)
+
+    def resolve(self, dialog):
+        """Resolve all the controls of the dialog wrapper at once
+
+        Return a dictionary of logical names to the wrappers.
+        """
+        backend_obj = dialog.backend
+        parent = dialog.element_info
+
+        resolved = {}
+        with findwindows.top_level_snapshot():
+            name_control_map = None
+            for name, criteria in self.controls.items():
+                if list(criteria) == ['best_match']:
+                    if name_control_map is None:
+                        name_control_map = self.__build_names_map(backend_obj, parent)
+                    ctrls = findbestmatch.find_best_control_matches_in_dict(
+                        criteria['best_match'], name_control_map)
+                    if len(ctrls) > 1:
+                        raise findwindows.WindowAmbiguousError(
+                            "There are {0} elements that match '{1}'".format(len(ctrls), name))
+                    resolved[name] = ctrls[0]
+                else:
+                    # the descendants are enumerated only once in the snapshot
+                    criteria = dict(criteria, parent = parent, top_level_only = False,
+                                    backend = backend_obj.name)
+                    resolved[name] = backend_obj.generic_wrapper_class(
+                        findwindows.find_element(**criteria))
+        return resolved
+
+    @staticmethod
+    def __build_names_map(backend_obj, parent):
+        "Build the names map of the visible controls of the dialog"
+        elements = findwindows.find_elements(
+            parent = parent, top_level_only = False, backend = backend_obj.name)
+
+        wrappers = []
+        for elem in elements:
+            try:
+                if elem.class_name:
+                    wrappers.append(backend_obj.generic_wrapper_class(elem))
+            except (controls.InvalidWindowHandle, controls.InvalidElement):
+                # the control has gone since the elements were enumerated
+                continue
+        return findbestmatch.build_unique_dict(wrappers)
+
+
+#=========================================================================
+def _identity(element_info):
+    """Return the (class name, handle, control id) of the element
+
+    A handle can be recycled by a new control of the same class,
+    so the control id is compared too (if the back-end supports it).
+    """
+    try:
+        control_id = element_info.control_id
+    except NotImplementedError:
+        control_id = None
+    return element_info.class_name, element_info.handle, control_id
+
+
+#=========================================================================
+class BoundDialog(object):
+    """Dialog with the resolved controls of a :class:`DialogSpec`
+
+    The controls are available as attributes (or items) by logical names.
+    The dialog wrapper is available as ``dialog``.
+    """
+
+    def __init__(self, spec, dialog, timeout = None, retry_interval = None):
+        """Bind the dialog"""
+        self._spec = spec
+        self._window_spec = None
+        if not hasattr(dialog, 'element_info'):
+            self._window_spec = dialog
+        self.dialog = dialog
+        self._timeout = timeout
+        self._retry_interval = retry_interval
+        self._controls = {}
+        self._identities = {}
+        self.rebind()
+
+    def rebind(self):
+        "Resolve the dialog and all the controls again"
+        timeout = self._timeout
+        if timeout is None:
+            timeout = Timings.window_find_timeout
+        retry_interval = self._retry_interval
+        if retry_interval is None:
+            retry_interval = Timings.window_find_retry
+
+        def resolve():
+            "Resolve the dialog (it can be re-created meanwhile) and its controls"
+            if self._window_spec is not None:
+                self.dialog = self._window_spec.WrapperObject()
+            return self._spec.resolve(self.dialog)
+
+        # the waits of the dialog resolution never outlive the timeout
+        with timings.deadline(timeout):
+            try:
+                self._controls = WaitUntilPasses(
+                    timeout, retry_interval, resolve, _RESOLUTION_ERRORS)
+            except TimeoutError as e:
+                raise e.original_exception
+
+        self._identities = dict(
+            (name, _identity(ctrl.element_info)) for name, ctrl in self._controls.items())
+
+    def __is_valid(self, name, ctrl):
+        "Check cheaply that the control is the same element"
+        try:
+            return _identity(ctrl.element_info) == self._identities[name]
+        except Exception:
+            return False
+
+    def __getattr__(self, name):
+        "Return the resolved control by the logical name"
+        if name.startswith('_') or name not in self._spec.controls:
+            raise AttributeError("The dialog has no control '{0}'".format(name))
+
+        ctrl = self._controls[name]
+        if not self.__is_valid(name, ctrl):
+            self.rebind()
+            ctrl = self._controls[name]
+        return ctrl
+
+    def __getitem__(self, name):
+        "Return the resolved control by the logical name"
+        try:
+            return self.__getattr__(name)
+        except AttributeError:
+            raise KeyError(name)
+
+    def __dir__(self):
+        "Add the logical names to the attributes"
+        return sorted(set(dir(type(self))) | set(self.__dict__) | set(self._spec.controls))
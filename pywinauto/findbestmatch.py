@@ -465,6 +465,39 @@ def build_unique_dict(controls):
     return name_control_map
 
 
+#====================================================================
+def iter_unique_names(controls):
+    """Yield (control, names) for each control as soon as its names are known
+
+    The names are made unique the same way as in build_unique_dict()
+    but only the names are kept (not the whole map of the controls).
+    The aliases "name0" and "name1" of the first of several controls
+    with the same name are not yielded as that control is yielded
+    before the next ones are seen ("name" refers to it anyway).
+    """
+    # get the visible text controls so that we can get
+    # the closest text if the control has no text
+    text_ctrls = [ctrl_ for ctrl_ in controls
+                  if ctrl_.is_visible() and ctrl_.window_text() and ctrl_.can_be_label]
+
+    used_names = set()
+    for ctrl in controls:
+        unique_names = []
+        for name in get_control_names(ctrl, controls, text_ctrls):
+            # the same as UniqueDict.__setitem__()
+            if name in used_names:
+                unique_name = name
+                counter = 2
+                while unique_name in used_names:
+                    unique_name = name + str(counter)
+                    counter += 1
+                used_names.update([name + '0', name + '1'])
+                name = unique_name
+            used_names.add(name)
+            unique_names.append(name)
+        yield ctrl, unique_names
+
+
 #====================================================================
 def find_best_control_matches(search_text, controls):
     """Returns the control that is the the best match to search_text
@@ -491,6 +524,17 @@ def find_best_control_matches(search_text, controls):
 #        for name in ctrl_names:
 #            name_control_map[name] = ctrl
 
+    return find_best_control_matches_in_dict(search_text, name_control_map)
+
+
+#====================================================================
+def find_best_control_matches_in_dict(search_text, name_control_map):
+    """Returns the controls that are the best match to search_text
+
+    The same as find_best_control_matches but the names are taken from
+    the dictionary built by build_unique_dict, so the dictionary can be
+    reused to find many controls of the same dialog.
+    """
     search_text = six.text_type(search_text)
 
     best_ratio, best_texts = name_control_map.FindBestMatches(search_text)
@@ -26,11 +26,14 @@ from __future__ import unicode_literals
 
 import re
 import ctypes
+import threading
+from contextlib import contextmanager
 
 from . import six
 from . import win32functions
 from . import win32structures
 from . import findbestmatch
+from . import matchmemo
 from . import controls
 from .backend import registry
 
@@ -52,6 +55,87 @@ class ElementAmbiguousError(Exception):
     "There was more then one element that matched"
     pass
 
+# memo of best_match results (pywinauto.matchmemo.BestMatchMemo),
+# it's not used if None
+best_match_memo = None
+
+_snapshot = threading.local()
+
+#=========================================================================
+@contextmanager
+def top_level_snapshot():
+    """Enumerate the top level elements only once inside the block
+
+    All the searches for top level elements (in the current thread) reuse
+    the same list of top level elements of each back-end. It makes polling
+    of several window specifications at once cheaper. The index of the
+    elements by process (see :func:`process_index`) and the descendants
+    of a parent with a handle are built only once as well.
+    Nested blocks reuse the outer snapshot.
+    """
+    if getattr(_snapshot, 'elements', None) is not None:
+        # reuse the outer snapshot
+        yield
+        return
+
+    _snapshot.elements = {}
+    try:
+        yield
+    finally:
+        _snapshot.elements = None
+
+#=========================================================================
+def _top_level_elements(backend_obj):
+    "Return the top level elements of the back-end (from the snapshot if any)"
+    snapshot = getattr(_snapshot, 'elements', None)
+    if snapshot is None:
+        return backend_obj.element_info_class().children # root.children == enum_windows()
+
+    if backend_obj.name not in snapshot:
+        snapshot[backend_obj.name] = backend_obj.element_info_class().children
+    return list(snapshot[backend_obj.name])
+
+#=========================================================================
+def process_index(backend = None):
+    """Return a dictionary of the top level elements by process ID
+
+    The process of each top level element is read once per enumeration
+    (once per :func:`top_level_snapshot` block if any) and all the searches
+    of one process reuse the index. The elements keep the order of the
+    enumeration (Z-order for the native windows).
+
+    :func:`find_elements` uses the index inside a snapshot block only,
+    a single search filters by the process after the cheaper criteria.
+    """
+    if backend is None:
+        backend = registry.active_backend.name
+    backend_obj = registry.backends[backend]
+
+    snapshot = getattr(_snapshot, 'elements', None)
+    key = (backend_obj.name, 'process_index')
+    if snapshot is not None and key in snapshot:
+        return snapshot[key]
+
+    index = {}
+    for elem in _top_level_elements(backend_obj):
+        index.setdefault(elem.process_id, []).append(elem)
+
+    if snapshot is not None:
+        snapshot[key] = index
+    return index
+
+#=========================================================================
+def _descendants(backend_obj, parent):
+    "Return the descendants of the parent (from the snapshot if any)"
+    snapshot = getattr(_snapshot, 'elements', None)
+    if snapshot is None or not parent.handle:
+        return parent.descendants
+
+    key = (backend_obj.name, parent.handle)
+    if key not in snapshot:
+        snapshot[key] = parent.descendants
+    return list(snapshot[key])
+
 #=========================================================================
 def find_element(**kwargs):
     """Call find_elements and ensure that only one element is returned
@@ -138,7 +222,12 @@ def find_elements(class_name = None,
 
     if top_level_only:
         # find the top level elements
-        elements = backend_obj.element_info_class().children # root.children == enum_windows()
+        if process is not None and getattr(_snapshot, 'elements', None) is not None:
+            # the elements of the process only (from the index of the snapshot)
+            elements = list(process_index(backend_obj.name).get(process, []))
+            process = None
+        else:
+            elements = _top_level_elements(backend_obj)
 
         # if we have been given a parent
         if parent:
@@ -151,7 +240,7 @@ def find_elements(class_name = None,
             parent = backend_obj.element_info_class()
 
         # look for ALL children of that parent
-        elements = parent.descendants
+        elements = _descendants(backend_obj, parent)
 
         # if the ctrl_index has been specified then just return
         # that control
@@ -222,29 +311,30 @@ def find_elements(class_name = None,
         elements = [elem for elem in elements if elem.enabled]
 
     if best_match is not None:
-        wrapped_elems = []
-        for elem in elements:
-            try:
-                # TODO: can't skip invalid handles because UIA element can have no handle
-                # TODO: use className check for this ?
-                if elem.class_name:
-                    wrapped_elems.append(backend_obj.generic_wrapper_class(elem))
-                    #wrapped_elems.append(BaseWrapper(elem))
-            except (controls.InvalidWindowHandle,
-                    controls.InvalidElement):
-                # skip invalid handles - they have dissapeared
-                # since the list of elements was retrieved
-                continue
-        elements = findbestmatch.find_best_control_matches(best_match, wrapped_elems)
-
-        # convert found elements back to ElementInfo
-        backup_elements = elements[:]
-        elements = []
-        for elem in backup_elements:
-            if hasattr(elem, "element_info"):
-                elements.append(elem.element_info)
-            else:
-                elements.append(backend_obj.element_info_class(elem.handle))
+        memo = best_match_memo
+        found = None
+        if memo is not None:
+            fingerprint = matchmemo.fingerprint(elements)
+            memoized = memo.get(fingerprint, best_match)
+            if memoized is not None:
+                index, text = memoized
+                # the same structure of the dialog - skip the names map and
+                # the scoring if the found control still has the same text
+                if index < len(elements) and elements[index].rich_text == text:
+                    found = [elements[index]]
+                else:
+                    memo.reject(fingerprint, best_match)
+
+        if found is not None:
+            elements = found
+        else:
+            candidates = elements
+            elements = _best_matches(backend_obj, candidates, best_match)
+            if memo is not None and len(elements) == 1:
+                for index, candidate in enumerate(candidates):
+                    if candidate == elements[0]:
+                        memo.put(fingerprint, best_match, index, candidate.rich_text)
+                        break
 
     if predicate_func is not None:
         elements = [elem for elem in elements if predicate_func(elem)]
@@ -259,6 +349,33 @@ def find_elements(class_name = None,
 
     return elements
 
+#=========================================================================
+def _best_matches(backend_obj, elements, best_match):
+    "Return the elements with the best matching names (ElementInfo objects)"
+    wrapped_elems = []
+    for elem in elements:
+        try:
+            # TODO: can't skip invalid handles because UIA element can have no handle
+            # TODO: use className check for this ?
+            if elem.class_name:
+                wrapped_elems.append(backend_obj.generic_wrapper_class(elem))
+                #wrapped_elems.append(BaseWrapper(elem))
+        except (controls.InvalidWindowHandle,
+                controls.InvalidElement):
+            # skip invalid handles - they have dissapeared
+            # since the list of elements was retrieved
+            continue
+    found = findbestmatch.find_best_control_matches(best_match, wrapped_elems)
+
+    # convert found elements back to ElementInfo
+    elements = []
+    for elem in found:
+        if hasattr(elem, "element_info"):
+            elements.append(elem.element_info)
+        else:
+            elements.append(backend_obj.element_info_class(elem.handle))
+    return elements
+
 #=========================================================================
 def enum_windows():
     "Return a list of handles of all the top level windows"
@@ -34,6 +34,7 @@ import win32con
 from . import win32functions
 from . import win32defines
 from . import win32structures
+from . import processhandles
 from .actionlogger import ActionLogger
 
 
@@ -153,13 +154,16 @@ def isenabled(handle):
 def is64bitprocess(process_id):
     """Return True if the specified process is a 64-bit process on x64
        and False if it is only a 32-bit process running under Wow64.
-       Always return False for x86"""
+       Always return False for x86.
+       Raise a WindowsError if the process can't be opened"""
 
     from .sysinfo import is_x64_OS
     is32 = True
     if is_x64_OS():
-        phndl = win32api.OpenProcess(win32con.MAXIMUM_ALLOWED, 0, process_id)
-        if phndl:
+        with processhandles.query_handle(process_id) as phndl:
+            if not phndl:
+                # don't guess the bitness of a process we can't open
+                raise ctypes.WinError()
             is32 = win32process.IsWow64Process(phndl)
             #print("is64bitprocess, is32: %d, procid: %d" % (is32, process_id))
         
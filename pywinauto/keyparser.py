@@ -0,0 +1,645 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"""Parser of the SendKeys key sequences
+
+A key sequence string (e.g. ``"%{F4}"`` or ``"+(abc){ENTER 2}"``) is
+compiled into an immutable KeyProgram: parallel tuples of the kinds of
+the keys, their codes, their down/up states and their repeat counts. The
+programs of the short strings are memoized in a bounded cache, so the
+strings which are typed again and again are parsed only once::
+
+    program = compile_keys("Hello{SPACE}World{ENTER}")
+    for kind, code, state in program:
+        ...
+
+A large source (e.g. a file) can be split into chunks of complete keys
+by ``iter_key_chunks()`` and parsed chunk by chunk.
+
+The repetitions (e.g. ``{DOWN 10000}`` or ``{ab 50}``) are kept as run-length
+nodes, they are expanded only while the program is iterated.
+
+The module doesn't use the Win32 API, the programs are translated into
+the input events by ``SendKeysCtypes``.
+"""
+from __future__ import unicode_literals
+
+import codecs
+import locale
+import itertools
+
+from . import six
+from .cacheutils import LRUCache
+
+
+__all__ = ['KeySequenceError', 'KeyProgram', 'compile_keys']
+
+# the kinds of the keys in a program
+KEY_UNICODE = 0   # the code is a character code sent as Unicode
+KEY_VIRTUAL = 1   # the code is a virtual key code
+KEY_ESCAPED = 2   # the code is a character code sent as a virtual key (with modifiers)
+KEY_PAUSE = 3     # the code is a pause in seconds
+KEY_GROUP = 4     # the code is a KeyProgram repeated as a whole
+
+# the states of the keys in a program
+KEY_DOWN = 1
+KEY_UP = 2
+KEY_DOWN_UP = KEY_DOWN | KEY_UP
+
+# the maximum number of the memoized programs
+PROGRAM_CACHE_SIZE = 256
+
+# the longest string whose program is memoized (the longer ones are
+# compiled every time, so a few large texts can't fill the memory)
+PROGRAM_CACHE_MAX_LENGTH = 1024
+
+# the approximate number of the characters in a chunk of iter_key_chunks()
+STREAM_CHUNK_SIZE = 4096
+
+# the maximum number of the characters of an unclosed key (e.g. a group in
+# parentheses) which iter_key_chunks() waits for
+STREAM_MAX_KEY_SIZE = 1024 * 1024
+
+VK_SHIFT        = 16
+VK_CONTROL      = 17
+VK_MENU         = 18
+
+# 'codes' recognized as {CODE( repeat)?}
+CODES = {
+    'BACK':     8,
+    'BACKSPACE':8,
+    'BKSP':     8,
+    'BREAK':    3,
+    'BS':       8,
+    'CAP':      20,
+    'CAPSLOCK': 20,
+    'DEL':      46,
+    'DELETE':   46,
+    'DOWN':     40,
+    'END':      35,
+    'ENTER':    13,
+    'ESC':      27,
+    'F1':       112,
+    'F2':       113,
+    'F3':       114,
+    'F4':       115,
+    'F5':       116,
+    'F6':       117,
+    'F7':       118,
+    'F8':       119,
+    'F9':       120,
+    'F10':      121,
+    'F11':      122,
+    'F12':      123,
+    'F13':      124,
+    'F14':      125,
+    'F15':      126,
+    'F16':      127,
+    'F17':      128,
+    'F18':      129,
+    'F19':      130,
+    'F20':      131,
+    'F21':      132,
+    'F22':      133,
+    'F23':      134,
+    'F24':      135,
+    'HELP':     47,
+    'HOME':     36,
+    'INS':      45,
+    'INSERT':   45,
+    'LEFT':     37,
+    'LWIN':     91,
+    'NUMLOCK':  144,
+    'PGDN':     34,
+    'PGUP':     33,
+    'PRTSC':    44,
+    'RIGHT':    39,
+    'RMENU':    165,
+    'RWIN':     92,
+    'SCROLLLOCK':145,
+    'SPACE':     32,
+    'TAB':       9,
+    'UP':        38,
+
+    'VK_ACCEPT': 30,
+    'VK_ADD':    107,
+    'VK_APPS':    93,
+    'VK_ATTN':    246,
+    'VK_BACK':    8,
+    'VK_CANCEL':  3,
+    'VK_CAPITAL': 20,
+    'VK_CLEAR':   12,
+    'VK_CONTROL': 17,
+    'VK_CONVERT': 28,
+    'VK_CRSEL':   247,
+    'VK_DECIMAL': 110,
+    'VK_DELETE':  46,
+    'VK_DIVIDE':  111,
+    'VK_DOWN':    40,
+    'VK_END':     35,
+    'VK_EREOF':   249,
+    'VK_ESCAPE':  27,
+    'VK_EXECUTE': 43,
+    'VK_EXSEL':   248,
+    'VK_F1':      112,
+    'VK_F2':      113,
+    'VK_F3':      114,
+    'VK_F4':      115,
+    'VK_F5':      116,
+    'VK_F6':      117,
+    'VK_F7':      118,
+    'VK_F8':      119,
+    'VK_F9':      120,
+    'VK_F10':     121,
+    'VK_F11':     122,
+    'VK_F12':     123,
+    'VK_F13':     124,
+    'VK_F14':     125,
+    'VK_F15':     126,
+    'VK_F16':     127,
+    'VK_F17':     128,
+    'VK_F18':     129,
+    'VK_F19':     130,
+    'VK_F20':     131,
+    'VK_F21':     132,
+    'VK_F22':     133,
+    'VK_F23':     134,
+    'VK_F24':     135,
+    'VK_FINAL':   24,
+    'VK_HANGEUL':  21,
+    'VK_HANGUL':   21,
+    'VK_HANJA':    25,
+    'VK_HELP':     47,
+    'VK_HOME':     36,
+    'VK_INSERT':   45,
+    'VK_JUNJA':    23,
+    'VK_KANA':     21,
+    'VK_KANJI':    25,
+    'VK_LBUTTON':   1,
+    'VK_LCONTROL':162,
+    'VK_LEFT':     37,
+    'VK_LMENU':   164,
+    'VK_LSHIFT':  160,
+    'VK_LWIN':     91,
+    'VK_MBUTTON':    4,
+    'VK_MENU':        18,
+    'VK_MODECHANGE':  31,
+    'VK_MULTIPLY':   106,
+    'VK_NEXT':        34,
+    'VK_NONAME':     252,
+    'VK_NONCONVERT':  29,
+    'VK_NUMLOCK':    144,
+    'VK_NUMPAD0':     96,
+    'VK_NUMPAD1':     97,
+    'VK_NUMPAD2':     98,
+    'VK_NUMPAD3':     99,
+    'VK_NUMPAD4':    100,
+    'VK_NUMPAD5':    101,
+    'VK_NUMPAD6':    102,
+    'VK_NUMPAD7':    103,
+    'VK_NUMPAD8':    104,
+    'VK_NUMPAD9':    105,
+    'VK_OEM_CLEAR':  254,
+    'VK_PA1':        253,
+    'VK_PAUSE':       19,
+    'VK_PLAY':       250,
+    'VK_PRINT':       42,
+    'VK_PRIOR':       33,
+    'VK_PROCESSKEY': 229,
+    'VK_RBUTTON':      2,
+    'VK_RCONTROL':   163,
+    'VK_RETURN':      13,
+    'VK_RIGHT':       39,
+    'VK_RMENU':      165,
+    'VK_RSHIFT':     161,
+    'VK_RWIN':        92,
+    'VK_SCROLL':     145,
+    'VK_SELECT':      41,
+    'VK_SEPARATOR':  108,
+    'VK_SHIFT':       16,
+    'VK_SNAPSHOT':    44,
+    'VK_SPACE':       32,
+    'VK_SUBTRACT':   109,
+    'VK_TAB':          9,
+    'VK_UP':          38,
+    'ZOOM':          251,
+}
+# reverse the CODES dict to make it easy to look up a particular code name
+CODE_NAMES = dict((entry[1], entry[0]) for entry in CODES.items())
+
+# modifier keys
+MODIFIERS = {
+    '+': VK_SHIFT,
+    '^': VK_CONTROL,
+    '%': VK_MENU,
+}
+
+
+class KeySequenceError(Exception):
+    """Exception raised when a key sequence string has a syntax error"""
+
+    def __str__(self):
+        return ' '.join(self.args)
+
+
+
+#=========================================================================
+class KeyProgram(object):
+    """Immutable sequence of the parsed keys
+
+    * **kinds** - the tuple of the kinds of the keys (KEY_UNICODE, ...)
+    * **codes** - the tuple of the codes (a character, a virtual key or seconds)
+    * **states** - the tuple of the states (KEY_DOWN, KEY_UP or both)
+    * **counts** - the tuple of the repeat counts
+
+    Iterating the program yields the expanded (kind, code, state) tuples,
+    the length of the program is the number of the expanded keys.
+    """
+
+    __slots__ = ('kinds', 'codes', 'states', 'counts', '_length')
+
+    def __init__(self, nodes):
+        """Build the program from the (kind, code, state, count) nodes"""
+        nodes = list(nodes)
+        object.__setattr__(self, 'kinds', tuple(node[0] for node in nodes))
+        object.__setattr__(self, 'codes', tuple(node[1] for node in nodes))
+        object.__setattr__(self, 'states', tuple(node[2] for node in nodes))
+        object.__setattr__(self, 'counts', tuple(node[3] for node in nodes))
+        length = 0
+        for kind, code, _, count in nodes:
+            length += count * (len(code) if kind == KEY_GROUP else 1)
+        object.__setattr__(self, '_length', length)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('KeyProgram is immutable')
+
+    def __len__(self):
+        "Return the number of the expanded keys"
+        return self._length
+
+    def __iter__(self):
+        "Iterate the expanded (kind, code, state) tuples"
+        return expand(self.nodes())
+
+    def nodes(self):
+        "Return the list of the (kind, code, state, count) nodes"
+        return list(zip(self.kinds, self.codes, self.states, self.counts))
+
+    def __eq__(self, other):
+        return isinstance(other, KeyProgram) and self.nodes() == other.nodes()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self.kinds, self.codes, self.states, self.counts))
+
+    def __repr__(self):
+        return '<KeyProgram of {0} keys>'.format(len(self))
+
+
+#=========================================================================
+def expand(nodes):
+    "Iterate the (kind, code, state) tuples of the run-length nodes"
+    for kind, code, state, count in nodes:
+        if kind == KEY_GROUP:
+            for _ in itertools.repeat(None, count):
+                for key in code:
+                    yield key
+        else:
+            for key in itertools.repeat((kind, code, state), count):
+                yield key
+
+
+#=========================================================================
+def parse_code(code):
+    "Return the (kind, code, state, count) nodes of a key or sequence of keys in braces"
+    keys = []
+    # it is a known code (e.g. {DOWN}, {ENTER}, etc)
+    if code in CODES:
+        keys.append((KEY_VIRTUAL, CODES[code], KEY_DOWN_UP, 1))
+
+    # it is an escaped modifier e.g. {%}, {^}, {+}
+    elif len(code) == 1:
+        keys.append((KEY_UNICODE, ord(code), KEY_DOWN_UP, 1))
+
+    # it is a repetition or a pause  {DOWN 5}, {PAUSE 1.3}
+    elif ' ' in code:
+        # e.g. {a } or { {} has no key or no count
+        if len(code.split()) < 2:
+            raise KeySequenceError('invalid repetition %s'% code)
+        to_repeat, count = code.rsplit(None, 1)
+        if to_repeat == "PAUSE":
+            try:
+                pause_time = float(count)
+            except ValueError:
+                raise KeySequenceError('invalid pause time %s'% count)
+            # a negative pause can't be slept, an infinite one would never end
+            if not 0 <= pause_time < float('inf'):
+                raise KeySequenceError('invalid pause time %s'% count)
+            keys.append((KEY_PAUSE, pause_time, KEY_DOWN_UP, 1))
+
+        else:
+            try:
+                count = int(count)
+            except ValueError:
+                raise KeySequenceError(
+                    'invalid repetition count %s'% count)
+
+            # the repetition is kept as a single run-length node
+            if count <= 0:
+                pass
+            # If the value in to_repeat is a VK e.g. DOWN
+            # we need to add the code repeated
+            elif to_repeat in CODES:
+                keys.append((KEY_VIRTUAL, CODES[to_repeat], KEY_DOWN_UP, count))
+            # otherwise parse the keys and repeat them
+            else:
+                to_repeat = parse(to_repeat)
+                if len(to_repeat) == 1 and to_repeat[0][3] == 1:
+                    keys.append(to_repeat[0][:3] + (count,))
+                elif to_repeat:
+                    keys.append((KEY_GROUP, KeyProgram(to_repeat), KEY_DOWN_UP, count))
+    else:
+        raise RuntimeError("Unknown code: %s"% code)
+
+    return keys
+
+
+#=========================================================================
+def parse(string,
+          with_spaces = False,
+          with_tabs = False,
+          with_newlines = False,
+          modifiers = None):
+    """Return the (kind, code, state, count) nodes of the key sequence
+
+    **modifiers** is the list of the virtual keys of the pressed modifiers,
+    it's shared with the nested calls parsing the text in parentheses.
+    """
+    keys = []
+    if not modifiers:
+        modifiers = []
+    index = 0
+    while index < len(string):
+
+        c = string[index]
+        index += 1
+        # check if one of CTRL, SHIFT, ALT has been pressed
+        if c in MODIFIERS:
+            modifier = MODIFIERS[c]
+            # remember that we are currently modified
+            modifiers.append(modifier)
+            # hold down the modifier key
+            keys.append((KEY_VIRTUAL, modifier, KEY_DOWN, 1))
+            continue
+
+        # Apply modifiers over a bunch of characters (not just one!)
+        elif c == "(":
+            # find the end of the bracketed text
+            end_pos = string.find(")", index)
+            if end_pos == -1:
+                raise KeySequenceError('`)` not found')
+            keys.extend(parse(string[index:end_pos], modifiers = modifiers))
+            index = end_pos + 1
+
+        # Escape or named key
+        elif c == "{":
+            # We start searching from index + 1 to account for the case {}}
+            end_pos = string.find("}", index + 1)
+            if end_pos == -1:
+                raise KeySequenceError('`}` not found')
+
+            code = string[index:end_pos]
+            index = end_pos + 1
+            keys.extend(parse_code(code))
+
+        # unmatched ")"
+        elif c == ')':
+            raise KeySequenceError('`)` should be preceeded by `(`')
+
+        # unmatched "}"
+        elif c == '}':
+            raise KeySequenceError('`}` should be preceeded by `{`')
+
+        # so it is a normal character
+        else:
+            # don't output white space unless flags to output have been set
+            if (c == ' ' and not with_spaces or
+                    c == '\t' and not with_tabs or
+                    c == '\n' and not with_newlines):
+                continue
+
+            # output newline
+            if c in ('~', '\n'):
+                keys.append((KEY_VIRTUAL, CODES["ENTER"], KEY_DOWN_UP, 1))
+
+            elif modifiers:
+                keys.append((KEY_ESCAPED, ord(c), KEY_DOWN_UP, 1))
+
+            else:
+                keys.append((KEY_UNICODE, ord(c), KEY_DOWN_UP, 1))
+
+        # as we have handled the text - release the modifiers
+        while modifiers:
+            keys.append((KEY_VIRTUAL, modifiers.pop(), KEY_UP, 1))
+
+    # just in case there were any modifiers left pressed - release them
+    while modifiers:
+        keys.append((KEY_VIRTUAL, modifiers.pop(), KEY_UP, 1))
+
+    return keys
+
+
+#=========================================================================
+class ProgramCache(LRUCache):
+    """Bounded cache of the compiled programs (the least recently used are dropped)
+
+    * **size** - the maximum number of the programs to keep
+    * **hits** - the number of the programs found in the cache
+    * **misses** - the number of the compiled programs
+    """
+
+    def __init__(self, size = PROGRAM_CACHE_SIZE):
+        """Initialize an empty cache"""
+        LRUCache.__init__(self, size)
+
+
+# the cache used by compile_keys()
+program_cache = ProgramCache()
+
+
+#=========================================================================
+def compile_keys(string,
+                 with_spaces = False,
+                 with_tabs = False,
+                 with_newlines = False):
+    "Return the memoized KeyProgram of the key sequence"
+    key = (string, bool(with_spaces), bool(with_tabs), bool(with_newlines))
+    if len(string) > PROGRAM_CACHE_MAX_LENGTH:
+        return KeyProgram(parse(*key))
+
+    program = program_cache.get(key)
+    if program is None:
+        program = KeyProgram(parse(*key))
+        program_cache.put(key, program)
+    return program
+
+
+#=========================================================================
+def literal_text(program):
+    """Return the text of the program if it types printable characters only
+
+    Return None if the program has modifiers, virtual keys (e.g. {ENTER}),
+    pauses or control characters.
+    """
+    text = []
+    for kind, code, state, count in program.nodes():
+        if kind == KEY_GROUP:
+            group_text = literal_text(code)
+            if group_text is None:
+                return None
+            text.append(group_text * count)
+        elif kind == KEY_UNICODE and state == KEY_DOWN_UP and code >= 32 and code != 127:
+            text.append(six.unichr(code) * count)
+        else:
+            return None
+    return ''.join(text)
+
+
+#=========================================================================
+def _complete_keys_end(string, with_spaces, with_tabs, with_newlines):
+    """Return the end of the last complete key of the string (0 if there is none)
+    and the closing character of the incomplete key after it
+
+    A key is not complete if its braces or parentheses are not closed
+    or its modifiers are not followed by a key (no closing character then).
+    """
+    end = 0
+    modified = False
+    index = 0
+    while index < len(string):
+        c = string[index]
+        index += 1
+        if c in MODIFIERS:
+            modified = True
+            continue
+
+        if c == "(":
+            end_pos = string.find(")", index)
+            if end_pos == -1:
+                return end, ")"
+            index = end_pos + 1
+
+        elif c == "{":
+            # {}} is a valid key, so the closing brace is searched the same way as by parse()
+            end_pos = string.find("}", index + 1)
+            if end_pos == -1:
+                return end, "}"
+            index = end_pos + 1
+
+        # the skipped white space doesn't release the modifiers
+        elif (c == ' ' and not with_spaces or
+                c == '\t' and not with_tabs or
+                c == '\n' and not with_newlines) and modified:
+            continue
+
+        modified = False
+        end = index
+    return end, None
+
+
+def _read_text(source, chunk_size, encoding):
+    "Iterate the text pieces of a string, a file-like object or an iterable of strings"
+    if isinstance(source, (six.text_type, six.binary_type)):
+        pieces = (source[start:start + chunk_size]
+                  for start in range(0, len(source), chunk_size))
+    elif hasattr(source, 'read'):
+        pieces = iter(lambda: source.read(chunk_size), source.read(0))
+    else:
+        pieces = source
+
+    decoder = None
+    for piece in pieces:
+        if isinstance(piece, six.binary_type):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(encoding or locale.getpreferredencoding())()
+            piece = decoder.decode(piece)
+        yield piece
+
+    if decoder is not None:
+        yield decoder.decode(b'', final = True)
+
+
+def iter_key_chunks(source,
+                    chunk_size = STREAM_CHUNK_SIZE,
+                    with_spaces = False,
+                    with_tabs = False,
+                    with_newlines = False,
+                    encoding = None,
+                    max_key_size = STREAM_MAX_KEY_SIZE):
+    """Split the key sequences of the source into chunks of complete keys
+
+    **source** is a string, a file-like object or an iterable of strings.
+    The byte strings are decoded with the **encoding** (default: the
+    preferred encoding of the locale). The chunks have about **chunk_size**
+    characters, only a group of keys longer than a chunk (e.g. text in
+    parentheses) makes a longer one. Each chunk can be parsed separately.
+
+    ValueError is raised if a group or braces stay unclosed for more than
+    **max_key_size** characters.
+    """
+    # the characters which don't complete the key after the modifiers
+    skipped = ''.join(MODIFIERS)
+    for char, with_char in ((' ', with_spaces), ('\t', with_tabs), ('\n', with_newlines)):
+        if not with_char:
+            skipped += char
+
+    buf = ''
+    # an incomplete key longer than a chunk waits for its closing character
+    # (None for the key after the modifiers), buf[:searched] doesn't have it
+    closing = searched = None
+    for piece in _read_text(source, chunk_size, encoding):
+        buf += piece
+        while len(buf) >= chunk_size:
+            if searched is not None and (
+                    closing is None and not buf[searched:].strip(skipped) or
+                    closing is not None and buf.find(closing, searched) == -1):
+                end = 0
+            else:
+                end, closing = _complete_keys_end(
+                    buf[:chunk_size], with_spaces, with_tabs, with_newlines)
+                if not end:
+                    end, closing = _complete_keys_end(buf, with_spaces, with_tabs, with_newlines)
+
+            if not end:
+                if len(buf) > max_key_size:
+                    raise ValueError("The key at {0!r} is not closed in {1} characters".format(
+                        buf[:20], max_key_size))
+                # wait for the end of the key
+                searched = len(buf)
+                break
+
+            searched = None
+            yield buf[:end]
+            buf = buf[end:]
+
+    if buf:
+        yield buf
@@ -0,0 +1,126 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"""Memo of best_match results keyed by the structure of the dialog
+
+Building of the names map and fuzzy scoring of all the names is the most
+expensive part of a best_match search. For a stable dialog the result is
+the same every time, so it can be memoized by a cheap fingerprint of the
+candidates: the ordered list of (class name, control id) pairs (the texts
+are not read). The memo keeps the text of the found control too: on a hit
+only the text of that control is read and if it differs the hit is
+dropped and the candidates are scored again. The memo is bounded (the least recently used results are
+dropped) and can be saved to a JSON file::
+
+    findwindows.best_match_memo = BestMatchMemo(size=1024, filename='my_app.memo')
+    ...
+    findwindows.best_match_memo.save('my_app.memo')
+
+.. note:: The memo is not used by default. The texts of the other
+   controls are not checked, so a control named by a neighbour label
+   (e.g. an edit box) is found again even if that label has changed.
+"""
+from __future__ import unicode_literals
+
+import os
+import json
+import hashlib
+
+from .cacheutils import LRUCache, save_versioned, load_versioned
+
+
+MEMO_FORMAT_VERSION = 2
+
+
+#=========================================================================
+def _control_id(element):
+    "Return the control id of the element (None if not supported)"
+    try:
+        return element.control_id
+    except NotImplementedError:
+        return None
+
+
+#=========================================================================
+def fingerprint(elements):
+    "Return a fingerprint of the ordered (class_name, control_id) list of the elements"
+    structure = [[element.class_name, _control_id(element)] for element in elements]
+    return hashlib.sha1(json.dumps(structure).encode('utf-8')).hexdigest()
+
+
+#=========================================================================
+class BestMatchMemo(object):
+    """Bounded memo of (fingerprint, best_match) -> (index, text) of the candidate
+
+    * **size** - the maximum number of the results to keep
+    * **filename** - the file to load the memo from (if it exists)
+    * **hits** - the number of the results found in the memo
+    * **misses** - the number of the results which were not in the memo
+    """
+
+    def __init__(self, size = 256, filename = None):
+        """Initialize the memo and load it from the file if it exists"""
+        # (fingerprint, best_match): (index, text)
+        self._cache = LRUCache(size)
+        if filename and os.path.exists(filename):
+            self.load(filename)
+
+    size = property(lambda self: self._cache.size,
+                    lambda self, size: setattr(self._cache, 'size', size))
+    hits = property(lambda self: self._cache.hits)
+    misses = property(lambda self: self._cache.misses)
+
+    def __len__(self):
+        "Return the number of the results"
+        return len(self._cache)
+
+    def get(self, fingerprint, best_match):
+        "Return the (index, text) of the candidate for best_match (None if unknown)"
+        return self._cache.get((fingerprint, best_match))
+
+    def put(self, fingerprint, best_match, index, text):
+        "Remember the index and the text of the candidate (drop the least recently used results)"
+        self._cache.put((fingerprint, best_match), (index, text))
+
+    def reject(self, fingerprint, best_match):
+        "Remove a result returned by get() which is wrong now (count it as a miss)"
+        if self._cache.pop((fingerprint, best_match)) is not None:
+            self._cache.hits -= 1
+            self._cache.misses += 1
+
+    def forget(self, fingerprint):
+        "Remove all the results of the fingerprint (e.g. the dialog has changed)"
+        self._cache.remove_if(lambda key: key[0] == fingerprint)
+
+    def clear(self):
+        "Remove all the results"
+        self._cache.clear()
+
+    def save(self, filename):
+        "Save the results to a JSON file (the least recently used first)"
+        entries = [list(key) + list(value) for key, value in self._cache.items()]
+        save_versioned(filename, MEMO_FORMAT_VERSION, 'entries', entries)
+
+    def load(self, filename):
+        "Load the results from a JSON file saved by save()"
+        entries = load_versioned(filename, MEMO_FORMAT_VERSION, 'entries', 'best_match results')
+        self.clear()
+        for fingerprint_, best_match, index, text in entries:
+            self.put(fingerprint_, best_match, index, text)
@@ -32,9 +32,13 @@
 
 import sys
 import time
+import math
+import contextlib
 if sys.platform == 'win32':
+    import ctypes
     from . import win32functions
     from . import win32defines
+    from . import win32structures
     from .timings import Timings
     import win32api
     import win32gui
@@ -48,6 +52,20 @@ else:
 BUTTON_MAPPING = {'left': 1, 'middle': 2, 'right': 3, 'up_scroll': 4,
                   'down_scroll': 5, 'left_scroll': 6, 'right_scroll': 7}
 
+# the easing functions of path(): a share of the time -> a share of the distance
+EASINGS = {
+    'linear': lambda t: t,
+    'ease_in': lambda t: t * t,
+    'ease_out': lambda t: t * (2 - t),
+    'ease_in_out': lambda t: t * t * (3 - 2 * t),
+}
+
+# the events of a path due within this time are sent together
+PATH_TICK = 0.01
+
+# the buttons which can be held during a path (see drag())
+DRAG_BUTTONS = ('left', 'right', 'middle')
+
 
 if sys.platform == 'win32':
     def _perform_click_input(
@@ -174,36 +192,115 @@ if sys.platform == 'win32':
         if ('alt' in keyboard_keys) and key_up:
             SendKeys.VirtualKeyAction(SendKeys.VK_MENU, down=False).Run()
 
+    @contextlib.contextmanager
+    def batch():
+        """Do nothing (the batches are used by the Xlib back-end only)"""
+        yield
+
+    _BUTTON_FLAGS = {
+        ('left', True): win32defines.MOUSEEVENTF_LEFTDOWN,
+        ('left', False): win32defines.MOUSEEVENTF_LEFTUP,
+        ('right', True): win32defines.MOUSEEVENTF_RIGHTDOWN,
+        ('right', False): win32defines.MOUSEEVENTF_RIGHTUP,
+        ('middle', True): win32defines.MOUSEEVENTF_MIDDLEDOWN,
+        ('middle', False): win32defines.MOUSEEVENTF_MIDDLEUP,
+    }
+
+    def _send_mouse_events(events):
+        """Send the (button, down, x, y) events of a path by one SendInput call
+
+        The button is None for a move. The coordinates are normalized
+        against the virtual screen, so they can be on any monitor.
+        """
+        swapped = win32functions.GetSystemMetrics(win32defines.SM_SWAPBUTTON)
+        x_origin = win32functions.GetSystemMetrics(win32defines.SM_XVIRTUALSCREEN)
+        y_origin = win32functions.GetSystemMetrics(win32defines.SM_YVIRTUALSCREEN)
+        x_res = win32functions.GetSystemMetrics(win32defines.SM_CXVIRTUALSCREEN)
+        y_res = win32functions.GetSystemMetrics(win32defines.SM_CYVIRTUALSCREEN)
+
+        inputs = (win32structures.INPUT * len(events))()
+        for inp, (button, down, x, y) in zip(inputs, events):
+            inp.type = win32defines.INPUT_MOUSE
+            inp.mi.dx = int(float(x - x_origin) * (65535. / float(x_res - 1)))
+            inp.mi.dy = int(float(y - y_origin) * (65535. / float(y_res - 1)))
+            inp.mi.dwFlags = (win32defines.MOUSEEVENTF_MOVE | win32defines.MOUSEEVENTF_ABSOLUTE |
+                              win32defines.MOUSEEVENTF_VIRTUALDESK)
+            if button is not None:
+                if swapped and button in ('left', 'right'):
+                    button = 'right' if button == 'left' else 'left'
+                inp.mi.dwFlags |= _BUTTON_FLAGS[(button, down)]
+
+        num_inserted_events = SendKeys.SendInput(len(inputs), ctypes.byref(inputs),
+                                                 ctypes.sizeof(win32structures.INPUT))
+        if num_inserted_events != len(inputs):
+            raise RuntimeError('SendInput() inserted only ' + str(num_inserted_events) +
+                               ' out of ' + str(len(inputs)) + ' mouse events')
+
 
 else:
     _display = Display()
+    # the depth of the nested batch() blocks
+    _batch_depth = 0
+
+    def _sync():
+        "Sync the display unless the events are batched"
+        if not _batch_depth:
+            _display.sync()
+
+    @contextlib.contextmanager
+    def batch():
+        """Send the mouse events of the block with one sync of the display
+
+        Without it the display is synced once per action.
+        """
+        global _batch_depth
+        _batch_depth += 1
+        try:
+            yield
+        finally:
+            _batch_depth -= 1
+            _sync()
+
     def _perform_click_input(button='left', coords=(0, 0),
                              button_down=True, button_up=True, double=False,
                              wheel_dist=0, pressed="", key_down=True, key_up=True):
-        "Perform a click action using Python-xlib"
+        """Perform a click action using Python-xlib
+
+        All the events of the action are sent with one sync of the display
+        (e.g. a wheel of N notches is N clicks of a scroll button).
+        """
         #Move mouse
-        x = int(coords[0])
-        y = int(coords[1])
-        fake_input(_display, X.MotionNotify, x=x, y=y)
-        _display.sync()
+        fake_input(_display, X.MotionNotify, x=int(coords[0]), y=int(coords[1]))
 
+        clicks = 1
         if button == 'wheel':
-            if wheel_dist == 0:
-                return
-            if wheel_dist > 0:
-                button = 'up_scroll'
-            if wheel_dist < 0:
-                button = 'down_scroll'
-            for i in range(abs(wheel_dist)):
-                _perform_click_input(button, coords)
-        else:
+            clicks = abs(wheel_dist)
+            button = 'up_scroll' if wheel_dist > 0 else 'down_scroll'
+            button_down = button_up = True
+        elif double and button_down and button_up:
+            clicks = 2
+
+        if button != 'move':
             button = BUTTON_MAPPING[button]
-            if button_down:
-                fake_input(_display, X.ButtonPress, button)
-                _display.sync()
-            if button_up:
-                fake_input(_display, X.ButtonRelease, button)
-                _display.sync()
+            for _ in range(clicks):
+                if button_down:
+                    fake_input(_display, X.ButtonPress, button)
+                if button_up:
+                    fake_input(_display, X.ButtonRelease, button)
+        _sync()
+
+    def _send_mouse_events(events):
+        """Send the (button, down, x, y) events of a path with one sync
+
+        The button is None for a move.
+        """
+        for button, down, x, y in events:
+            if button is None:
+                fake_input(_display, X.MotionNotify, x=int(x), y=int(y))
+            else:
+                fake_input(_display, X.ButtonPress if down else X.ButtonRelease,
+                           BUTTON_MAPPING[button])
+        _sync()
 
 
 def click(button='left', coords=(0, 0)):
@@ -245,3 +342,89 @@ def scroll(coords=(0, 0), wheel_dist=1):
 def wheel_click(coords=(0, 0)):
     "Middle mouse button click at the specified coords"
     _perform_click_input(button='middle', coords=coords)
+
+
+def path(start, end, steps=10, easing='linear'):
+    """Return the points of a movement from start (excluded) to end
+
+    * **steps** - the number of the points
+    * **easing** - the name of the easing function (see ``EASINGS``)
+    """
+    if steps < 1:
+        raise ValueError('steps should be positive, not {0}'.format(steps))
+    share = EASINGS[easing]
+    points = []
+    for step in range(1, steps + 1):
+        done = share(float(step) / steps)
+        points.append((int(round(start[0] + (end[0] - start[0]) * done)),
+                       int(round(start[1] + (end[1] - start[1]) * done))))
+    return points
+
+
+def _send_path(events, speed):
+    """Send the events of a path at the speed (pixels per second)
+
+    Without a speed all the events are sent at once. Otherwise the events
+    due within ``PATH_TICK`` are sent together and the due times are
+    counted from the start, so the waits never accumulate an error.
+    """
+    if not speed:
+        _send_mouse_events(events)
+        return
+    if speed < 0:
+        raise ValueError('speed should be positive, not {0}'.format(speed))
+
+    start = time.time()
+    distance = 0.
+    previous = events[0][2:]
+    batch = []
+    for event in events:
+        point = event[2:]
+        distance += math.hypot(point[0] - previous[0], point[1] - previous[1])
+        previous = point
+
+        wait = start + distance / speed - time.time()
+        if wait > PATH_TICK:
+            if batch:
+                _send_mouse_events(batch)
+                batch = []
+            time.sleep(wait)
+        batch.append(event)
+    if batch:
+        _send_mouse_events(batch)
+
+
+def move_path(points, speed=None):
+    """Move the mouse through the points
+
+    The whole movement is sent at once (one SendInput call on Windows,
+    one sync of XTest on Linux) unless the **speed** (pixels per second)
+    is specified. Use path() to interpolate the points.
+    """
+    if points:
+        _send_path([(None, False, x, y) for x, y in points], speed)
+
+
+def _check_drag_button(button):
+    "Raise ValueError if the button can't be held during a path"
+    if button not in DRAG_BUTTONS:
+        raise ValueError('Unsupported button for a drag: "{0}" (use one of: {1})'.format(
+            button, ', '.join(DRAG_BUTTONS)))
+
+
+def drag(button='left', points=(), speed=None):
+    """Press the button at the first point, move through the rest and release it
+
+    The movement is sent as by move_path(). The **button** is one of
+    ``DRAG_BUTTONS``, ValueError is raised for the others.
+    """
+    _check_drag_button(button)
+    points = list(points)
+    if not points:
+        return
+    x, y = points[0]
+    events = [(None, False, x, y), (button, True, x, y)]
+    events.extend((None, False, x, y) for x, y in points[1:])
+    x, y = points[-1]
+    events.append((button, False, x, y))
+    _send_path(events, speed)
@@ -0,0 +1,212 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"""Cache of process handles shared by all the modules
+
+Opening of a process handle is not free and some operations (e.g. clicks
+waiting for the GUI thread, remote memory blocks) need a handle again and
+again. The handles are cached by (process ID, access rights) and are
+reference counted. A cached handle is opened with SYNCHRONIZE access
+so the cache can check that the process is still alive; the handles of
+exited processes are closed::
+
+    with processhandles.process_handle(pid, win32defines.PROCESS_VM_READ) as handle:
+        ...
+
+    with processhandles.query_handle(pid) as handle:  # for IsWow64Process() etc.
+        ...
+
+    print(processhandles.cache.opened_count)
+"""
+
+import sys
+import threading
+from contextlib import contextmanager
+
+from . import win32defines
+if sys.platform == 'win32':
+    from . import win32functions
+
+
+# the access rights to query the process information in the order to try:
+# the limited rights are enough for IsWow64Process(), GetProcessTimes() etc.
+# and they are granted for elevated and protected processes too, the full
+# rights are needed before Windows Vista
+QUERY_ACCESS_RIGHTS = (win32defines.PROCESS_QUERY_LIMITED_INFORMATION,
+                       win32defines.PROCESS_QUERY_INFORMATION)
+
+
+#=========================================================================
+def _open_process(process_id, access):
+    "Open the process handle (0 if failed)"
+    return win32functions.OpenProcess(access, 0, process_id)
+
+
+#=========================================================================
+def _close_handle(handle):
+    "Close the process handle"
+    win32functions.CloseHandle(handle)
+
+
+#=========================================================================
+def _is_alive(handle):
+    "Return True if the process of the handle hasn't exited"
+    return win32functions.WaitForSingleObject(handle, 0) == win32defines.WAIT_TIMEOUT
+
+
+#=========================================================================
+class ProcessHandleCache(object):
+    """Reference counted process handles keyed by (process ID, access rights)
+
+    * **opened_count** - the number of handles opened by the cache
+    * **closed_count** - the number of handles closed by the cache
+
+    The functions to open, close and check the handles can be replaced
+    (e.g. for testing).
+    """
+
+    def __init__(self, open_process = _open_process, close_handle = _close_handle,
+                 is_alive = _is_alive):
+        """Initialize an empty cache"""
+        self.open_process = open_process
+        self.close_handle = close_handle
+        self.is_alive = is_alive
+
+        self.opened_count = 0
+        self.closed_count = 0
+        # (process_id, access): [handle, reference count]
+        self._entries = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        "Return the number of cached handles"
+        return len(self._entries)
+
+    def acquire(self, process_id, access):
+        """Return a handle of the process with the access rights (0 if failed)
+
+        Every successful call must be paired with :func:`release`.
+        """
+        key = (process_id, access)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                # a handle in use is shared even if the process has exited
+                if entry[1] or self.is_alive(entry[0]):
+                    entry[1] += 1
+                    return entry[0]
+                # the process has exited (the ID could be reused)
+                self._discard(process_id)
+
+            handle = self.open_process(process_id, access | win32defines.SYNCHRONIZE)
+            if not handle:
+                return 0
+            self.opened_count += 1
+            self._entries[key] = [handle, 1]
+            return handle
+
+    def acquire_query(self, process_id):
+        """Return (handle, access) of the process to query its information
+
+        The rights of ``QUERY_ACCESS_RIGHTS`` are tried in turn, the handle
+        is 0 if the process can't be opened with any of them. Every
+        successful call must be paired with :func:`release` of the access.
+        """
+        for access in QUERY_ACCESS_RIGHTS:
+            handle = self.acquire(process_id, access)
+            if handle:
+                return handle, access
+        return 0, None
+
+    def release(self, process_id, access):
+        """Release the handle acquired by :func:`acquire`
+
+        The handle stays cached while the process is alive.
+        """
+        key = (process_id, access)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry[1] = max(entry[1] - 1, 0)
+            if not entry[1] and not self.is_alive(entry[0]):
+                self._close(key)
+
+    def _close(self, key):
+        "Close the handle of the key and remove it from the cache"
+        handle = self._entries.pop(key)[0]
+        self.close_handle(handle)
+        self.closed_count += 1
+
+    def _discard(self, process_id):
+        "Close the unused handles of the process"
+        for key in list(self._entries):
+            if key[0] == process_id and not self._entries[key][1]:
+                self._close(key)
+
+    def purge(self):
+        "Close the unused handles of the exited processes"
+        with self._lock:
+            for key in list(self._entries):
+                handle, references = self._entries[key]
+                if not references and not self.is_alive(handle):
+                    self._close(key)
+
+    def clear(self):
+        "Close all the unused handles"
+        with self._lock:
+            for key in list(self._entries):
+                if not self._entries[key][1]:
+                    self._close(key)
+
+    @contextmanager
+    def process_handle(self, process_id, access):
+        "Acquire the process handle for the block (it's 0 if failed)"
+        handle = self.acquire(process_id, access)
+        try:
+            yield handle
+        finally:
+            if handle:
+                self.release(process_id, access)
+
+    @contextmanager
+    def query_handle(self, process_id):
+        "Acquire the handle to query the process information for the block (0 if failed)"
+        handle, access = self.acquire_query(process_id)
+        try:
+            yield handle
+        finally:
+            if handle:
+                self.release(process_id, access)
+
+
+cache = ProcessHandleCache()
+
+
+#=========================================================================
+def process_handle(process_id, access):
+    "Acquire the process handle from the shared cache for the block"
+    return cache.process_handle(process_id, access)
+
+
+#=========================================================================
+def query_handle(process_id):
+    "Acquire the handle to query the process information from the shared cache"
+    return cache.query_handle(process_id)
@@ -0,0 +1,194 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"""Persistent hints to resolve window specifications without fuzzy matching
+
+The first successful resolution of a window specification records a cheap
+structural locator for each level of the specification: class name,
+control id, automation id, the exact title of the dialog and the index of
+the control among the descendants of its dialog. Later runs try the
+locator first and fall back to the full search (e.g. best_match) only
+when the found element doesn't match the locator any more::
+
+    app = Application(datafilename='my_app.hints')
+    ...
+    app.WriteAppData('my_app.hints')
+    print(app.hints.hit_rate)
+
+Hints are stored in a versioned JSON file.
+"""
+from __future__ import unicode_literals
+
+import os
+import json
+
+from . import six
+from .cacheutils import save_versioned, load_versioned
+
+
+HINTS_FORMAT_VERSION = 1
+
+# criteria that are replaced by the locator
+_FUZZY_CRITERIA = ('best_match', 'title', 'title_re', 'class_name_re',
+                   'found_index', 'ctrl_index')
+
+# criteria that change from run to run
+_VOLATILE_CRITERIA = ('process', )
+
+# locator property: ElementInfo attribute
+_LOCATOR_PROPERTIES = {
+    'class_name': 'class_name',
+    'control_id': 'control_id',
+    'auto_id': 'automation_id',
+    'title': 'rich_text',
+    }
+
+_SCALAR_TYPES = six.string_types + six.integer_types + (bool, float, type(None))
+
+
+#=========================================================================
+def _element_property(element, name):
+    "Return the locator property of the element (None if not supported)"
+    try:
+        return getattr(element, _LOCATOR_PROPERTIES[name], None)
+    except NotImplementedError:
+        return None
+
+
+#=========================================================================
+class ResolutionHints(object):
+    """Store of structural locators for window specifications
+
+    * **hits** - the number of specifications resolved by a locator
+    * **misses** - the number of locators which were not valid any more
+    """
+
+    def __init__(self, filename = None):
+        """Initialize the store and load it from the file if it exists"""
+        self.hints = {}
+        self.hits = 0
+        self.misses = 0
+        if filename and os.path.exists(filename):
+            self.load(filename)
+
+    @staticmethod
+    def key(criteria):
+        """Return a key of the specification criteria (a list of dicts)
+
+        Return None if the criteria can't be stored
+        (e.g. a handle, a predicate function or a parent element is used).
+        """
+        levels = []
+        for criterion in criteria:
+            if 'handle' in criterion:
+                return None
+            level = {}
+            for name, value in criterion.items():
+                if name in _VOLATILE_CRITERIA:
+                    continue
+                if not isinstance(value, _SCALAR_TYPES):
+                    return None
+                level[name] = value
+            levels.append(level)
+        return json.dumps(levels, sort_keys = True)
+
+    def get(self, criteria):
+        "Return the stored locators of the criteria (or None)"
+        key = self.key(criteria)
+        if key is None:
+            return None
+        return self.hints.get(key)
+
+    def record(self, criteria, elements):
+        """Record locators of the resolved elements (ElementInfo objects)
+
+        * **criteria** - the criteria of the specification
+        * **elements** - the dialog and optionally the control it resolved to
+        """
+        key = self.key(criteria)
+        if key is None:
+            return
+
+        locators = []
+        for level, element in enumerate(elements):
+            locator = {}
+            for name in ('class_name', 'control_id', 'auto_id'):
+                value = _element_property(element, name)
+                if value is not None:
+                    locator[name] = value
+            if level == 0:
+                # the class is not enough to tell the dialogs apart
+                locator['title'] = _element_property(element, 'title')
+            locators.append(locator)
+
+        if len(elements) > 1:
+            for index, descendant in enumerate(elements[0].descendants):
+                if descendant == elements[-1]:
+                    locators[-1]['ctrl_index'] = index
+                    break
+
+        self.hints[key] = locators
+
+    def forget(self, criteria):
+        "Remove the locators of the criteria"
+        self.hints.pop(self.key(criteria), None)
+
+    @staticmethod
+    def hinted_criteria(criteria, locators):
+        "Return the criteria with the fuzzy parts replaced by the locators"
+        hinted = []
+        for criterion, locator in zip(criteria, locators):
+            criterion = dict((name, value) for name, value in criterion.items()
+                             if name not in _FUZZY_CRITERIA)
+            criterion.update(locator)
+            hinted.append(criterion)
+        return hinted
+
+    @staticmethod
+    def matches(element, locator, criterion):
+        """Return True if the element (ElementInfo) matches the locator
+
+        The visible_only and enabled_only flags of the criterion are
+        checked too as a control found by the index is not filtered.
+        """
+        for name in _LOCATOR_PROPERTIES:
+            if name in locator and _element_property(element, name) != locator[name]:
+                return False
+        if criterion.get('visible_only', True) and not element.visible:
+            return False
+        if criterion.get('enabled_only', False) and not element.enabled:
+            return False
+        return True
+
+    @property
+    def hit_rate(self):
+        "Return the part of resolutions done by the locators (0 if none tried)"
+        total = self.hits + self.misses
+        if not total:
+            return 0.
+        return float(self.hits) / total
+
+    def save(self, filename):
+        "Save the hints to a JSON file"
+        save_versioned(filename, HINTS_FORMAT_VERSION, 'hints', self.hints)
+
+    def load(self, filename):
+        "Load the hints from a JSON file saved by save()"
+        self.hints = load_versioned(filename, HINTS_FORMAT_VERSION, 'hints', 'resolution hints')
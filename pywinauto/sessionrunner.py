@@ -0,0 +1,235 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"""Run steps of several applications concurrently
+
+Message based actions (e.g. ``click()``, ``set_edit_text()``, ``select()``,
+``send_message()``) don't need the input focus, so several instances of
+an application can be driven at the same time. A session is a sequence
+of steps for one Application; the sessions run on a bounded pool of
+threads and only the steps which need the focus or the global input
+(e.g. ``click_input()``, ``type_keys()``, ``set_focus()``) are serialized
+through one input lock::
+
+    runner = SessionRunner(max_workers=4)
+    for account, app in apps.items():
+        runner.add_session(account, app, [
+            Action(['Login', 'UserEdit'], 'set_edit_text', account),
+            Action(['Login', 'PasswordEdit'], 'type_keys', 'secret'),  # serialized
+            Action(['Login', 'OK'], 'click'),
+            ])
+    reports = runner.run()
+    print(reports['alice'].throughput)
+
+A step is any callable taking the Application. Steps of one session are
+run in order, a failed step stops its session only.
+
+.. note:: The steps of UI Automation controls need COM to be initialized
+   in the worker threads, so the runner is intended for the message
+   based actions of the native controls.
+"""
+
+import time
+import threading
+
+from . import six
+
+
+# the lock of the focus and the global input shared by all the runners
+input_lock = threading.RLock()
+
+# methods which need the focus or send the global input
+INPUT_METHODS = frozenset([
+    'click_input', 'double_click_input', 'right_click_input',
+    'press_mouse_input', 'release_mouse_input', 'move_mouse_input',
+    'drag_mouse_input', 'wheel_mouse_input', 'type_keys', 'type_keys_stream', 'set_focus',
+    'menu_select', 'draw_outline',
+    'ClickInput', 'DoubleClickInput', 'RightClickInput',
+    'PressMouseInput', 'ReleaseMouseInput', 'MoveMouseInput',
+    'DragMouseInput', 'WheelMouseInput', 'TypeKeys', 'SetFocus',
+    'MenuSelect', 'DrawOutline',
+    ])
+
+
+#=========================================================================
+class Action(object):
+    """Step calling a method of a control of the application
+
+    * **path** - best_match names from the dialog down to the control
+      (a string is the name of the dialog)
+    * **method** - the name of the method to call
+    * the rest arguments are passed to the method
+
+    The action needs the input lock if the method is in ``INPUT_METHODS``.
+    """
+
+    def __init__(self, path, method, *args, **kwargs):
+        """Store the action"""
+        if isinstance(path, six.string_types):
+            path = [path]
+        self.path = list(path)
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.needs_input = method in INPUT_METHODS
+
+    def __call__(self, app):
+        "Resolve the control and call the method"
+        spec = app[self.path[0]]
+        for name in self.path[1:]:
+            spec = spec[name]
+        return getattr(spec, self.method)(*self.args, **self.kwargs)
+
+    def __repr__(self):
+        "Return a readable representation of the action"
+        return '<Action {0}.{1}>'.format('.'.join(self.path), self.method)
+
+
+#=========================================================================
+class SessionReport(object):
+    """Throughput of a session
+
+    * **steps** - the number of the finished steps
+    * **input_steps** - the number of the finished steps which needed the input lock
+    * **busy_time** - seconds spent in the steps (including the waits for the lock)
+    * **input_wait_time** - seconds spent waiting for the input lock
+    * **error** - the exception of the failed step (None if all the steps passed)
+    * **failed_step** - the index of the failed step
+    """
+
+    def __init__(self, name):
+        """Initialize an empty report"""
+        self.name = name
+        self.steps = 0
+        self.input_steps = 0
+        self.busy_time = 0.
+        self.input_wait_time = 0.
+        self.start_time = None
+        self.end_time = None
+        self.error = None
+        self.failed_step = None
+
+    @property
+    def wall_time(self):
+        "Seconds from the start of the first step to the end of the last one"
+        if self.start_time is None or self.end_time is None:
+            return 0.
+        return self.end_time - self.start_time
+
+    @property
+    def throughput(self):
+        "Finished steps per second"
+        if not self.wall_time:
+            return 0.
+        return self.steps / self.wall_time
+
+    def __repr__(self):
+        "Return a short summary"
+        return '<SessionReport {0}: {1} steps in {2:.3f} s ({3:.1f} steps/s)>'.format(
+            self.name, self.steps, self.wall_time, self.throughput)
+
+
+#=========================================================================
+class SessionRunner(object):
+    """Run the steps of several sessions on a bounded pool of threads
+
+    * **max_workers** - the maximum number of sessions running at once
+    * **lock** - the lock of the focus and global input (default: ``input_lock``)
+    """
+
+    def __init__(self, max_workers = 4, lock = None):
+        """Initialize a runner without sessions"""
+        if max_workers < 1:
+            raise ValueError('max_workers should be positive, not {0}'.format(max_workers))
+        if lock is None:
+            lock = input_lock
+        self.max_workers = max_workers
+        self.lock = lock
+        self.sessions = []  # [(name, app, [(step, needs_input), ...]), ...]
+
+    def add_session(self, name, app, steps = ()):
+        "Add a session of the application with the steps"
+        if name in [session[0] for session in self.sessions]:
+            raise ValueError('Session "{0}" is added already'.format(name))
+        self.sessions.append((name, app, []))
+        for step in steps:
+            self.add_step(name, step)
+
+    def add_step(self, name, step, needs_input = None):
+        """Add a step (a callable taking the application) to the session
+
+        If **needs_input** is not specified it's taken from the
+        ``needs_input`` attribute of the step (False if there is none).
+        """
+        if needs_input is None:
+            needs_input = getattr(step, 'needs_input', False)
+        for session_name, _, steps in self.sessions:
+            if session_name == name:
+                steps.append((step, needs_input))
+                return
+        raise KeyError(name)
+
+    def run(self):
+        """Run all the sessions and return a dictionary of the reports by the names"""
+        reports = dict((name, SessionReport(name)) for name, _, _ in self.sessions)
+        pending = list(self.sessions)
+        pending_lock = threading.Lock()
+
+        def worker():
+            "Run the pending sessions one by one"
+            while True:
+                with pending_lock:
+                    if not pending:
+                        return
+                    name, app, steps = pending.pop(0)
+                self._run_session(app, steps, reports[name])
+
+        threads = [threading.Thread(target = worker, name = 'SessionRunner')
+                   for _ in range(min(self.max_workers, len(self.sessions)))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return reports
+
+    def _run_session(self, app, steps, report):
+        "Run the steps of the session in order (stop at the first failure)"
+        report.start_time = time.time()
+        try:
+            for index, (step, needs_input) in enumerate(steps):
+                start = time.time()
+                try:
+                    if needs_input:
+                        with self.lock:
+                            report.input_wait_time += time.time() - start
+                            step(app)
+                        report.input_steps += 1
+                    else:
+                        step(app)
+                except Exception as exc:
+                    report.error = exc
+                    report.failed_step = index
+                    return
+                finally:
+                    report.busy_time += time.time() - start
+                report.steps += 1
+        finally:
+            report.end_time = time.time()
@@ -94,11 +94,38 @@ The Following are the individual timing settings that can be adjusted:
 * after_drag_n_drop_wait  default(.1)
 * scroll_step_wait  default(.1)
 
+* pacing_idle_timeout  default(1)
+* pacing_target_latency  default(.05)
+* stream_idle_timeout  default(10)
+
+The timings can be learned for a particular application. Start
+``timings.calibration``, run a typical scenario and apply the profile
+derived from the observed wait latencies::
+
+    timings.calibration.start()
+    ...
+    timings.calibration.stop()
+    timings.calibration.apply()
+
+The current values can be stored by ``Timings.save(filename)`` and
+restored by ``Timings.load(filename)``.
+
+The timings can be changed temporarily for the current thread only::
+
+    with Timings.override(after_click_wait=0, window_find_timeout=2):
+        ...
 """
 
 import time
 import operator
+import math
+import threading
+from contextlib import contextmanager
 
+from .cacheutils import save_versioned, load_versioned
+
+# version of the file format used by TimeConfig.save()/load()
+PROFILE_FORMAT_VERSION = 1
 
 #=========================================================================
 class TimeConfig(object):
@@ -164,6 +191,10 @@ class TimeConfig(object):
         'before_drop_wait': 0.1,
         'after_drag_n_drop_wait': 0.1,
         'scroll_step_wait': 0.1,
+
+        'pacing_idle_timeout': 1.,
+        'pacing_target_latency': .05,
+        'stream_idle_timeout': 10.,
     }
 
     assert(__default_timing['window_find_timeout'] >=\
@@ -172,14 +203,24 @@ class TimeConfig(object):
     _timings = __default_timing.copy()
     _cur_speed = 1
 
+    # overridden timings of the current thread (see override() method)
+    _local = threading.local()
+
+    # names of the class members, filled in after the class definition
+    _class_attributes = frozenset()
+
     def __getattribute__(self, attr):
         "Get the value for a particular timing"
         if attr in ['__dict__', '__members__', '__methods__', '__class__']:
             return object.__getattribute__(self, attr)
 
-        if attr in dir(TimeConfig):
+        if attr in TimeConfig._class_attributes:
             return object.__getattribute__(self, attr)
 
+        overridden = getattr(TimeConfig._local, 'timings', None)
+        if overridden and attr in overridden:
+            return overridden[attr]
+
         if attr in self.__default_timing:
             return self._timings[attr]
         else:
@@ -253,15 +294,304 @@ class TimeConfig(object):
         "Set all timings to the default time"
         self._timings = self.__default_timing.copy()
 
+    def save(self, filename):
+        """Save the current timing values to a file
+
+        The file can be loaded later by :func:`TimeConfig.load`
+        (e.g. a profile computed by the calibration for a particular app).
+        """
+        save_versioned(filename, PROFILE_FORMAT_VERSION, 'timings', self._timings)
+
+    def load(self, filename):
+        """Load timing values from a file created by :func:`TimeConfig.save`
+
+        Settings which are missing in the file keep their current values.
+        """
+        timings = load_versioned(filename, PROFILE_FORMAT_VERSION, 'timings', 'timings')
+
+        for setting, value in timings.items():
+            if setting not in self.__default_timing:
+                raise AttributeError("Unknown timing setting: {0}".format(setting))
+            self._timings[setting] = value
+
+    @contextmanager
+    def override(self, profile=None, **settings):
+        """Override timings for the current thread inside a with block
+
+        * **profile** an optional dictionary of timing values
+          (e.g. computed by the calibration)
+        * **settings** timing values as keyword arguments
+
+        The global values and the other threads are not affected. Nested
+        blocks inherit the outer overrides. e.g. ::
+
+            with Timings.override(after_click_wait=0, window_find_timeout=2):
+                dlg.OK.Click()
+
+        A thread-wide profile can be set by wrapping the thread function
+        into such a block.
+        """
+        values = dict(profile or {})
+        values.update(settings)
+        for setting in values:
+            if setting not in self.__default_timing:
+                raise AttributeError("Unknown timing setting: {0}".format(setting))
+
+        previous = getattr(TimeConfig._local, 'timings', None)
+        overridden = dict(previous or {})
+        overridden.update(values)
+
+        TimeConfig._local.timings = overridden
+        try:
+            yield self
+        finally:
+            TimeConfig._local.timings = previous
+
+    def overrides(self):
+        """Return a copy of the overridden timings of the current thread
+
+        It can be passed to :func:`TimeConfig.override` in another thread
+        to run a task there with the same timings.
+        """
+        return dict(getattr(TimeConfig._local, 'timings', None) or {})
+
+
+TimeConfig._class_attributes = frozenset(dir(TimeConfig))
 
 Timings = TimeConfig()
 
 
+#=========================================================================
+class TimingsCalibration(object):
+    """Learn timing values from the observed duration of waits
+
+    While the calibration is running the waits bounded by a ``*_timeout``
+    setting record how long it actually took to satisfy the condition
+    (a window is found, a control is enabled, CPU usage is low etc.)
+
+    e.g. ::
+
+        timings.calibration.start()
+        run_my_scenario()
+        timings.calibration.stop()
+
+        timings.calibration.apply() # tight timeouts for this app
+        Timings.save('my_app.timings')
+        ...
+        Timings.load('my_app.timings') # on the next runs
+    """
+
+    def __init__(self):
+        "Initialize an empty calibration"
+        self.active = False
+        self.observations = {}
+        # the outermost sampled wait of the current thread (see sample())
+        self._local = threading.local()
+
+    def start(self):
+        "Start recording the observed wait latencies"
+        self.active = True
+
+    def stop(self):
+        "Stop recording the observed wait latencies"
+        self.active = False
+
+    def reset(self):
+        "Forget all the observations"
+        self.observations = {}
+
+    def record(self, setting, elapsed):
+        """Record how long a wait bounded by the setting actually took
+
+        Nothing is recorded if the calibration is not running.
+        """
+        if not self.active:
+            return
+        if setting not in Timings._timings:
+            raise AttributeError("Unknown timing setting: {0}".format(setting))
+        self.observations.setdefault(setting, []).append(elapsed)
+
+    @contextmanager
+    def sample(self, setting):
+        """Record the duration of the block as one observation of the setting
+
+        Only the outermost sampled block of a thread is recorded, so the
+        nested waits (e.g. resolving of the control on each check of
+        a Wait) don't add their own samples. A block with **setting**
+        None records nothing but still hides the nested waits (e.g.
+        single checks of a wait_any poll). Nothing is recorded if the
+        block raises.
+        """
+        if getattr(self._local, 'sampling', False):
+            yield
+            return
+
+        self._local.sampling = True
+        start = time.time()
+        try:
+            yield
+        finally:
+            self._local.sampling = False
+        if setting is not None:
+            self.record(setting, time.time() - start)
+
+    def percentile(self, setting, percent):
+        "Return the nearest-rank percentile of the observations for the setting"
+        samples = sorted(self.observations[setting])
+        rank = int(math.ceil(len(samples) * percent / 100.)) - 1
+        return samples[min(max(rank, 0), len(samples) - 1)]
+
+    def profile(self, percent=99, safety_factor=2., min_timeout=.1):
+        """Return the timing values derived from the observations
+
+        * **percent** the percentile of the observed latencies to use
+        * **safety_factor** multiplier applied to the percentile
+        * **min_timeout** the lowest timeout value that can be proposed
+
+        Each observed ``*_timeout`` setting becomes
+        ``percentile * safety_factor``. The paired ``*_retry`` setting
+        (if any) is shortened to poll about 4 times during a typical
+        (median) wait. Settings without observations are not included.
+        """
+        profile = {}
+        for setting in self.observations:
+            if not self.observations[setting]:
+                continue
+
+            timeout = max(self.percentile(setting, percent) * safety_factor,
+                          min_timeout)
+            profile[setting] = timeout
+
+            retry_setting = setting.replace('_timeout', '_retry')
+            if retry_setting != setting and retry_setting in Timings._timings:
+                median = self.percentile(setting, 50)
+                profile[retry_setting] = min(Timings._timings[retry_setting],
+                                             timeout / 2.,
+                                             max(median / 4., .001))
+        return profile
+
+    def apply(self, percent=99, safety_factor=2., min_timeout=.1):
+        "Set the timings computed by :func:`TimingsCalibration.profile`"
+        for setting, value in self.profile(
+                percent, safety_factor, min_timeout).items():
+            Timings._timings[setting] = value
+
+
+calibration = TimingsCalibration()
+
+
+#=========================================================================
+class PacingController(object):
+    """Adaptive size of the bursts of keys sent to a busy target
+
+    After each burst the target GUI thread is waited for to become idle.
+    If it becomes idle within ``Timings.pacing_target_latency`` the target
+    keeps up and the next burst is larger: the size is doubled until the
+    first slowdown and then increased by **step**. Otherwise (or if the
+    target doesn't become idle at all) the size is halved.
+
+    * **initial** - the size of the first burst (keys)
+    * **minimum**, **maximum** - the bounds of the burst size
+    * **step** - the additive increase after the first slowdown
+    * **target_latency** - the latency of a target which keeps up
+      (default: ``Timings.pacing_target_latency``)
+    """
+
+    def __init__(self, initial=8, minimum=1, maximum=1000, step=1, target_latency=None):
+        "Initialize the controller"
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError('Wrong burst sizes: {0} <= {1} <= {2}'.format(minimum, initial, maximum))
+        self.burst_size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.step = step
+        self.target_latency = target_latency
+        self.slow_start = True
+        self.bursts = 0
+        self.slowdowns = 0
+
+    def update(self, latency):
+        """Adapt the burst size to the latency of the last burst
+
+        **latency** is the time the target took to become idle
+        (None if it didn't become idle). Return the new burst size.
+        """
+        target_latency = self.target_latency
+        if target_latency is None:
+            target_latency = Timings.pacing_target_latency
+
+        self.bursts += 1
+        if latency is None or latency > target_latency:
+            self.slowdowns += 1
+            self.slow_start = False
+            self.burst_size = max(self.minimum, self.burst_size // 2)
+        elif self.slow_start:
+            self.burst_size = min(self.maximum, self.burst_size * 2)
+        else:
+            self.burst_size = min(self.maximum, self.burst_size + self.step)
+        return self.burst_size
+
+
 #=========================================================================
 class TimeoutError(RuntimeError):
     pass
 
 
+_deadlines = threading.local()
+
+#=========================================================================
+@contextmanager
+def deadline(timeout):
+    """Limit all the waits inside the block by a common time budget
+
+    Nested waits (:func:`WaitUntil`, :func:`WaitUntilPasses` and the waits
+    built on top of them) never outlive the outermost deadline
+    even if they are called with a longer timeout. Nested deadlines can
+    only make the budget shorter. The deadlines are tracked per thread.
+
+    e.g. ::
+
+      with deadline(5):
+          # the whole sequence takes 5 seconds at most
+          dlg.Wait('ready')
+          dlg.OK.Wait('enabled')
+    """
+    if not hasattr(_deadlines, 'stack'):
+        _deadlines.stack = []
+
+    end_time = time.time() + timeout
+    if _deadlines.stack:
+        end_time = min(end_time, _deadlines.stack[-1])
+
+    _deadlines.stack.append(end_time)
+    try:
+        yield
+    finally:
+        _deadlines.stack.pop()
+
+
+def current_deadline():
+    """Return the end time of the current deadline (None if there is no deadline)
+
+    The time is in seconds since the epoch (as returned by time.time()).
+    """
+    stack = getattr(_deadlines, 'stack', None)
+    if not stack:
+        return None
+    return stack[-1]
+
+
+def clip_timeout(timeout):
+    """Return the timeout limited by the time left until the current deadline
+
+    The timeout is returned as is when there is no active deadline.
+    """
+    stack = getattr(_deadlines, 'stack', None)
+    if not stack:
+        return timeout
+    return max(min(timeout, stack[-1] - time.time()), 0)
+
+
 #=========================================================================
 def WaitUntil(
     timeout, 
@@ -284,6 +614,7 @@ def WaitUntil(
      Returns the return value of the function
      If the operation times out then the return value of the the function 
      is in the 'function_value' attribute of the raised exception.
+     The timeout is limited by the current :func:`deadline` (if any).
      
      e.g. ::
       
@@ -297,6 +628,7 @@ def WaitUntil(
      
     """
     
+    timeout = clip_timeout(timeout)
     start = time.time()
 
     func_val = func(*args)
@@ -343,6 +675,7 @@ def WaitUntilPasses(
      Returns the return value of the function
      If the operation times out then the original exception raised is in
      the 'original_exception' attribute of the raised exception.
+     The timeout is limited by the current :func:`deadline` (if any).
      
      e.g. ::
      
@@ -357,6 +690,7 @@ def WaitUntilPasses(
      
     """
     
+    timeout = clip_timeout(timeout)
     start = time.time()
 
     # keep trying until the timeout is passed
@@ -0,0 +1,73 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"""Benchmark of the key sequence parser (it doesn't need Windows)
+
+Run it from the root of the repository::
+
+    python pywinauto/unittests/bench_keyparser.py [repeat]
+
+For every scenario it prints the time of a parse, of a memoized
+compile_keys() call and of the expansion of the program. Then it prints
+how the parse time grows when a sequence is 8 times longer (about 8
+for the linear time, 64 for the quadratic one).
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import sys
+
+sys.path.append(".")
+from pywinauto import keyparser
+from pywinauto.unittests.benchsupport import SCALING_PATTERNS, best_time
+
+
+SCENARIOS = [
+    ('plain text', 'The quick brown fox jumps over the lazy dog. ' * 100),
+    ('modified text', '+a^b%c+(xyz)%^+d^{HOME}+{END}' * 100),
+    ('repeats', '{DOWN 5}{ab 300}{+a 2}{TAB 1000}{%}{}}' * 100),
+    ('pauses', 'a{PAUSE 0.01}b{PAUSE 0}' * 200),
+    ]
+
+
+def run(repeat = 3):
+    "Print the benchmark results"
+    print('{0:<15}{1:>8}{2:>10}{3:>12}{4:>12}{5:>12}{6:>12}'.format(
+        'scenario', 'chars', 'keys', 'parse, ms', 'cached, us', 'expand, ms', 'keys/s'))
+    for name, string in SCENARIOS:
+        program = keyparser.compile_keys(string, with_spaces = True)
+        parse = best_time(lambda: keyparser.parse(string, with_spaces = True), repeat)
+        cached = best_time(lambda: keyparser.compile_keys(string, with_spaces = True), repeat)
+        expand = best_time(lambda: list(program), repeat)
+        print('{0:<15}{1:>8}{2:>10}{3:>12.3f}{4:>12.3f}{5:>12.3f}{6:>12.0f}'.format(
+            name, len(string), len(program), parse * 1e3, cached * 1e6,
+            expand * 1e3, len(program) / (parse + expand)))
+
+    print()
+    print('{0:<35}{1:>12}{2:>12}{3:>8}'.format('pattern', 'x200, ms', 'x1600, ms', 'ratio'))
+    for pattern in SCALING_PATTERNS:
+        small = best_time(lambda: keyparser.parse(pattern * 200, with_spaces = True), repeat)
+        large = best_time(lambda: keyparser.parse(pattern * 1600, with_spaces = True), repeat)
+        print('{0:<35}{1:>12.3f}{2:>12.3f}{3:>8.1f}'.format(
+            repr(pattern), small * 1e3, large * 1e3, large / small))
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,69 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"""Benchmark of the mouse actions
+
+It sends real input, so run it on a display nobody uses, e.g. a local
+Xvfb on Linux::
+
+    xvfb-run python pywinauto/unittests/bench_mouse.py [repeat]
+
+For every scenario it prints the latency of a call and the throughput
+of the events (moves, button presses and releases) sent by it.
+"""
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import sys
+
+sys.path.append(".")
+from pywinauto import mouse
+from pywinauto.unittests.benchsupport import best_time
+
+
+def _batched_clicks():
+    "Click 10 times in one batch"
+    with mouse.batch():
+        for x in range(10):
+            mouse.click(coords=(10 + x, 10))
+
+
+# (name, function, the number of the events sent by a call)
+SCENARIOS = [
+    ('move', lambda: mouse.move((10, 10)), 1),
+    ('click', lambda: mouse.click(coords=(10, 10)), 3),
+    ('10 clicks', _batched_clicks, 30),
+    ('scroll 1', lambda: mouse.scroll((10, 10), 1), 3),
+    ('scroll 20', lambda: mouse.scroll((10, 10), 20), 41),
+    ('path 100', lambda: mouse.move_path(mouse.path((0, 0), (200, 100), steps=100)), 100),
+    ]
+
+
+def run(repeat = 3):
+    "Print the benchmark results"
+    print('{0:<12}{1:>8}{2:>14}{3:>12}'.format('scenario', 'events', 'latency, ms', 'events/s'))
+    for name, function, events in SCENARIOS:
+        latency = best_time(function, repeat)
+        print('{0:<12}{1:>8}{2:>14.3f}{3:>12.0f}'.format(
+            name, events, latency * 1e3, events / latency))
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,43 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+"""Data and helpers shared by the benchmarks and the scaling tests"""
+
+import timeit
+
+
+# the sequences repeated by the scaling checks of the key parser
+SCALING_PATTERNS = [
+    'Hello world ',                     # plain text
+    '+a^b%c+(xyz)%^+d',                 # modifiers and groups
+    '{DOWN 5}{ab 300}{+a 2}{%}{}}',     # repeats
+    '{PAUSE 0.01}a{PAUSE 0}',           # pauses
+    ]
+
+
+def best_time(function, repeat):
+    "Return the best time of a call of the function in seconds"
+    timer = timeit.Timer(function)
+    number = 1
+    # run the function long enough for the timer resolution
+    while timer.timeit(number) < .05:
+        number *= 2
+    return min(timer.repeat(repeat, number)) / number
@@ -0,0 +1,180 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+"""Synthetic back-end for the tests which don't need a real window
+
+The elements are built in memory and count the expensive operations
+(enumerations of the top level windows, reads of the process IDs and of
+the texts, walks of the descendants)::
+
+    synthetic.register()
+    SyntheticElementInfo.windows = [
+        SyntheticElementInfo(1, "#32770", "Find", children = [
+            SyntheticElementInfo(2, "Button", "OK", control_id = 1),
+            ]),
+        ]
+    app = Application(backend = synthetic.BACKEND)
+    ...
+    synthetic.unregister()
+"""
+
+import sys
+
+sys.path.append(".")
+from pywinauto import backend
+from pywinauto.ElementInfo import ElementInfo
+from pywinauto.base_wrapper import BaseWrapper
+from pywinauto.win32structures import RECT
+
+
+#: the name of the registered back-end
+BACKEND = 'synthetic'
+
+
+#=========================================================================
+class SyntheticElementInfo(ElementInfo):
+    """Element of the synthetic back-end
+
+    The element without a handle is the root: its children are the top
+    level ``windows``. The children of a window are its whole sub-tree
+    (as for the native back-end).
+    """
+
+    # the top level windows
+    windows = []
+
+    # the counters of the expensive operations
+    enumerations = 0
+    process_id_reads = 0
+    text_reads = 0
+
+    def __init__(self, handle = None, class_name = "SyntheticWindow", title = "",
+                 control_id = 0, process_id = 42, rect = (0, 0, 0, 0), children = ()):
+        self._handle = handle
+        self._class_name = class_name
+        self._title = title
+        self._control_id = control_id
+        self._process_id = process_id
+        self._rect = rect
+        self._children = list(children)
+        self._parent = None
+        for child in self._children:
+            child._parent = self
+        # the number of the walks of the descendants of this element
+        self.walks = 0
+
+    @classmethod
+    def reset(cls):
+        "Remove the top level windows and reset the counters"
+        cls.windows = []
+        cls.enumerations = 0
+        cls.process_id_reads = 0
+        cls.text_reads = 0
+
+    def __eq__(self, other):
+        return isinstance(other, SyntheticElementInfo) and self._handle == other._handle
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._handle)
+
+    @property
+    def handle(self):
+        return self._handle
+
+    @property
+    def class_name(self):
+        return self._class_name
+
+    @property
+    def rich_text(self):
+        SyntheticElementInfo.text_reads += 1
+        return self._title
+
+    name = rich_text
+
+    @property
+    def control_id(self):
+        return self._control_id
+
+    @property
+    def process_id(self):
+        SyntheticElementInfo.process_id_reads += 1
+        return self._process_id
+
+    @property
+    def visible(self):
+        return True
+
+    @property
+    def enabled(self):
+        return True
+
+    @property
+    def rectangle(self):
+        return RECT(*self._rect)
+
+    @property
+    def parent(self):
+        if self._handle is None:
+            return None
+        return self._parent or SyntheticElementInfo()
+
+    @property
+    def children(self):
+        if self._handle is None:
+            SyntheticElementInfo.enumerations += 1
+            return list(SyntheticElementInfo.windows)
+        return self.descendants
+
+    @property
+    def descendants(self):
+        self.walks += 1
+        descendants = []
+        for child in self._children:
+            descendants.append(child)
+            descendants.extend(child.descendants)
+        return descendants
+
+
+#=========================================================================
+class SyntheticWrapper(BaseWrapper):
+    "Wrapper of the synthetic elements"
+
+    def __init__(self, element_info):
+        BaseWrapper.__init__(self, element_info, backend.registry.backends[BACKEND])
+
+    def __hash__(self):
+        return hash(self.element_info.handle)
+
+
+#=========================================================================
+def register(wrapper_class = SyntheticWrapper):
+    "Register the synthetic back-end (with no windows and zero counters)"
+    SyntheticElementInfo.reset()
+    backend.register(BACKEND, SyntheticElementInfo, wrapper_class)
+
+
+def unregister():
+    "Remove the synthetic back-end"
+    del backend.registry.backends[BACKEND]
@@ -29,11 +29,15 @@ from __future__ import print_function
 
 import sys
 import os
+import io
 import locale
 import unittest
 sys.path.append(".")
 from pywinauto.SendKeysCtypes import SendKeys, DEBUG, KeySequenceError
 from pywinauto.SendKeysCtypes import KeyAction, VirtualKeyAction, PauseAction
+from pywinauto.SendKeysCtypes import compile_burst
+from pywinauto import SendKeysCtypes
+from pywinauto.keyparser import compile_keys
 from pywinauto import six
 from pywinauto.sysinfo import is_x64_Python, is_x64_OS
 from pywinauto.application import Application
@@ -233,6 +237,76 @@ class SendKeysTests(unittest.TestCase):
         received = self.ctrl.TextBlock()
         self.assertEquals("\t\t\tFF", received)
 
+    def testBurst(self):
+        "Make sure that the burst mode types a long text"
+        text = "The quick brown fox jumps over the lazy dog " * 50
+        SendKeys(text + "{ENTER}end", with_spaces = True, burst = True)
+        received = self.ctrl.TextBlock()
+        self.assertEquals(text + "\r\nend", received)
+
+    def testPaced(self):
+        "Make sure that the paced mode doesn't drop the keys"
+        text = "The quick brown fox jumps over the lazy dog " * 50
+        SendKeys(text, with_spaces = True, paced = True)
+        received = self.ctrl.TextBlock()
+        self.assertEquals(text, received)
+
+    def testPacedWaitIdle(self):
+        "Make sure that the paced mode waits for the given target after each burst"
+        waits = []
+        SendKeys("abc{PAUSE 0.1}def", paced = True, wait_idle = lambda: waits.append(1) or 0.)
+        self.assertEquals("abcdef", self.ctrl.TextBlock())
+        self.assertTrue(len(waits) >= 2)
+
+    def testTypeKeysPacedWaitsForWindow(self):
+        "Make sure that type_keys() waits for the thread of its window, not the foreground one"
+        ctrl = self.ctrl.WrapperObject()
+        handles = []
+        wait_window_idle = SendKeysCtypes.wait_window_idle
+        SendKeysCtypes.wait_window_idle = lambda handle: handles.append(handle) or 0.
+        try:
+            ctrl.type_keys("abc", paced = True, set_foreground = True)
+        finally:
+            SendKeysCtypes.wait_window_idle = wait_window_idle
+        self.assertEquals([ctrl.handle], list(set(handles)))
+
+    def testBurstWithPause(self):
+        "Make sure that the burst mode waits for the explicit pauses"
+        SendKeys("{TAB 3}{PAUSE 0.5}{F 2}", burst = True)
+        received = self.ctrl.TextBlock()
+        self.assertEquals("\t\t\tFF", received)
+
+    def testCompileBurst(self):
+        "Make sure that only the pauses and the chunk size split the inputs"
+        compiled = compile_burst(compile_keys("ab{PAUSE 0.1}c"), chunk_size = 3)
+        self.assertEquals([3, 1, None, 2], [None if isinstance(item, PauseAction) else len(item)
+                                            for item in compiled])
+
+    def testBurstRepetition(self):
+        "Make sure that a long repetition is sent in chunks"
+        compiled = compile_burst(compile_keys("{a 1500}b"), chunk_size = 1000)
+        self.assertEquals([1000, 1000, 1000, 2], [len(item) for item in compiled])
+
+        SendKeys("{a 1500}b", burst = True)
+        received = self.ctrl.TextBlock()
+        self.assertEquals("a" * 1500 + "b", received)
+
+    def testTypeKeysStream(self):
+        "Make sure that a file is typed chunk by chunk"
+        text = "The quick brown fox jumps over the lazy dog\n" * 100
+        self.ctrl.type_keys_stream(io.StringIO(text), chunk_size = 500,
+                                   with_spaces = True, with_newlines = True)
+        received = self.ctrl.TextBlock()
+        self.assertEquals(text.replace("\n", "\r\n"), received)
+
+    def testTypeKeysStreamLog(self):
+        "Make sure that the typed keys are logged (not the characters of the markup)"
+        messages = []
+        ctrl = self.ctrl.WrapperObject()
+        ctrl.actions = type('Logger', (object,), {'log': lambda _, message: messages.append(message)})()
+        ctrl.type_keys_stream("{a 100}+b")
+        self.assertTrue(messages[-1].startswith("Typed 103 keys"), messages[-1])
+
 
 class SendKeysModifiersTests(unittest.TestCase):
     "Unit tests for the Sendkeys module (modifiers)"
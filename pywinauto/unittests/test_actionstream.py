@@ -0,0 +1,168 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"Tests for actionstream.py"
+
+import os
+import sys
+import time
+import tempfile
+import unittest
+
+sys.path.append(".")
+from pywinauto import keyparser
+from pywinauto.actionstream import ActionStreamWriter, ActionStream, open_stream
+from pywinauto.actionstream import HEADER, RECORD, ACTION_KEY, ACTION_GROUP, MOUSE_BUTTONS
+
+
+class _Recorder(object):
+    "Record the replayed actions"
+
+    def __init__(self):
+        self.actions = []
+
+    def send_key(self, kind, code, state):
+        self.actions.append(('key', kind, code, state))
+
+    def click(self, *args):
+        self.actions.append(('mouse',) + args)
+
+    def replay(self, stream):
+        stream.replay(pause = 0, send_key = self.send_key, click = self.click)
+        return self.actions
+
+
+class ActionStreamTests(unittest.TestCase):
+    "Unit tests for the ActionStreamWriter and ActionStream classes"
+
+    def replay(self, writer):
+        "Replay the stream of the writer and return the actions"
+        return _Recorder().replay(ActionStream(writer.to_bytes()))
+
+    def testKeys(self):
+        "Make sure that the keys are replayed as they were parsed"
+        writer = ActionStreamWriter()
+        writer.add_keys('+(ab){ENTER}~')
+        expected = [('key',) + key for key in keyparser.compile_keys('+(ab){ENTER}~')]
+        self.assertEqual(expected, self.replay(writer))
+
+    def testRepetitions(self):
+        "Make sure that a repetition is kept as one record"
+        writer = ActionStreamWriter()
+        writer.add_keys('{a 100000}')
+        self.assertEqual(1, len(writer))
+        self.assertEqual(HEADER.size + RECORD.size, len(writer.to_bytes()))
+
+        actions = self.replay(writer)
+        self.assertEqual(100000, len(actions))
+        self.assertEqual(('key', keyparser.KEY_UNICODE, ord('a'), keyparser.KEY_DOWN_UP),
+                         actions[-1])
+
+    def testGroup(self):
+        "Make sure that a repeated group is prefixed by the number of its records"
+        writer = ActionStreamWriter()
+        writer.add_keys('{ab 3}c')
+        records = list(ActionStream(writer.to_bytes()).records())
+        self.assertEqual([ACTION_GROUP, ACTION_KEY, ACTION_KEY, ACTION_KEY],
+                         [record[0] for record in records])
+        self.assertEqual((2, 3), records[0][3:5])
+
+        codes = [action[2] for action in self.replay(writer)]
+        self.assertEqual([ord(char) for char in 'ababab' + 'c'], codes)
+
+    def testMouseAndPause(self):
+        "Make sure that the mouse actions and the pauses are replayed in order"
+        writer = ActionStreamWriter()
+        writer.add_mouse('right', (10, -20), double = True)
+        writer.add_pause(.2)
+        writer.add_mouse('wheel', (5, 5), button_up = False, wheel_dist = -3)
+
+        start = time.time()
+        actions = self.replay(writer)
+        self.assertTrue(time.time() - start >= .2)
+        self.assertEqual([('mouse', 'right', (10, -20), True, True, True, 0),
+                          ('mouse', 'wheel', (5, 5), False, True, False, -3)], actions)
+        self.assertRaises(ValueError, writer.add_mouse, 'forward')
+
+    def testMappedFile(self):
+        "Make sure that a saved stream is replayed from the mapped file"
+        writer = ActionStreamWriter()
+        writer.add_keys('abc{ab 2}')
+        writer.add_mouse('left', (1, 2))
+
+        handle, filename = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            writer.save(filename)
+            with open_stream(filename) as stream:
+                self.assertEqual(len(writer), len(stream))
+                actions = _Recorder().replay(stream)
+        finally:
+            os.remove(filename)
+
+        self.assertEqual(self.replay(writer), actions)
+
+    def testWrongBuffer(self):
+        "Make sure that a wrong or truncated buffer is not accepted"
+        writer = ActionStreamWriter()
+        writer.add_keys('abc')
+        data = writer.to_bytes()
+
+        self.assertRaises(ValueError, ActionStream, b'PW')
+        self.assertRaises(ValueError, ActionStream, b'XXXX' + data[4:])
+        self.assertRaises(ValueError, ActionStream, data[:4] + b'\x02\x00' + data[6:])
+        self.assertRaises(ValueError, ActionStream, data[:-1])
+
+    def testWrongGroup(self):
+        "Make sure that a group out of the stream or its parent group is not replayed"
+        writer = ActionStreamWriter()
+        writer.add_keys('{ab 3}c')
+        data = writer.to_bytes()
+        group = ActionStream(data).records()
+        action, flags, small, first, second, real = next(group)
+
+        # the group claims more records than the stream has
+        for records in (4, -1):
+            wrong = data[:HEADER.size] + RECORD.pack(action, flags, small, records, second, real) + \
+                data[HEADER.size + RECORD.size:]
+            self.assertRaises(ValueError, _Recorder().replay, ActionStream(wrong))
+
+        # a nested group longer than its parent group
+        key = RECORD.pack(ACTION_KEY, keyparser.KEY_DOWN_UP, keyparser.KEY_UNICODE, ord('a'), 1, 0.)
+        records = [RECORD.pack(ACTION_GROUP, 0, 0, 2, 1, 0.),
+                   RECORD.pack(ACTION_GROUP, 0, 0, 3, 2, 0.),
+                   key, key, key]
+        wrong = HEADER.pack(b'PWAS', 1, RECORD.size, len(records)) + b''.join(records)
+        self.assertRaises(ValueError, _Recorder().replay, ActionStream(wrong))
+
+    def testWrongMouseButton(self):
+        "Make sure that a corrupt button of a mouse action is not replayed"
+        writer = ActionStreamWriter()
+        writer.add_mouse('left', (1, 2))
+        data = writer.to_bytes()
+        action, flags, small, first, second, real = next(ActionStream(data).records())
+
+        for button in (len(MOUSE_BUTTONS), 255):
+            wrong = data[:HEADER.size] + RECORD.pack(action, flags, button, first, second, real)
+            self.assertRaises(ValueError, _Recorder().replay, ActionStream(wrong))
+
+
+if __name__ == "__main__":
+    unittest.main()
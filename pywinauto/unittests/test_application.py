@@ -30,6 +30,9 @@ import sys
 import os
 import unittest
 import time
+import threading
+import tempfile
+import json
 #import pprint
 #import pdb
 import warnings
@@ -38,11 +41,17 @@ sys.path.append(".")
 from pywinauto import application
 from pywinauto.controls import HwndWrapper
 from pywinauto.application import Application, WindowSpecification, process_module
+from pywinauto.application import StartupProfile
 from pywinauto.application import ProcessNotFoundError, AppStartError, AppNotConnected
-from pywinauto import findwindows, findbestmatch
+from pywinauto import findwindows, findbestmatch, timings
 from pywinauto.timings import Timings, TimeoutError, WaitUntil
 from pywinauto.sysinfo import is_x64_Python, is_x64_OS
 from pywinauto import backend
+from pywinauto import six
+from pywinauto.win32structures import RECT
+from pywinauto.resolutionhints import ResolutionHints
+from pywinauto.unittests import synthetic
+from pywinauto.unittests.synthetic import SyntheticElementInfo
 
 #application.set_timing(1, .01, 1, .01, .05, 0, 0, .1, 0, .01)
 
@@ -205,6 +214,20 @@ class ApplicationTestCases(unittest.TestCase):
 #
 #        app.UntitledNotepad.MenuSelect("File->Exit")
 
+    def testStartReadinessPhases(self):
+        "Make sure that start() waits for the requested phases and records them"
+        app = Application()
+        app.start(_notepad_exe(), wait_for_window = True, cpu_threshold = 50,
+                  ready_spec = 'UntitledNotepad')
+
+        profile = app.startup_profile
+        self.assertEqual(['process_created', 'input_idle', 'top_window', 'cpu_idle', 'spec_ready'],
+                         [phase for phase, _ in profile.phases])
+        self.assertEqual(None, profile.failed_phase)
+        self.assertTrue(app.UntitledNotepad.Exists(timeout = 0))
+
+        app.UntitledNotepad.MenuSelect("File->Exit")
+
     def testStart_bug01(self):
         "On SourceForge forum AppStartError forgot to include %s for application name"
         app = Application()
@@ -535,6 +558,482 @@ class ApplicationTestCases(unittest.TestCase):
         self.assertRaises(AttributeError, app.UntitledNotepad.Edit)
 
 
+class SyntheticBackendTestCases(unittest.TestCase):
+    "Unit tests for the Application class which don't need a real application"
+
+    def setUp(self):
+        """Register a synthetic back-end and replace the search of elements
+        by the synthetic one"""
+        synthetic.register(HwndWrapper.HwndWrapper)
+        self.active_element = SyntheticElementInfo(0x1234, process_id = 42)
+        self.polls_before_active = 0
+        self.calls = []
+
+        self.find_elements = application.findwindows.find_elements
+        application.findwindows.find_elements = self.synthetic_find_elements
+
+        self.app = Application(backend = synthetic.BACKEND)
+        self.app.process = 42
+
+    def tearDown(self):
+        "Restore the search of elements and remove the back-end"
+        application.findwindows.find_elements = self.find_elements
+        synthetic.unregister()
+
+    def synthetic_find_elements(self, **kwargs):
+        "Return the active element after the specified number of polls"
+        self.calls.append(kwargs)
+        if len(self.calls) <= self.polls_before_active:
+            return []
+        if kwargs.get('active_only') and kwargs.get('process') == self.active_element.process_id:
+            return [self.active_element]
+        return []
+
+    def testActiveReturnsImmediately(self):
+        "Make sure that active_() doesn't wait if the window is active already"
+        start = time.time()
+        spec = self.app.active_()
+
+        self.assertTrue(time.time() - start < Timings.window_find_retry)
+        self.assertEqual(1, len(self.calls))
+        self.assertEqual(0x1234, spec.criteria[0]['handle'])
+        self.assertEqual(synthetic.BACKEND, spec.criteria[0]['backend'])
+
+    def testActiveWaitsForWindow(self):
+        "Make sure that active_() returns as soon as the window becomes active"
+        self.polls_before_active = 3
+        spec = self.app.active_(timeout = 5, retry_interval = .01)
+
+        self.assertEqual(4, len(self.calls))
+        self.assertEqual(0x1234, spec.criteria[0]['handle'])
+
+    def testActiveTimeout(self):
+        "Make sure that active_() raises if no window becomes active"
+        self.app.process = 43
+        start = time.time()
+        self.assertRaises(RuntimeError, self.app.active_, timeout = .3, retry_interval = .05)
+        self.assertTrue(time.time() - start < 1)
+
+    def testWaitCPUUsageLowerSampled(self):
+        "Make sure that WaitCPUUsageLower() uses the samples of the CPU usage sampler"
+        calls = []
+        def cpu_time():
+            "The process is busy for the first 3 calls"
+            calls.append(time.time())
+            return min(len(calls), 3) * 1000.
+
+        self.app.start_cpu_sampler(interval = .01, source = cpu_time)
+        try:
+            self.app.WaitCPUUsageLower(threshold = 2.5, timeout = 5)
+            self.assertTrue(len(calls) > 3)
+            self.assertEqual(0., self.app.CPUUsage())
+        finally:
+            self.app.stop_cpu_sampler()
+        self.assertEqual(None, self.app.cpu_sampler)
+
+    def testWaitCPUUsageLowerSampledAverage(self):
+        "Make sure that WaitCPUUsageLower() waits for the average of the samples"
+        calls = []
+        def cpu_time():
+            "The process is busy for the first 3 calls (2 busy samples)"
+            calls.append(time.time())
+            return min(len(calls), 3) * 1000.
+
+        self.app.start_cpu_sampler(interval = .01, size = 4, source = cpu_time)
+        try:
+            self.app.WaitCPUUsageLower(threshold = 2.5, timeout = 5)
+            # the busy samples are out of the last 4 samples
+            self.assertTrue(len(calls) >= 7)
+        finally:
+            self.app.stop_cpu_sampler()
+
+    def testWaitCPUUsageLowerSamplerStopped(self):
+        "Make sure that WaitCPUUsageLower() measures the CPU usage if the sampler stops"
+        sampler = self.app.start_cpu_sampler(interval = .01, source = lambda: time.time() * 1000.)
+        measured = []
+        def cpu_usage(interval = None):
+            "The CPU usage measured directly"
+            measured.append(interval)
+            return 0.
+        self.app.CPUUsage = cpu_usage
+
+        # the sampler thread stops without an error
+        threading.Timer(.1, sampler._stop_event.set).start()
+        start = time.time()
+        try:
+            self.app.WaitCPUUsageLower(timeout = 2, usage_interval = .05)
+        finally:
+            self.app.stop_cpu_sampler()
+        self.assertTrue(time.time() - start < 1)
+        self.assertEqual([.05], measured)
+
+    def testWaitCPUUsageLowerSampledTimeout(self):
+        "Make sure that WaitCPUUsageLower() raises if the sampled CPU usage is high"
+        self.app.start_cpu_sampler(interval = .01, source = lambda: time.time() * 1000.)
+        try:
+            self.assertRaises(RuntimeError, self.app.WaitCPUUsageLower, timeout = .2)
+        finally:
+            self.app.stop_cpu_sampler()
+
+
+class WaitAnyAllTestCases(unittest.TestCase):
+    "Unit tests for Application.wait_any() and Application.wait_all()"
+
+    def setUp(self):
+        "Register a synthetic back-end with some top level windows"
+        synthetic.register()
+        SyntheticElementInfo.windows = [
+            SyntheticElementInfo(1, title = "Progress"),
+            SyntheticElementInfo(2, title = "Error"),
+            ]
+
+        self.app = Application(backend = synthetic.BACKEND)
+        self.app.process = 42
+        self.progress = self.app.window_(title = "Progress")
+        self.error = self.app.window_(title = "Error")
+        self.save_as = self.app.window_(title = "Save As")
+
+    def tearDown(self):
+        "Remove the back-end"
+        synthetic.unregister()
+
+    def testWaitAnyReturnsFirstMatched(self):
+        "Make sure that the first matched specification is returned"
+        spec = self.app.wait_any([self.save_as, self.error, self.progress], timeout = 1)
+        self.assertTrue(spec is self.error)
+
+    def testWaitAnyEnumeratesOnce(self):
+        "Make sure that the specifications share the enumeration of top level windows"
+        self.app.wait_any([self.save_as, self.error], timeout = 1)
+        self.assertEqual(1, SyntheticElementInfo.enumerations)
+
+    def testWaitAnyPolls(self):
+        "Make sure that wait_any() returns as soon as a window appears"
+        save_as = SyntheticElementInfo(3, title = "Save As")
+        timer = threading.Timer(.2, SyntheticElementInfo.windows.append, [save_as])
+        timer.start()
+        start = time.time()
+        try:
+            spec = self.app.wait_any([self.save_as], timeout = 5, retry_interval = .01)
+        finally:
+            timer.join()
+        self.assertTrue(spec is self.save_as)
+        self.assertTrue(time.time() - start < 1)
+        self.assertTrue(SyntheticElementInfo.enumerations > 1)
+
+    def testWaitAnyTimeout(self):
+        "Make sure that wait_any() raises if no window appears"
+        start = time.time()
+        self.assertRaises(TimeoutError, self.app.wait_any,
+                          [self.save_as], timeout = .3, retry_interval = .05)
+        self.assertTrue(time.time() - start < 1)
+
+    def testWaitAll(self):
+        "Make sure that wait_all() returns all the specifications"
+        specs = self.app.wait_all([self.progress, self.error], 'exists visible', timeout = 1)
+        self.assertEqual([self.progress, self.error], specs)
+        self.assertEqual(1, SyntheticElementInfo.enumerations)
+
+    def testWaitAllTimeout(self):
+        "Make sure that wait_all() raises if any window doesn't appear"
+        self.assertRaises(TimeoutError, self.app.wait_all,
+                          [self.progress, self.save_as], timeout = .3, retry_interval = .05)
+
+
+class ProcessIndexTestCases(unittest.TestCase):
+    "Unit tests for the search of the application windows by the process index"
+
+    def setUp(self):
+        "Register a synthetic back-end with windows of several processes"
+        synthetic.register()
+        SyntheticElementInfo.windows = [
+            SyntheticElementInfo(1, title = "Explorer", process_id = 7),
+            SyntheticElementInfo(2, title = "Progress"),
+            SyntheticElementInfo(3, title = "Mail", process_id = 8),
+            SyntheticElementInfo(4, title = "Error"),
+            ]
+
+        self.app = Application(backend = synthetic.BACKEND)
+        self.app.process = 42
+
+    def tearDown(self):
+        "Remove the back-end"
+        synthetic.unregister()
+
+    def testWindowsOfProcess(self):
+        "Make sure that only the windows of the process are returned in order"
+        self.assertEqual(["Progress", "Error"],
+                         [win.window_text() for win in self.app.windows_()])
+        self.assertEqual(2, self.app.top_window_().criteria[0]['handle'])
+
+    def testIndexBuiltOncePerSnapshot(self):
+        "Make sure that the process of each window is read once per enumeration"
+        with findwindows.top_level_snapshot():
+            self.app.windows_()
+            self.app.window_(title = "Error").WrapperObject()
+            self.assertEqual([2, 4], [elem.handle for elem in
+                                      findwindows.process_index(synthetic.BACKEND)[42]])
+
+        self.assertEqual(1, SyntheticElementInfo.enumerations)
+        self.assertEqual(4, SyntheticElementInfo.process_id_reads)
+
+    def testPlainSearchFiltersProcessLast(self):
+        "Make sure that a search outside a snapshot reads the processes of the matched windows only"
+        self.assertEqual([], findwindows.find_elements(
+            process = 42, class_name = "Dialog", backend = synthetic.BACKEND))
+        self.assertEqual(0, SyntheticElementInfo.process_id_reads)
+
+        self.assertEqual(2, len(findwindows.find_elements(
+            process = 42, class_name = "SyntheticWindow", backend = synthetic.BACKEND)))
+        self.assertEqual(4, SyntheticElementInfo.process_id_reads)
+
+    def testWaitAnySharesIndex(self):
+        "Make sure that wait_any() reads the processes once per poll"
+        self.app.wait_any([self.app.window_(title = "Save As"),
+                           self.app.window_(title = "Error")], timeout = 1)
+        self.assertEqual(4, SyntheticElementInfo.process_id_reads)
+
+
+class ResolutionHintsTestCases(unittest.TestCase):
+    "Unit tests for the resolution hints of the Application"
+
+    def setUp(self):
+        "Register a synthetic back-end and use an empty hints store"
+        synthetic.register()
+        self.progress = SyntheticElementInfo(1, title = "Progress 10%")
+        SyntheticElementInfo.windows = [SyntheticElementInfo(2, title = "Error"), self.progress]
+
+        self.app = Application(backend = synthetic.BACKEND)
+        self.app.hints = ResolutionHints()
+        self.app.process = 42
+
+    def tearDown(self):
+        "Remove the back-end"
+        synthetic.unregister()
+
+    def testHintsRecordedAndUsed(self):
+        "Make sure that the second resolution uses the recorded locator"
+        spec = self.app.window_(title_re = "Progress.*")
+        self.assertEqual(1, spec.WrapperObject().handle)
+        self.assertEqual(0, self.app.hints.hits)
+
+        self.assertEqual(1, self.app.window_(title_re = "Progress.*").WrapperObject().handle)
+        self.assertEqual(1, self.app.hints.hits)
+        self.assertEqual(0, self.app.hints.misses)
+
+    def testHintsFallback(self):
+        "Make sure that the full search is used if the locator doesn't match"
+        spec = self.app.window_(title_re = "Progress.*")
+        spec.WrapperObject()
+
+        self.progress._title = "Progress 20%"
+        self.assertEqual(1, spec.WrapperObject().handle)
+        self.assertEqual(0, self.app.hints.hits)
+        self.assertEqual(1, self.app.hints.misses)
+
+        # the new locator is recorded
+        spec.WrapperObject()
+        self.assertEqual(1, self.app.hints.hits)
+
+    def testWriteAppData(self):
+        "Make sure that the hints can be written and read back"
+        self.app.window_(title = "Error").WrapperObject()
+        handle, filename = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            self.app.WriteAppData(filename)
+            app = Application(backend = synthetic.BACKEND, datafilename = filename)
+            self.assertEqual(self.app.hints.hints, app.hints.hints)
+        finally:
+            os.remove(filename)
+
+
+class ControlIdentifiersTestCases(unittest.TestCase):
+    "Unit tests for WindowSpecification.print_control_identifiers()"
+
+    def setUp(self):
+        "Register a synthetic back-end with a dialog"
+        synthetic.register()
+        SyntheticElementInfo.windows = [
+            SyntheticElementInfo(1, "#32770", "Find", rect = (0, 0, 300, 200), children = [
+                SyntheticElementInfo(2, "Static", "Find what:", rect = (10, 10, 80, 30)),
+                SyntheticElementInfo(3, "Edit", "", rect = (90, 10, 200, 30)),
+                SyntheticElementInfo(4, "GroupBox", "Options", rect = (10, 40, 200, 150), children = [
+                    SyntheticElementInfo(5, "Button", "OK", rect = (20, 60, 100, 80)),
+                    SyntheticElementInfo(6, "Button", "OK", rect = (20, 90, 100, 110)),
+                    ]),
+                ]),
+            ]
+
+        self.app = Application(backend = synthetic.BACKEND)
+        self.app.process = 42
+        self.dlgspec = self.app.window_(title = "Find")
+
+    def tearDown(self):
+        "Remove the back-end"
+        synthetic.unregister()
+
+    def identifiers(self, **kwargs):
+        "Return the JSON objects printed for the dialog"
+        output = six.StringIO()
+        self.dlgspec.print_control_identifiers(output = output, format = 'json', **kwargs)
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def testText(self):
+        "Make sure that the text output is the same as before"
+        output = six.StringIO()
+        self.dlgspec.print_control_identifiers(output = output)
+        lines = output.getvalue().split("\n")
+
+        self.assertEqual("Control Identifiers:", lines[0])
+        self.assertEqual("Static - 'Find what:'   {0}\t".format(RECT(10, 10, 80, 30)), lines[1])
+        self.assertEqual("'Find what:' 'Find what:Static' 'Static' ", lines[2])
+        self.assertEqual("", lines[3])
+
+    def testTextBaseline(self):
+        "Make sure that the default output has all the names of the whole dialog map"
+        output = six.StringIO()
+        self.dlgspec.print_control_identifiers(output = output)
+
+        # the output of print_control_identifiers before the streaming mode
+        dialog = self.dlgspec.WrapperObject()
+        controls = dialog.children()
+        control_name_map = {}
+        for name, ctrl in findbestmatch.build_unique_dict(controls).items():
+            control_name_map.setdefault(ctrl, []).append(name)
+        baseline = ["Control Identifiers:\n"]
+        for ctrl in controls:
+            if ctrl.is_visible():
+                baseline.append("{0} - '{1}'   {2}\t\n".format(
+                    ctrl.friendly_class_name(), ctrl.window_text(), str(ctrl.rectangle())))
+                baseline.append("".join("'{0}' ".format(name)
+                                        for name in sorted(control_name_map[ctrl])) + "\n\n")
+
+        self.assertEqual("".join(baseline), output.getvalue())
+        self.assertTrue("'OK0' 'OK1' " in output.getvalue())
+
+    def testUniqueNames(self):
+        "Make sure that the names are made unique among the controls"
+        names = [ctrl['names'] for ctrl in self.identifiers()]
+        self.assertEqual(5, len(names))
+        self.assertEqual(['Button', 'OK', 'OKButton'], names[3])
+        self.assertEqual(['Button2', 'OK2', 'OKButton2'], names[4])
+
+    def testDepth(self):
+        "Make sure that the controls below the depth are not printed"
+        texts = [ctrl['text'] for ctrl in self.identifiers(depth = 1)]
+        self.assertEqual(["Find what:", "", "Options"], texts)
+
+        self.assertEqual(5, len(self.identifiers(depth = 2)))
+        self.assertEqual([], self.identifiers(depth = 0))
+
+    def testDepthUniqueNames(self):
+        "Make sure that the names are unique among the controls below the depth too"
+        dialog = SyntheticElementInfo.windows[0]
+        ok = SyntheticElementInfo(7, "Button", "OK", rect = (210, 10, 290, 30))
+        ok._parent = dialog
+        dialog._children.append(ok)
+        ctrls = self.identifiers(depth = 1)
+        self.assertEqual(["Find what:", "", "Options", "OK"], [ctrl['text'] for ctrl in ctrls])
+        self.assertEqual(['Button3', 'OK3', 'OKButton3'], ctrls[3]['names'])
+
+    def testFilter(self):
+        "Make sure that only the filtered controls are printed"
+        ctrls = self.identifiers(filter = lambda ctrl: ctrl.class_name() == "Button")
+        self.assertEqual(2, len(ctrls))
+
+        # the names are still unique among all the controls
+        self.assertEqual(['Button2', 'OK2', 'OKButton2'], ctrls[1]['names'])
+        self.assertEqual([20, 90, 100, 110], ctrls[1]['rectangle'])
+
+    def testStreaming(self):
+        "Make sure that the identifiers are yielded one by one"
+        identifiers = self.dlgspec._ctrl_identifiers()
+        ctrl, names = next(identifiers)
+        self.assertEqual("Static", ctrl.class_name())
+        self.assertEqual(4, len(list(identifiers)))
+
+    def testWrongFormat(self):
+        "Make sure that an unknown format is not accepted"
+        self.assertRaises(ValueError, self.dlgspec.print_control_identifiers, format = 'xml')
+
+
+class CalibrationSamplesTestCases(unittest.TestCase):
+    "Unit tests for the samples of the timings calibration"
+
+    def setUp(self):
+        "Register a synthetic back-end with a dialog and start the calibration"
+        synthetic.register()
+        SyntheticElementInfo.windows = [
+            SyntheticElementInfo(1, "#32770", "Find", rect = (0, 0, 300, 200)),
+            ]
+        self.app = Application(backend = synthetic.BACKEND)
+        self.app.process = 42
+        timings.calibration.reset()
+        timings.calibration.start()
+
+    def tearDown(self):
+        "Stop the calibration and remove the back-end"
+        timings.calibration.stop()
+        timings.calibration.reset()
+        synthetic.unregister()
+
+    def testWaitIsOneSample(self):
+        "Make sure that one Wait adds exactly one sample"
+        self.app.window_(title = "Find").Wait('exists visible enabled')
+        self.assertEqual({'window_find_timeout': 1}, dict(
+            (setting, len(samples)) for setting, samples in timings.calibration.observations.items()))
+
+    def testResolveIsOneSample(self):
+        "Make sure that resolving of a dialog adds one sample"
+        self.app.window_(title = "Find").WrapperObject()
+        self.assertEqual(1, len(timings.calibration.observations['window_find_timeout']))
+
+    def testWaitAnyNotSampled(self):
+        "Make sure that the single checks of wait_any add no samples"
+        self.app.wait_any([self.app.window_(title = "Find")], timeout = 1)
+        self.assertEqual({}, timings.calibration.observations)
+
+
+class StartupProfileTestCases(unittest.TestCase):
+    "Unit tests for the StartupProfile class"
+
+    def setUp(self):
+        "Create a profile with some phases"
+        self.profile = StartupProfile(start_time = 100.)
+        self.profile.mark('process_created', 100.5)
+        self.profile.mark('input_idle', 101.)
+        self.profile.mark('top_window', 103.)
+
+    def testElapsed(self):
+        "Make sure that the time since the start is returned"
+        self.assertEqual(1., self.profile.elapsed('input_idle'))
+        self.assertEqual(3., self.profile.elapsed('top_window'))
+        self.assertEqual(None, self.profile.elapsed('cpu_idle'))
+
+    def testDurations(self):
+        "Make sure that the durations of the phases are returned"
+        self.assertEqual([('process_created', .5), ('input_idle', .5), ('top_window', 2.)],
+                         self.profile.durations())
+        self.assertEqual(3., self.profile.total)
+
+    def testAsDict(self):
+        "Make sure that the profile can be saved as JSON"
+        self.profile.failed_phase = 'cpu_idle'
+        data = json.loads(json.dumps(self.profile.as_dict()))
+        self.assertEqual(['top_window', 3.], data['phases'][-1])
+        self.assertEqual('cpu_idle', data['failed_phase'])
+        self.assertTrue('cpu_idle: timed out' in str(self.profile))
+
+    def testUnknownPhase(self):
+        "Make sure that only the known phases are recorded"
+        self.assertRaises(ValueError, self.profile.mark, 'splash_screen')
+
+    def testEmpty(self):
+        "Make sure that an empty profile has zero total"
+        self.assertEqual(0., StartupProfile().total)
+
+
 class WindowSpecificationTestCases(unittest.TestCase):
     "Unit tests for the application.Application class"
 
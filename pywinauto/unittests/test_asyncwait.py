@@ -0,0 +1,195 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"Tests for asyncwait.py"
+
+import sys
+import time
+import unittest
+
+sys.path.append(".")
+if sys.version_info >= (3, 5):
+    import asyncio
+    from pywinauto import asyncwait
+from pywinauto import timings
+from pywinauto.cpusampler import CPUUsageSampler
+from pywinauto.timings import Timings, TimeoutError
+
+
+class _FakeSpec(object):
+    "Window specification which is ready after the specified number of checks"
+
+    def __init__(self, checks_before_ready):
+        self.checks_before_ready = checks_before_ready
+        self.checks = []
+
+    def _check_conditions_now(self, wait_for):
+        self.checks.append(wait_for)
+        return len(self.checks) > self.checks_before_ready
+
+    def WrapperObject(self):
+        return self
+
+
+class _TimingsSpec(_FakeSpec):
+    "Window specification which records the timings seen by the checks"
+
+    def __init__(self, checks_before_ready):
+        _FakeSpec.__init__(self, checks_before_ready)
+        self.timings = []
+
+    def _check_conditions_now(self, wait_for):
+        self.timings.append((Timings.window_find_timeout, timings.clip_timeout(100)))
+        return _FakeSpec._check_conditions_now(self, wait_for)
+
+
+class _FakeApp(object):
+    "Application which consumes CPU time for the specified number of samples"
+
+    def __init__(self, busy_samples):
+        self.busy_samples = busy_samples
+        self.cpu_time = 0.
+        self.cpu_sampler = None
+
+    def _process_cpu_time(self):
+        if self.busy_samples > 0:
+            self.busy_samples -= 1
+            self.cpu_time += 1000.
+        return self.cpu_time
+
+
+@unittest.skipIf(sys.version_info < (3, 5), "asyncio coroutines need Python 3.5+")
+class AsyncWaitTests(unittest.TestCase):
+    "Unit tests for the awaitable waits"
+
+    def setUp(self):
+        "Create a new event loop"
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        "Close the event loop"
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    def run_coroutine(self, coroutine):
+        "Run the coroutine until it's complete"
+        return self.loop.run_until_complete(coroutine)
+
+    def testWaitAsync(self):
+        "Make sure that wait_async() returns the wrapper when it's ready"
+        spec = _FakeSpec(3)
+        ctrl = self.run_coroutine(asyncwait.wait_async(spec, 'ready', 5, .01))
+        self.assertTrue(ctrl is spec)
+        self.assertEqual(['ready'] * 4, spec.checks)
+
+    def testWaitAsyncTimeout(self):
+        "Make sure that wait_async() raises TimeoutError"
+        spec = _FakeSpec(1000)
+        self.assertRaises(TimeoutError, self.run_coroutine,
+                          asyncwait.wait_async(spec, 'ready', .2, .05))
+
+    def testExistsAsync(self):
+        "Make sure that exists_async() returns True or False"
+        self.assertTrue(self.run_coroutine(asyncwait.exists_async(_FakeSpec(2), 1, .01)))
+        self.assertFalse(self.run_coroutine(asyncwait.exists_async(_FakeSpec(1000), .1, .05)))
+
+    def testWaitNotAsync(self):
+        "Make sure that wait_not_async() waits for a False check"
+        spec = _FakeSpec(0)
+        self.assertRaises(TimeoutError, self.run_coroutine,
+                          asyncwait.wait_not_async(spec, 'exists', .1, .05))
+
+    def testConcurrentWaits(self):
+        "Make sure that many waits run concurrently in one event loop"
+        specs = [_FakeSpec(5) for _ in range(20)]
+        start = time.time()
+        ctrls = self.run_coroutine(asyncio.gather(
+            *[asyncwait.wait_async(spec, 'exists', 5, .1) for spec in specs]))
+        # 20 sequential waits would take at least 20 * 5 * .1 = 10 seconds
+        self.assertTrue(time.time() - start < 3)
+        self.assertEqual(specs, ctrls)
+
+    def testOverridesReachExecutor(self):
+        "Make sure that the checks run with the overrides and the deadline of the caller"
+        spec = _TimingsSpec(1)
+        with Timings.override(window_find_timeout = 1.5):
+            with timings.deadline(10):
+                coroutine = asyncwait.wait_async(spec, 'ready', 5, .01)
+        self.run_coroutine(coroutine)
+
+        self.assertEqual(2, len(spec.timings))
+        for window_find_timeout, timeout in spec.timings:
+            self.assertEqual(1.5, window_find_timeout)
+            self.assertTrue(timeout <= 10)
+
+    def testDeadlineCapturedAtCall(self):
+        "Make sure that the deadline of the caller limits the wait"
+        with timings.deadline(.2):
+            coroutine = asyncwait.wait_async(_FakeSpec(1000), 'ready', 10, .05)
+        start = time.time()
+        self.assertRaises(TimeoutError, self.run_coroutine, coroutine)
+        self.assertTrue(time.time() - start < 2)
+
+    def testDeadlineNotShared(self):
+        "Make sure that a deadline of one coroutine doesn't limit the others"
+        # the deadline is entered on the thread of the loop for a while
+        # (as another coroutine would do inside a "with deadline" block)
+        held = timings.deadline(0)
+        self.loop.call_soon(held.__enter__)
+        self.loop.call_later(.3, held.__exit__, None, None, None)
+
+        spec = _TimingsSpec(3)
+        self.run_coroutine(asyncio.gather(
+            asyncio.sleep(.4), asyncwait.wait_async(spec, 'ready', 5, .05)))
+        self.assertEqual(4, len(spec.checks))
+        self.assertEqual([100] * 4, [timeout for _, timeout in spec.timings])
+
+    def testWaitCPUUsageLowerAsync(self):
+        "Make sure that the CPU usage is sampled until it's lower"
+        app = _FakeApp(3)
+        self.assertTrue(app is self.run_coroutine(
+            asyncwait.wait_cpu_usage_lower_async(app, 2.5, 5, .01)))
+        self.assertEqual(0, app.busy_samples)
+
+    def testWaitCPUUsageLowerAsyncTimeout(self):
+        "Make sure that RuntimeError is raised if the CPU usage is high"
+        app = _FakeApp(1000)
+        self.assertRaises(RuntimeError, self.run_coroutine,
+                          asyncwait.wait_cpu_usage_lower_async(app, 2.5, .1, .02))
+
+    def testWaitCPUUsageLowerAsyncSampler(self):
+        "Make sure that the moving average of the running sampler is used"
+        # the polled CPU usage stays high
+        app = _FakeApp(1000)
+        source = _FakeApp(3)
+        app.cpu_sampler = CPUUsageSampler(source._process_cpu_time, interval = .01, size = 2)
+        app.cpu_sampler.start()
+        try:
+            self.assertTrue(app is self.run_coroutine(
+                asyncwait.wait_cpu_usage_lower_async(app, 2.5, 5, .01)))
+        finally:
+            app.cpu_sampler.stop()
+        self.assertEqual(1000, app.busy_samples)
+        self.assertEqual(0, source.busy_samples)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+
+"Tests for cacheutils.py"
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(".")
+from pywinauto.cacheutils import LRUCache, save_versioned, load_versioned
+
+
+class LRUCacheTests(unittest.TestCase):
+    "Unit tests for the LRUCache class"
+
+    def setUp(self):
+        "Create a small cache"
+        self.cache = LRUCache(size = 3)
+
+    def testGetPut(self):
+        "Make sure that the stored value is returned and the lookups are counted"
+        self.assertEqual(None, self.cache.get('a'))
+        self.cache.put('a', 1)
+        self.assertEqual(1, self.cache.get('a'))
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+
+    def testLeastRecentlyUsedDropped(self):
+        "Make sure that the least recently used values are dropped first"
+        for key in 'abc':
+            self.cache.put(key, key)
+        self.cache.get('a')
+        self.cache.put('b', 'B')
+        self.cache.put('d', 'd')
+
+        self.assertEqual(3, len(self.cache))
+        self.assertEqual([('a', 'a'), ('b', 'B'), ('d', 'd')], self.cache.items())
+
+    def testRemove(self):
+        "Make sure that the values can be removed by the key or by a predicate"
+        for key in ['a1', 'a2', 'b1']:
+            self.cache.put(key, key)
+        self.assertEqual('a2', self.cache.pop('a2'))
+        self.assertEqual(None, self.cache.pop('a2'))
+        self.cache.remove_if(lambda key: key.startswith('a'))
+        self.assertEqual([('b1', 'b1')], self.cache.items())
+
+
+class VersionedFileTests(unittest.TestCase):
+    "Unit tests for save_versioned() and load_versioned()"
+
+    def setUp(self):
+        "Create a temporary file"
+        handle, self.filename = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        "Remove the temporary file"
+        os.remove(self.filename)
+
+    def testRoundTrip(self):
+        "Make sure that the saved data is loaded back"
+        save_versioned(self.filename, 3, 'items', {'a': [1, 2]})
+        self.assertEqual({'a': [1, 2]}, load_versioned(self.filename, 3, 'items', 'items'))
+
+    def testWrongFile(self):
+        "Make sure that a file of another version or format is not loaded"
+        save_versioned(self.filename, 3, 'items', {})
+        self.assertRaises(ValueError, load_versioned, self.filename, 4, 'items', 'items')
+        self.assertRaises(ValueError, load_versioned, self.filename, 3, 'other', 'items')
+
+        with open(self.filename, 'w') as data_file:
+            data_file.write('not json')
+        self.assertRaises(ValueError, load_versioned, self.filename, 3, 'items', 'items')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"Tests for cpusampler.py"
+
+import sys
+import time
+import unittest
+
+sys.path.append(".")
+from pywinauto.cpusampler import CPUUsageSampler
+
+
+class _FakeSource(object):
+    "CPU time source which is busy (a full processor) for the specified number of calls"
+
+    def __init__(self, busy_calls):
+        self.busy_calls = busy_calls
+        self.start_time = time.time()
+        self.idle_time = 0.
+        self.last_call = self.start_time
+        self.closed = False
+
+    def __call__(self):
+        now = time.time()
+        if self.busy_calls > 0:
+            self.busy_calls -= 1
+        else:
+            self.idle_time += now - self.last_call
+        self.last_call = now
+        return now - self.start_time - self.idle_time
+
+    def close(self):
+        self.closed = True
+
+
+class _FailingSource(object):
+    "CPU time source of a process which has exited"
+
+    def __call__(self):
+        raise OSError("The process has exited")
+
+
+class CPUUsageSamplerTests(unittest.TestCase):
+    "Unit tests for the background CPU usage sampler"
+
+    def tearDown(self):
+        "Stop the sampler"
+        if hasattr(self, 'sampler'):
+            self.sampler.stop()
+
+    def testNoSamplesBeforeStart(self):
+        "Make sure that there are no samples if the sampler is not started"
+        self.sampler = CPUUsageSampler(_FakeSource(0), interval = .01)
+        self.assertFalse(self.sampler.is_running)
+        self.assertEqual(None, self.sampler.latest)
+        self.assertEqual(None, self.sampler.average)
+        self.assertEqual(None, self.sampler.wait_sample(timeout = .05))
+
+    def testSamples(self):
+        "Test the samples of a busy and then idle process"
+        self.sampler = CPUUsageSampler(_FakeSource(3), interval = .02, size = 5, cpu_count = 1)
+        self.sampler.start()
+        self.assertTrue(self.sampler.is_running)
+
+        first = self.sampler.wait_sample(timeout = 1)
+        self.assertTrue(first > 50)
+        self.assertTrue(self.sampler.wait_sample(3, timeout = 1) < 1)
+
+    def testRingBuffer(self):
+        "Make sure that only the last samples are kept"
+        self.sampler = CPUUsageSampler(_FakeSource(0), interval = .01, size = 3, cpu_count = 1)
+        self.sampler.start()
+        self.sampler.wait_sample(5, timeout = 1)
+
+        self.assertTrue(self.sampler.sample_count > 5)
+        self.assertEqual(3, len(self.sampler.samples))
+        self.assertTrue(self.sampler.average < 1)
+
+    def testAverage(self):
+        "Test the moving average of the samples"
+        self.sampler = CPUUsageSampler(_FakeSource(0), interval = 10, size = 4)
+        self.sampler.samples.extend([10., 20., 30., 40.])
+        self.assertAlmostEqual(25., self.sampler.average)
+        self.assertAlmostEqual(40., self.sampler.latest)
+
+    def testStop(self):
+        "Make sure that the thread is stopped and the source is closed"
+        source = _FakeSource(0)
+        self.sampler = CPUUsageSampler(source, interval = 10)
+        self.sampler.start()
+
+        start = time.time()
+        self.sampler.stop()
+        self.assertTrue(time.time() - start < 1)
+        self.assertFalse(self.sampler.is_running)
+        self.assertTrue(source.closed)
+
+    def testSourceError(self):
+        "Make sure that the sampler stops if the source fails"
+        self.sampler = CPUUsageSampler(_FailingSource(), interval = .01)
+        self.sampler.start()
+        self.assertEqual(None, self.sampler.wait_sample(timeout = 1))
+        self.assertTrue(isinstance(self.sampler.error, OSError))
+
+
+if __name__ == "__main__":
+    unittest.main()
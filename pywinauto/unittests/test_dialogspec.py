@@ -0,0 +1,145 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"Tests for dialogspec.py"
+
+import sys
+import unittest
+
+sys.path.append(".")
+from pywinauto import findbestmatch
+from pywinauto.dialogspec import DialogSpec
+from pywinauto.unittests import synthetic
+from pywinauto.unittests.synthetic import SyntheticElementInfo, SyntheticWrapper
+
+
+class _DialogWindowSpec(object):
+    "Window specification of a dialog which is re-created after the first resolution"
+
+    def __init__(self, *dialogs):
+        self.dialogs = list(dialogs)
+        self.resolutions = 0
+
+    def WrapperObject(self):
+        self.resolutions += 1
+        return self.dialogs[min(self.resolutions, len(self.dialogs)) - 1]
+
+
+class DialogSpecTests(unittest.TestCase):
+    "Unit tests for the page objects"
+
+    def setUp(self):
+        "Register a synthetic back-end and create a dialog"
+        synthetic.register()
+        self.ok = SyntheticElementInfo(11, "Button", "OK", 1)
+        self.cancel = SyntheticElementInfo(12, "Button", "Cancel", 2)
+        self.edit = SyntheticElementInfo(13, "Edit", "report.txt", 1001)
+        self.dialog_info = SyntheticElementInfo(10, "#32770", "Save As",
+                                                children = [self.ok, self.cancel, self.edit])
+        self.dialog = SyntheticWrapper(self.dialog_info)
+
+        self.spec = DialogSpec({
+            'ok': 'OKButton',
+            'cancel': 'Cancel',
+            'file_name': {'class_name': 'Edit'},
+            'by_id': {'control_id': 2},
+            })
+
+    def tearDown(self):
+        "Remove the back-end"
+        synthetic.unregister()
+
+    def testBind(self):
+        "Make sure that all the controls are resolved"
+        page = self.spec.bind(self.dialog, timeout = 0)
+        self.assertEqual(11, page.ok.handle)
+        self.assertEqual(12, page.cancel.handle)
+        self.assertEqual(13, page['file_name'].handle)
+        self.assertEqual(12, page.by_id.handle)
+        self.assertTrue(page.dialog is self.dialog)
+
+    def testOneWalk(self):
+        "Make sure that the dialog is walked once for all the controls"
+        page = self.spec.bind(self.dialog, timeout = 0)
+        self.assertEqual(1, self.dialog_info.walks)
+
+        for _ in range(10):
+            page.ok, page.file_name
+        self.assertEqual(1, self.dialog_info.walks)
+
+    def testRevalidation(self):
+        "Make sure that the dialog is bound again if a control has gone"
+        page = self.spec.bind(self.dialog, timeout = 0)
+        ok = page.ok
+
+        # the OK button is re-created
+        self.ok._class_name = ""
+        new_ok = SyntheticElementInfo(14, "Button", "OK", 1)
+        self.dialog_info._children[0] = new_ok
+
+        self.assertEqual(14, page.ok.handle)
+        self.assertFalse(page.ok is ok)
+        self.assertEqual(2, self.dialog_info.walks)
+
+    def testRecycledHandle(self):
+        "Make sure that a control of the same class and handle but another ID is not reused"
+        page = self.spec.bind(self.dialog, timeout = 0)
+        page.ok
+
+        # the handle of the OK button is reused by a button with another ID
+        self.ok._control_id = 5
+        page.ok
+        self.assertEqual(2, self.dialog_info.walks)
+
+    def testDialogRecreated(self):
+        "Make sure that every attempt to bind resolves the dialog again"
+        dead_info = SyntheticElementInfo(9, "#32770", "Save As")
+        window_spec = _DialogWindowSpec(SyntheticWrapper(dead_info), self.dialog)
+
+        page = self.spec.bind(window_spec, timeout = 5, retry_interval = .01)
+        self.assertTrue(page.dialog is self.dialog)
+        self.assertEqual(2, window_spec.resolutions)
+        self.assertEqual(11, page.ok.handle)
+
+    def testUnknownName(self):
+        "Make sure that unknown names raise AttributeError or KeyError"
+        page = self.spec.bind(self.dialog, timeout = 0)
+        self.assertRaises(AttributeError, getattr, page, 'help')
+        self.assertRaises(KeyError, lambda: page['help'])
+
+    def testMissingControl(self):
+        "Make sure that the resolution error is raised after the timeout"
+        spec = DialogSpec({'help': {'class_name': 'Help'}})
+        from pywinauto.findwindows import ElementNotFoundError
+        self.assertRaises(ElementNotFoundError, spec.bind, self.dialog, timeout = .1,
+                          retry_interval = .05)
+
+    def testBestMatchError(self):
+        "Make sure that a best_match name which doesn't match raises MatchError"
+        spec = DialogSpec({'help': 'Nothing like that'})
+        self.assertRaises(findbestmatch.MatchError, spec.bind, self.dialog, timeout = 0)
+
+    def testWrongCriteria(self):
+        "Make sure that only strings and dicts are accepted"
+        self.assertRaises(TypeError, DialogSpec, {'ok': 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,384 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"Tests for keyparser.py (they don't need Windows)"
+from __future__ import unicode_literals
+
+import io
+import os
+import sys
+import subprocess
+import random
+import threading
+import unittest
+
+sys.path.append(".")
+from pywinauto import keyparser
+from pywinauto.keyparser import compile_keys, expand, iter_key_chunks, KeyProgram, KeySequenceError
+from pywinauto.keyparser import KEY_UNICODE, KEY_VIRTUAL, KEY_ESCAPED, KEY_PAUSE, KEY_GROUP
+from pywinauto.keyparser import KEY_DOWN, KEY_UP, KEY_DOWN_UP
+from pywinauto.keyparser import CODES, VK_SHIFT, VK_CONTROL, VK_MENU
+from pywinauto.unittests.benchsupport import SCALING_PATTERNS
+
+
+def parse(string, **kwargs):
+    "Return the expanded (kind, code, state) tuples of the key sequence"
+    return list(expand(keyparser.parse(string, **kwargs)))
+
+
+class KeyParserTests(unittest.TestCase):
+    "Unit tests for the parser of the key sequences"
+
+    def testText(self):
+        "Make sure that the characters are sent as Unicode"
+        self.assertEqual([(KEY_UNICODE, ord('a'), KEY_DOWN_UP),
+                          (KEY_UNICODE, ord('\xe9'), KEY_DOWN_UP)], parse('a\xe9'))
+
+    def testWhiteSpaces(self):
+        "Make sure that the white spaces are sent only if asked"
+        self.assertEqual(3, len(parse('a b\tc\n')))
+        self.assertEqual(3, len(parse('a b', with_spaces = True)))
+        self.assertEqual(3, len(parse('a\tb', with_tabs = True)))
+        self.assertEqual([(KEY_VIRTUAL, CODES['ENTER'], KEY_DOWN_UP)] * 2,
+                         parse('\n~', with_newlines = True))
+
+    def testCodes(self):
+        "Make sure that the codes, the repetitions and the pauses are parsed"
+        self.assertEqual([(KEY_VIRTUAL, CODES['TAB'], KEY_DOWN_UP)] * 3 +
+                         [(KEY_PAUSE, 0.5, KEY_DOWN_UP)] +
+                         [(KEY_UNICODE, ord('a'), KEY_DOWN_UP),
+                          (KEY_UNICODE, ord('b'), KEY_DOWN_UP)] * 2 +
+                         [(KEY_UNICODE, ord('%'), KEY_DOWN_UP),
+                          (KEY_UNICODE, ord('}'), KEY_DOWN_UP)],
+                         parse('{TAB 3}{PAUSE 0.5}{ab 2}{%}{}}'))
+
+    def testModifiers(self):
+        "Make sure that the modifiers are pressed for the next key only"
+        self.assertEqual([(KEY_VIRTUAL, VK_SHIFT, KEY_DOWN),
+                          (KEY_ESCAPED, ord('a'), KEY_DOWN_UP),
+                          (KEY_VIRTUAL, VK_SHIFT, KEY_UP),
+                          (KEY_UNICODE, ord('b'), KEY_DOWN_UP)], parse('+ab'))
+
+    def testModifiersForFewChars(self):
+        "Make sure that the parentheses are parsed the way SendKeys always did"
+        # only the first character is modified: %(SC) is Alt+S, C
+        self.assertEqual([(KEY_VIRTUAL, VK_MENU, KEY_DOWN),
+                          (KEY_ESCAPED, ord('S'), KEY_DOWN_UP),
+                          (KEY_VIRTUAL, VK_MENU, KEY_UP),
+                          (KEY_UNICODE, ord('C'), KEY_DOWN_UP)], parse('%(SC)'))
+
+    def testIncorrectCases(self):
+        "Make sure that incorrect key sequences raise an exception"
+        self.assertRaises(KeySequenceError, parse, "{ENTER")
+        self.assertRaises(KeySequenceError, parse, "ENTER)")
+        self.assertRaises(KeySequenceError, parse, "(ENTER")
+        self.assertRaises(RuntimeError, parse, "%{Enterius}")
+        self.assertRaises(KeySequenceError, parse, "{PAUSE small}")
+        self.assertRaises(KeySequenceError, parse, "{PAUSE -1}")
+        self.assertRaises(KeySequenceError, parse, "{PAUSE inf}")
+        self.assertRaises(KeySequenceError, parse, "{a }")
+        try:
+            parse("{ENTER five}")
+        except KeySequenceError as exc:
+            self.assertEqual("invalid repetition count five", str(exc))
+
+    def testRunLengthRepetitions(self):
+        "Make sure that the repetitions are kept as single nodes"
+        self.assertEqual([(KEY_VIRTUAL, CODES['DOWN'], KEY_DOWN_UP, 10 ** 9)],
+                         keyparser.parse('{DOWN 1000000000}'))
+        self.assertEqual([(KEY_UNICODE, ord('a'), KEY_DOWN_UP, 3)], keyparser.parse('{a 3}'))
+        self.assertEqual([], keyparser.parse('{DOWN 0}{ab 0}'))
+
+        nodes = keyparser.parse('{+a 2}')
+        self.assertEqual(1, len(nodes))
+        kind, body, _, count = nodes[0]
+        self.assertEqual((KEY_GROUP, 2), (kind, count))
+        self.assertEqual(parse('+a'), list(body))
+        self.assertEqual(parse('+a') * 2, parse('{+a 2}'))
+
+
+class CompileKeysTests(unittest.TestCase):
+    "Unit tests for the compiled and memoized programs"
+
+    def setUp(self):
+        "Start with an empty cache"
+        keyparser.program_cache.clear()
+        keyparser.program_cache.hits = keyparser.program_cache.misses = 0
+
+    def testProgram(self):
+        "Make sure that the program keeps the parallel arrays of the keys"
+        program = compile_keys('+a{PAUSE 1}')
+        self.assertEqual((KEY_VIRTUAL, KEY_ESCAPED, KEY_VIRTUAL, KEY_PAUSE), program.kinds)
+        self.assertEqual((VK_SHIFT, ord('a'), VK_SHIFT, 1.), program.codes)
+        self.assertEqual((KEY_DOWN, KEY_DOWN_UP, KEY_UP, KEY_DOWN_UP), program.states)
+        self.assertEqual((1, 1, 1, 1), program.counts)
+        self.assertEqual(parse('+a{PAUSE 1}'), list(program))
+        self.assertEqual(4, len(program))
+
+    def testLongRepetition(self):
+        "Make sure that a long repetition is expanded lazily"
+        program = compile_keys('{DOWN 1000000000}{ab 1000000000}')
+        self.assertEqual(2, len(program.kinds))
+        self.assertEqual(3 * 10 ** 9, len(program))
+        keys = iter(program)
+        self.assertEqual((KEY_VIRTUAL, CODES['DOWN'], KEY_DOWN_UP), next(keys))
+
+    def testImmutable(self):
+        "Make sure that the program can't be changed"
+        program = compile_keys('abc')
+        self.assertRaises(AttributeError, setattr, program, 'kinds', ())
+        self.assertTrue(isinstance(program.codes, tuple))
+        self.assertEqual(KeyProgram(keyparser.parse('abc')), program)
+        self.assertEqual(hash(KeyProgram(keyparser.parse('abc'))), hash(program))
+
+    def testMemoized(self):
+        "Make sure that the program of the same arguments is compiled once"
+        program = compile_keys('Hello{ENTER}')
+        self.assertTrue(compile_keys('Hello{ENTER}') is program)
+        self.assertEqual((1, 1), (keyparser.program_cache.hits, keyparser.program_cache.misses))
+
+        with_spaces = compile_keys('Hello{ENTER}', with_spaces = True)
+        self.assertFalse(with_spaces is program)
+        self.assertEqual(2, len(keyparser.program_cache))
+
+    def testErrorsNotMemoized(self):
+        "Make sure that the wrong sequences raise the error every time"
+        self.assertRaises(KeySequenceError, compile_keys, '{ENTER')
+        self.assertRaises(KeySequenceError, compile_keys, '{ENTER')
+        self.assertEqual(0, len(keyparser.program_cache))
+
+    def testLongStringNotMemoized(self):
+        "Make sure that the programs of the long strings are not kept"
+        string = 'a' * (keyparser.PROGRAM_CACHE_MAX_LENGTH + 1)
+        program = compile_keys(string)
+        self.assertEqual(len(string), len(program))
+        self.assertEqual(0, len(keyparser.program_cache))
+        self.assertFalse(compile_keys(string) is program)
+
+        compile_keys(string[:-1])
+        self.assertEqual(1, len(keyparser.program_cache))
+
+    def testCacheBounded(self):
+        "Make sure that the least recently used programs are dropped"
+        cache = keyparser.ProgramCache(size = 2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual(2, len(cache))
+        self.assertEqual(None, cache.get('b'))
+        self.assertEqual(1, cache.get('a'))
+
+    def testLiteralText(self):
+        "Make sure that only the printable characters are a literal text"
+        self.assertEqual('Hello,world!', keyparser.literal_text(compile_keys('Hello, world!')))
+        self.assertEqual('a b\xe9{%', keyparser.literal_text(
+            compile_keys('a b\xe9{{}{%}', with_spaces = True)))
+        self.assertEqual('abab', keyparser.literal_text(compile_keys('{ab 2}')))
+        self.assertEqual('', keyparser.literal_text(compile_keys('')))
+        for keys in ('+a', 'a{ENTER}', 'a~', '{a 2}{PAUSE 1}', '{+a 2}', '^(abc)', 'a\tb'):
+            self.assertEqual(None, keyparser.literal_text(
+                compile_keys(keys, with_tabs = True)), keys)
+
+
+class KeyChunksTests(unittest.TestCase):
+    "Unit tests for the splitting of a large source into chunks"
+
+    def assertSameKeys(self, source, chunks, **kwargs):
+        "Make sure that the chunks are parsed into the keys of the source"
+        keys = []
+        for chunk in chunks:
+            keys.extend(parse(chunk, **kwargs))
+        self.assertEqual(parse(source, **kwargs), keys)
+
+    def testCompleteKeys(self):
+        "Make sure that the keys are not split between the chunks"
+        text = 'Hello {ENTER 3}world +a %(bc) {}} ' * 20
+        chunks = list(iter_key_chunks(text, 17))
+        self.assertEqual(text, ''.join(chunks))
+        self.assertTrue(max(len(chunk) for chunk in chunks) <= 17)
+        self.assertSameKeys(text, chunks)
+
+    def testModifiersBeforeWhiteSpace(self):
+        "Make sure that a modifier stays with its key after the skipped white space"
+        text = '+ a^ \tb' * 10
+        for with_spaces in (False, True):
+            chunks = list(iter_key_chunks(text, 3, with_spaces = with_spaces))
+            self.assertSameKeys(text, chunks, with_spaces = with_spaces)
+
+    def testLongGroup(self):
+        "Make sure that a group longer than a chunk is kept whole"
+        self.assertEqual(['ab', '{ENTER}', '(xyz)q'],
+                         list(iter_key_chunks(iter(['ab{EN', 'TER}(', 'xy', 'z)q']), 3)))
+
+    def testLongGroupScannedOnce(self):
+        "Make sure that an unclosed group is not scanned again for every piece"
+        complete_keys_end = keyparser._complete_keys_end
+        calls = []
+
+        def counted(*args):
+            calls.append(args)
+            return complete_keys_end(*args)
+
+        keyparser._complete_keys_end = counted
+        try:
+            pieces = ['('] + ['x'] * 1000 + [')ab', '+', ' ' * 100, 'c']
+            self.assertEqual(['(' + 'x' * 1000 + ')ab', '+' + ' ' * 100 + 'c'],
+                             list(iter_key_chunks(iter(pieces), 2)))
+        finally:
+            keyparser._complete_keys_end = complete_keys_end
+        self.assertTrue(len(calls) < 20)
+
+    def testUnclosedGroupTooLong(self):
+        "Make sure that a group can't grow the buffer without a limit"
+        pieces = iter(['ab', '(xyz'] + ['x' * 100] * 100)
+        chunks = iter_key_chunks(pieces, 3, max_key_size = 1000)
+        self.assertEqual('ab', next(chunks))
+        self.assertRaises(ValueError, list, chunks)
+        self.assertEqual(['{}}'], list(iter_key_chunks(iter(['{', '}', '}']), 1, max_key_size = 2)))
+
+    def testFileSource(self):
+        "Make sure that a binary file is decoded and read by chunks"
+        text = '\xe9t\xe9 {ENTER}' * 100
+        source = io.BytesIO(text.encode('utf-8'))
+        chunks = list(iter_key_chunks(source, 64, encoding = 'utf-8'))
+        self.assertEqual(text, ''.join(chunks))
+        self.assertTrue(len(chunks) > 10)
+
+
+# pieces of the generated key sequences
+_FUZZ_TOKENS = [
+    'a', 'Z', '\xe9', '1', ' ', '\t', '\n', '~', '+', '^', '%', '+(ab)', '%(a b)',
+    '{ENTER}', '{DOWN 3}', '{PAUSE 0}', '{%}', '{}}', '{ab 2}', '{+a 2}', '{a 0}',
+    '{a 100000000}',
+    ]
+# the pieces which make the sequence wrong
+_BROKEN_FUZZ_TOKENS = [
+    '(', ')', '{', '}', '{Enterius}', '{DOWN x}', '{PAUSE -1}', '{{a 2} 2}', '{a }',
+    ]
+
+
+def _fuzz_strings(seed, count):
+    "Generate the random key sequences (a few of them are wrong)"
+    rng = random.Random(seed)
+    for _ in range(count):
+        tokens = []
+        for _ in range(rng.randint(0, 40)):
+            if rng.random() < .02:
+                tokens.append(rng.choice(_BROKEN_FUZZ_TOKENS))
+            else:
+                tokens.append(rng.choice(_FUZZ_TOKENS))
+        yield ''.join(tokens)
+
+
+class KeyParserFuzzTests(unittest.TestCase):
+    "Random key sequences and scaling checks of the parser"
+
+    def check_sequence(self, string, with_spaces, with_tabs, with_newlines):
+        "Check the properties of a parsed random sequence"
+        try:
+            nodes = keyparser.parse(string, with_spaces, with_tabs, with_newlines)
+        except (KeySequenceError, RuntimeError):
+            # the known errors of the wrong sequences
+            return
+
+        # the run-length nodes don't grow with the repeat counts
+        self.assertTrue(len(nodes) <= 2 * len(string), string)
+
+        program = KeyProgram(nodes)
+        if len(program) <= 1000:
+            keys = list(program)
+            self.assertEqual(len(program), len(keys), string)
+            # the literal text types its characters and nothing else
+            text = keyparser.literal_text(program)
+            if text is not None:
+                self.assertEqual([(KEY_UNICODE, ord(char), KEY_DOWN_UP) for char in text],
+                                 keys, string)
+            # every pressed modifier is released
+            for modifier in (VK_SHIFT, VK_CONTROL, VK_MENU):
+                self.assertEqual(keys.count((KEY_VIRTUAL, modifier, KEY_DOWN)),
+                                 keys.count((KEY_VIRTUAL, modifier, KEY_UP)), string)
+
+        # the chunks of complete keys give the same nodes
+        chunk_nodes = []
+        for chunk in iter_key_chunks(string, 1 + len(string) % 7,
+                                     with_spaces, with_tabs, with_newlines):
+            chunk_nodes.extend(keyparser.parse(chunk, with_spaces, with_tabs, with_newlines))
+        self.assertEqual(nodes, chunk_nodes, string)
+
+    def testRandomSequences(self):
+        "Make sure that the parser finishes on random sequences with the known errors only"
+        failures = []
+
+        def fuzz():
+            "Parse the random sequences"
+            try:
+                rng = random.Random(0)
+                for string in _fuzz_strings(2016, 2000):
+                    self.check_sequence(string, rng.random() < .5, rng.random() < .5, rng.random() < .5)
+            except Exception as exc:
+                failures.append(exc)
+
+        thread = threading.Thread(target=fuzz)
+        thread.daemon = True
+        thread.start()
+        thread.join(60)
+        self.assertFalse(thread.is_alive(), 'The parser hangs')
+        if failures:
+            raise failures[0]
+
+    def testLinearNodes(self):
+        "Make sure that the number of the parsed nodes grows linearly with the length"
+        # the parse time is measured by bench_keyparser.py
+        for pattern in SCALING_PATTERNS:
+            nodes = len(keyparser.parse(pattern, with_spaces = True))
+            for repeat in (200, 1600):
+                self.assertEqual(nodes * repeat,
+                                 len(keyparser.parse(pattern * repeat, with_spaces = True)),
+                                 pattern)
+
+
+# import the package on another platform with the Win32 modules missing
+_IMPORT_WITHOUT_WIN32 = """
+import sys
+sys.platform = 'linux'
+for name in ('win32api', 'win32gui', 'win32con', 'win32process', 'win32event',
+             'win32clipboard', 'pywintypes', 'comtypes'):
+    sys.modules[name] = None
+from pywinauto import keyparser, timings, actionstream
+keyparser.compile_keys('+(ab){ENTER}')
+assert 'pywinauto.findwindows' not in sys.modules
+"""
+
+
+class PlatformImportTests(unittest.TestCase):
+    "Unit tests for the import of the parser on the platforms without the Win32 API"
+
+    def testImportWithoutWin32(self):
+        "Make sure that the parser is imported without the Win32 modules"
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        process = subprocess.Popen([sys.executable, '-c', _IMPORT_WITHOUT_WIN32], cwd = root,
+                                   stdout = subprocess.PIPE, stderr = subprocess.STDOUT)
+        output = process.communicate()[0]
+        self.assertEqual(0, process.returncode, output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"Tests for matchmemo.py"
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(".")
+from pywinauto import findwindows
+from pywinauto import findbestmatch
+from pywinauto.matchmemo import BestMatchMemo, fingerprint
+from pywinauto.unittests import synthetic
+from pywinauto.unittests.synthetic import SyntheticElementInfo
+
+
+class BestMatchMemoTests(unittest.TestCase):
+    "Unit tests for the BestMatchMemo class"
+
+    def setUp(self):
+        "Create a memo and a synthetic dialog"
+        self.memo = BestMatchMemo(size = 3)
+        self.ok = SyntheticElementInfo(1, "Button", "OK", 1)
+        self.cancel = SyntheticElementInfo(2, "Button", "Cancel", 2)
+
+    def testFingerprint(self):
+        "Make sure that the fingerprint depends on the structure only"
+        renamed_ok = SyntheticElementInfo(3, "Button", "Yes", 1)
+        self.assertEqual(fingerprint([self.ok, self.cancel]),
+                         fingerprint([renamed_ok, self.cancel]))
+        self.assertNotEqual(fingerprint([self.ok, self.cancel]),
+                            fingerprint([self.cancel, self.ok]))
+        self.assertNotEqual(fingerprint([self.ok]),
+                            fingerprint([SyntheticElementInfo(1, "Static", "OK", 1)]))
+
+    def testGetPut(self):
+        "Make sure that the stored index is returned"
+        self.assertEqual(None, self.memo.get('dialog', 'OK'))
+        self.memo.put('dialog', 'OK', 5, 'OK')
+        self.assertEqual((5, 'OK'), self.memo.get('dialog', 'OK'))
+        self.assertEqual(None, self.memo.get('other dialog', 'OK'))
+        self.assertEqual((1, 2), (self.memo.hits, self.memo.misses))
+
+    def testReject(self):
+        "Make sure that a rejected result is removed and counted as a miss"
+        self.memo.put('dialog', 'OK', 5, 'OK')
+        self.memo.get('dialog', 'OK')
+        self.memo.reject('dialog', 'OK')
+        self.assertEqual(None, self.memo.get('dialog', 'OK'))
+        self.assertEqual((0, 2), (self.memo.hits, self.memo.misses))
+
+    def testLeastRecentlyUsedDropped(self):
+        "Make sure that the memo is bounded"
+        for index, name in enumerate(['OK', 'Cancel', 'Help']):
+            self.memo.put('dialog', name, index, name)
+        self.memo.get('dialog', 'OK')
+        self.memo.put('dialog', 'Apply', 3, 'Apply')
+
+        self.assertEqual(3, len(self.memo))
+        self.assertEqual(None, self.memo.get('dialog', 'Cancel'))
+        self.assertEqual((0, 'OK'), self.memo.get('dialog', 'OK'))
+
+    def testForget(self):
+        "Make sure that the results of a fingerprint can be removed"
+        self.memo.put('dialog', 'OK', 0, 'OK')
+        self.memo.put('other dialog', 'OK', 1, 'OK')
+        self.memo.forget('dialog')
+        self.assertEqual(None, self.memo.get('dialog', 'OK'))
+        self.assertEqual((1, 'OK'), self.memo.get('other dialog', 'OK'))
+
+    def testSaveLoad(self):
+        "Make sure that the results and their order survive a round trip"
+        for index, name in enumerate(['OK', 'Cancel', 'Help']):
+            self.memo.put('dialog', name, index, name)
+        self.memo.get('dialog', 'OK')
+
+        handle, filename = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            self.memo.save(filename)
+            memo = BestMatchMemo(size = 3, filename = filename)
+        finally:
+            os.remove(filename)
+
+        self.assertEqual((2, 'Help'), memo.get('dialog', 'Help'))
+        memo.put('dialog', 'Apply', 3, 'Apply')
+        # Cancel was the least recently used one
+        self.assertEqual(None, memo.get('dialog', 'Cancel'))
+        self.assertEqual((0, 'OK'), memo.get('dialog', 'OK'))
+
+    def testLoadWrongFile(self):
+        "Make sure that a wrong file is not loaded"
+        handle, filename = tempfile.mkstemp()
+        os.write(handle, b'{"version": 0, "entries": []}')
+        os.close(handle)
+        try:
+            self.assertRaises(ValueError, BestMatchMemo, filename = filename)
+        finally:
+            os.remove(filename)
+
+
+class FindElementsMemoTests(unittest.TestCase):
+    "Unit tests for the best_match memo used by find_elements()"
+
+    def setUp(self):
+        "Register a synthetic back-end and enable the memo"
+        synthetic.register()
+        self.ok = SyntheticElementInfo(11, "Button", "OK", 1)
+        self.cancel = SyntheticElementInfo(12, "Button", "Cancel", 2)
+        self.dialog = SyntheticElementInfo(10, "#32770", "Dialog", children = [self.ok, self.cancel])
+        self.memo = BestMatchMemo()
+        findwindows.best_match_memo = self.memo
+
+    def tearDown(self):
+        "Disable the memo and remove the back-end"
+        findwindows.best_match_memo = None
+        synthetic.unregister()
+
+    def find(self, best_match):
+        "Find the control of the dialog by best_match"
+        return findwindows.find_element(best_match = best_match, parent = self.dialog,
+                                        top_level_only = False, backend = synthetic.BACKEND)
+
+    def testScoringSkipped(self):
+        "Make sure that only the text of the found control is read when the result is memoized"
+        self.assertEqual(self.cancel, self.find('CancelButton'))
+        self.assertEqual(1, len(self.memo))
+
+        SyntheticElementInfo.text_reads = 0
+        self.assertEqual(self.cancel, self.find('CancelButton'))
+        self.assertEqual(1, SyntheticElementInfo.text_reads)
+        self.assertEqual(1, self.memo.hits)
+
+    def testTextChanged(self):
+        "Make sure that a memoized control is not returned if its text has changed"
+        self.assertEqual(self.cancel, self.find('CancelButton'))
+
+        # the same structure but the captions of the buttons are swapped
+        self.ok._title, self.cancel._title = "Cancel", "OK"
+        self.assertEqual(self.ok, self.find('CancelButton'))
+        self.assertEqual((0, 2), (self.memo.hits, self.memo.misses))
+        self.assertEqual((0, "Cancel"), self.memo.get(
+            findwindows.matchmemo.fingerprint([self.ok, self.cancel]), 'CancelButton'))
+
+    def testStructureChanged(self):
+        "Make sure that the memo is not used when the dialog structure has changed"
+        self.find('CancelButton')
+
+        # the Cancel button is replaced by a check box with another ID
+        self.dialog._children[1] = SyntheticElementInfo(13, "Button", "Cancel", 3)
+        self.assertEqual(13, self.find('CancelButton').handle)
+        self.assertEqual(0, self.memo.hits)
+        self.assertEqual(2, len(self.memo))
+
+    def testNotFoundNotMemoized(self):
+        "Make sure that a failed search is not memoized"
+        self.assertRaises(findbestmatch.MatchError, self.find, 'Help')
+        self.assertEqual(0, len(self.memo))
+
+    def testMemoDisabled(self):
+        "Make sure that the memo is not used by default"
+        findwindows.best_match_memo = None
+        self.find('OK')
+        self.assertEqual(0, len(self.memo))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,6 +7,7 @@ import re
 import subprocess
 import sys
 import os
+import win32api
 import win32clipboard
 import unittest
 
@@ -100,5 +101,40 @@ class MouseTests(unittest.TestCase):
         self.assertTrue("Mouse Release" in data)
         self.assertTrue("MiddleButton" in data)
 
+    def test_path(self):
+        points = mouse.path((0, 0), (100, 40), steps=4)
+        self.assertEqual([(25, 10), (50, 20), (75, 30), (100, 40)], points)
+        eased = mouse.path((0, 0), (100, 0), steps=4, easing='ease_in')
+        self.assertEqual([6, 25, 56, 100], [x for x, _ in eased])
+        self.assertRaises(ValueError, mouse.path, (0, 0), (1, 1), 0)
+
+    def test_move_path(self):
+        left, top = self.__get_pos(20)
+        mouse.move_path(mouse.path((left, top), (left + 30, top + 30), steps=30))
+        time.sleep(0.1)
+        self.assertEqual((left + 30, top + 30), win32api.GetCursorPos())
+
+    def test_move_path_speed(self):
+        left, top = self.__get_pos(20)
+        start = time.time()
+        mouse.move_path(mouse.path((left, top), (left + 100, top), steps=50), speed=500)
+        self.assertTrue(time.time() - start >= 0.18)
+
+    def test_drag(self):
+        left, top = self.__get_pos(50)
+        mouse.drag('left', mouse.path((left, top), (left + 20, top + 20), steps=5))
+        data = self.__get_text()
+        self.assertTrue("Mouse Press" in data)
+        self.assertTrue("Mouse Release" in data)
+        self.assertTrue(str(left + 20) in data)
+
+    def test_drag_unsupported_button(self):
+        left, top = self.__get_pos(50)
+        self.assertRaises(ValueError, mouse.drag, 'x', [(left, top), (left + 20, top)])
+        self.assertRaises(ValueError, mouse.drag, 'wheel', [(left, top)])
+        self.assertRaises(ValueError, self.dlg.wrapper_object().drag_mouse_input,
+                          'x', (1, 1), (20, 20), steps=5)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,165 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"Tests for processhandles.py"
+
+import sys
+import unittest
+
+sys.path.append(".")
+from pywinauto import win32defines
+from pywinauto.processhandles import ProcessHandleCache
+
+QUERY = win32defines.PROCESS_QUERY_INFORMATION
+LIMITED_QUERY = win32defines.PROCESS_QUERY_LIMITED_INFORMATION
+VM_READ = win32defines.PROCESS_VM_READ
+
+
+class ProcessHandleCacheTests(unittest.TestCase):
+    "Unit tests for the process handle cache"
+
+    def setUp(self):
+        "Create a cache with fake process handles"
+        self.next_handle = 100
+        self.opened = {}  # handle: (process_id, access)
+        self.closed = []
+        self.exited = set()
+        self.cache = ProcessHandleCache(self.open_process, self.close_handle, self.is_alive)
+
+    def open_process(self, process_id, access):
+        """Open a fake handle (fail for negative process IDs)
+
+        The processes with IDs over 1000 are elevated (no limited query rights).
+        """
+        if process_id < 0:
+            return 0
+        if process_id > 1000 and access & LIMITED_QUERY:
+            return 0
+        self.next_handle += 1
+        self.opened[self.next_handle] = (process_id, access)
+        return self.next_handle
+
+    def close_handle(self, handle):
+        "Close the fake handle"
+        self.closed.append(handle)
+
+    def is_alive(self, handle):
+        "Return True if the process of the fake handle hasn't exited"
+        return self.opened[handle][0] not in self.exited
+
+    def testHandleReused(self):
+        "Make sure that the handle is opened only once"
+        handle = self.cache.acquire(1, QUERY)
+        self.cache.release(1, QUERY)
+        self.assertEqual(handle, self.cache.acquire(1, QUERY))
+        self.cache.release(1, QUERY)
+
+        self.assertEqual(1, self.cache.opened_count)
+        self.assertEqual([], self.closed)
+        self.assertEqual(1, len(self.cache))
+
+    def testSynchronizeAccess(self):
+        "Make sure that the handle can be used to check the process is alive"
+        handle = self.cache.acquire(1, QUERY)
+        self.assertEqual((1, QUERY | win32defines.SYNCHRONIZE), self.opened[handle])
+
+    def testKeyedByAccess(self):
+        "Make sure that different access rights use different handles"
+        self.assertNotEqual(self.cache.acquire(1, QUERY), self.cache.acquire(1, VM_READ))
+        self.assertEqual(2, self.cache.opened_count)
+
+    def testOpenFailed(self):
+        "Make sure that a failed handle is not cached"
+        self.assertEqual(0, self.cache.acquire(-1, QUERY))
+        self.assertEqual(0, len(self.cache))
+        self.assertEqual(0, self.cache.opened_count)
+
+    def testExitedProcess(self):
+        "Make sure that the handle of an exited process is reopened"
+        handle = self.cache.acquire(1, QUERY)
+        self.cache.release(1, QUERY)
+
+        # the process has exited and its ID is reused
+        self.exited.add(1)
+        new_handle = self.cache.acquire(1, QUERY)
+        self.assertNotEqual(handle, new_handle)
+        self.assertEqual([handle], self.closed)
+        self.assertEqual(2, self.cache.opened_count)
+
+    def testReleaseOfExitedProcess(self):
+        "Make sure that the last release closes the handle of an exited process"
+        handle = self.cache.acquire(1, QUERY)
+        self.cache.acquire(1, QUERY)
+        self.exited.add(1)
+
+        self.cache.release(1, QUERY)
+        self.assertEqual([], self.closed)
+        self.cache.release(1, QUERY)
+        self.assertEqual([handle], self.closed)
+        self.assertEqual(0, len(self.cache))
+
+    def testPurge(self):
+        "Make sure that purge() closes unused handles of exited processes only"
+        with self.cache.process_handle(1, QUERY) as exited_handle:
+            pass
+        with self.cache.process_handle(2, QUERY):
+            pass
+        self.cache.acquire(3, QUERY)
+        self.exited.update([1, 3])
+
+        self.cache.purge()
+        self.assertEqual([exited_handle], self.closed)
+        self.assertEqual(2, len(self.cache))
+
+    def testClear(self):
+        "Make sure that clear() closes all unused handles"
+        with self.cache.process_handle(1, QUERY) as handle:
+            self.assertTrue(handle)
+        self.cache.acquire(2, QUERY)
+
+        self.cache.clear()
+        self.assertEqual([handle], self.closed)
+        self.assertEqual(1, len(self.cache))
+
+    def testContextManagerFailed(self):
+        "Make sure that a failed handle is not released"
+        with self.cache.process_handle(-1, QUERY) as handle:
+            self.assertEqual(0, handle)
+        self.assertEqual([], self.closed)
+
+    def testQueryHandle(self):
+        "Make sure that the limited query rights are tried first"
+        with self.cache.query_handle(1) as handle:
+            self.assertEqual((1, LIMITED_QUERY | win32defines.SYNCHRONIZE), self.opened[handle])
+
+        with self.cache.query_handle(1001) as handle:
+            self.assertEqual((1001, QUERY | win32defines.SYNCHRONIZE), self.opened[handle])
+        self.assertEqual(2, len(self.cache))
+
+    def testQueryHandleFailed(self):
+        "Make sure that a process which can't be opened gives no handle"
+        self.assertEqual((0, None), self.cache.acquire_query(-1))
+        with self.cache.query_handle(-1) as handle:
+            self.assertEqual(0, handle)
+        self.assertEqual(0, len(self.cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"Tests for resolutionhints.py"
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(".")
+from pywinauto.resolutionhints import ResolutionHints
+
+
+class _Element(object):
+    "Element with the properties used by the locators"
+
+    def __init__(self, class_name, control_id = None, rich_text = None,
+                 visible = True, enabled = True, descendants = ()):
+        self.class_name = class_name
+        self.control_id = control_id
+        self.rich_text = rich_text
+        self.visible = visible
+        self.enabled = enabled
+        self.descendants = list(descendants)
+
+
+class ResolutionHintsTests(unittest.TestCase):
+    "Unit tests for the resolution hints store"
+
+    def setUp(self):
+        "Create a dialog with some controls"
+        self.edit = _Element("Edit", 15, "text")
+        self.button = _Element("Button", 1, "OK")
+        self.dialog = _Element("#32770", 0, "Save As",
+                               descendants = [_Element("Static", 2), self.edit, self.button])
+        self.criteria = [{'best_match': 'SaveAs', 'process': 42, 'backend': 'native'},
+                         {'best_match': 'OK', 'top_level_only': False}]
+        self.hints = ResolutionHints()
+
+    def testKeyIgnoresProcess(self):
+        "Make sure that the key doesn't depend on the process ID"
+        other_criteria = [dict(self.criteria[0], process = 43), self.criteria[1]]
+        self.assertEqual(ResolutionHints.key(self.criteria), ResolutionHints.key(other_criteria))
+
+    def testKeyNotStorable(self):
+        "Make sure that criteria with handles or functions are not stored"
+        self.assertEqual(None, ResolutionHints.key([{'handle': 1}]))
+        self.assertEqual(None, ResolutionHints.key([{'predicate_func': len}]))
+
+    def testRecord(self):
+        "Test the locators of the dialog and the control"
+        self.hints.record(self.criteria, [self.dialog, self.button])
+        self.assertEqual([{'class_name': '#32770', 'control_id': 0, 'title': 'Save As'},
+                          {'class_name': 'Button', 'control_id': 1, 'ctrl_index': 2}],
+                         self.hints.get(self.criteria))
+
+    def testHintedCriteria(self):
+        "Make sure that the fuzzy criteria are replaced by the locators"
+        self.hints.record(self.criteria, [self.dialog, self.button])
+        hinted = ResolutionHints.hinted_criteria(self.criteria, self.hints.get(self.criteria))
+        self.assertEqual({'process': 42, 'backend': 'native', 'class_name': '#32770',
+                          'control_id': 0, 'title': 'Save As'}, hinted[0])
+        self.assertEqual({'top_level_only': False, 'class_name': 'Button',
+                          'control_id': 1, 'ctrl_index': 2}, hinted[1])
+
+    def testMatches(self):
+        "Make sure that the found element is validated"
+        self.hints.record(self.criteria, [self.dialog, self.button])
+        locator = self.hints.get(self.criteria)[1]
+        self.assertTrue(ResolutionHints.matches(self.button, locator, self.criteria[1]))
+        self.assertFalse(ResolutionHints.matches(self.edit, locator, self.criteria[1]))
+
+        self.button.visible = False
+        self.assertFalse(ResolutionHints.matches(self.button, locator, self.criteria[1]))
+        self.assertTrue(ResolutionHints.matches(self.button, locator, {'visible_only': False}))
+
+    def testForget(self):
+        "Make sure that the locators can be removed"
+        self.hints.record(self.criteria, [self.dialog, self.button])
+        self.hints.forget(self.criteria)
+        self.assertEqual(None, self.hints.get(self.criteria))
+
+    def testHitRate(self):
+        "Test the hit rate"
+        self.assertEqual(0., self.hints.hit_rate)
+        self.hints.hits = 3
+        self.hints.misses = 1
+        self.assertAlmostEqual(.75, self.hints.hit_rate)
+
+    def testSaveLoad(self):
+        "Make sure that the hints can be saved and loaded back"
+        handle, filename = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            self.hints.record(self.criteria, [self.dialog, self.button])
+            self.hints.save(filename)
+
+            loaded = ResolutionHints(filename)
+            self.assertEqual(self.hints.get(self.criteria), loaded.get(self.criteria))
+        finally:
+            os.remove(filename)
+
+    def testLoadWrongFile(self):
+        "Make sure that a file of another format is not loaded"
+        handle, filename = tempfile.mkstemp()
+        os.write(handle, b'{"version": 1000, "hints": {}}')
+        os.close(handle)
+        try:
+            self.assertRaises(ValueError, ResolutionHints, filename)
+            with open(filename, 'w') as hints_file:
+                hints_file.write('not a json')
+            self.assertRaises(ValueError, ResolutionHints, filename)
+        finally:
+            os.remove(filename)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"Tests for sessionrunner.py"
+
+import sys
+import time
+import threading
+import unittest
+
+sys.path.append(".")
+from pywinauto.sessionrunner import SessionRunner, Action
+
+
+class _Spec(object):
+    "Fake window specification recording the calls"
+
+    def __init__(self, app, path):
+        self.app = app
+        self.path = path
+
+    def __getitem__(self, name):
+        return _Spec(self.app, self.path + [name])
+
+    def __getattr__(self, method):
+        def call(*args, **kwargs):
+            self.app.calls.append(('.'.join(self.path), method, args, kwargs))
+            return method
+        return call
+
+
+class _App(object):
+    "Fake application recording the calls"
+
+    def __init__(self):
+        self.calls = []
+
+    def __getitem__(self, name):
+        return _Spec(self, [name])
+
+
+class _ConcurrencyCounter(object):
+    "Count the steps running at once"
+
+    def __init__(self, duration):
+        self.duration = duration
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, app):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.duration)
+        with self.lock:
+            self.running -= 1
+
+
+class SessionRunnerTests(unittest.TestCase):
+    "Unit tests for the SessionRunner class"
+
+    def testConcurrentSessions(self):
+        "Make sure that the message based steps of the sessions run at once"
+        counter = _ConcurrencyCounter(.1)
+        runner = SessionRunner(max_workers = 4)
+        for name in range(4):
+            runner.add_session(name, _App(), [counter, counter])
+
+        start = time.time()
+        reports = runner.run()
+        self.assertTrue(time.time() - start < .35)
+        self.assertEqual(4, counter.max_running)
+        self.assertEqual([2] * 4, [reports[name].steps for name in range(4)])
+
+    def testBoundedPool(self):
+        "Make sure that no more than max_workers sessions run at once"
+        counter = _ConcurrencyCounter(.05)
+        runner = SessionRunner(max_workers = 2)
+        for name in range(5):
+            runner.add_session(name, _App(), [counter])
+        reports = runner.run()
+
+        self.assertEqual(2, counter.max_running)
+        self.assertTrue(all(report.steps == 1 for report in reports.values()))
+
+    def testInputStepsSerialized(self):
+        "Make sure that the steps which need the input run one at a time"
+        counter = _ConcurrencyCounter(.05)
+        runner = SessionRunner(max_workers = 4, lock = threading.Lock())
+        for name in range(4):
+            runner.add_session(name, _App())
+            runner.add_step(name, counter, needs_input = True)
+        reports = runner.run()
+
+        self.assertEqual(1, counter.max_running)
+        self.assertEqual(4, sum(report.input_steps for report in reports.values()))
+        self.assertTrue(max(report.input_wait_time for report in reports.values()) > .1)
+
+    def testStepsInOrder(self):
+        "Make sure that the steps of a session run in order"
+        app = _App()
+        runner = SessionRunner()
+        runner.add_session('alice', app, [
+            Action('Login', 'set_edit_text', 'alice'),
+            Action(['Login', 'OK'], 'click', button = 'left'),
+            ])
+        runner.run()
+
+        self.assertEqual([('Login', 'set_edit_text', ('alice',), {}),
+                          ('Login.OK', 'click', (), {'button': 'left'})], app.calls)
+
+    def testFailedStep(self):
+        "Make sure that a failed step stops its session only"
+        def fail(app):
+            raise RuntimeError('no such control')
+
+        good_app = _App()
+        runner = SessionRunner()
+        runner.add_session('bad', _App(), [fail, Action('Login', 'click')])
+        runner.add_session('good', good_app, [Action('Login', 'click')])
+        reports = runner.run()
+
+        self.assertEqual(0, reports['bad'].failed_step)
+        self.assertTrue(isinstance(reports['bad'].error, RuntimeError))
+        self.assertEqual(0, reports['bad'].steps)
+        self.assertEqual(None, reports['good'].error)
+        self.assertEqual(1, len(good_app.calls))
+
+    def testActionNeedsInput(self):
+        "Make sure that the input actions are detected"
+        self.assertTrue(Action('Dialog', 'type_keys', 'abc').needs_input)
+        self.assertTrue(Action('Dialog', 'ClickInput').needs_input)
+        self.assertFalse(Action('Dialog', 'click').needs_input)
+        self.assertFalse(Action('Dialog', 'set_edit_text', 'abc').needs_input)
+
+    def testThroughput(self):
+        "Make sure that the throughput is reported"
+        runner = SessionRunner()
+        runner.add_session('alice', _App(), [_ConcurrencyCounter(.05)] * 4)
+        report = runner.run()['alice']
+        self.assertTrue(report.wall_time >= .2)
+        self.assertTrue(10 < report.throughput <= 20)
+
+    def testWrongSessions(self):
+        "Make sure that wrong sessions are not accepted"
+        runner = SessionRunner()
+        runner.add_session('alice', _App())
+        self.assertRaises(ValueError, runner.add_session, 'alice', _App())
+        self.assertRaises(KeyError, runner.add_step, 'bob', lambda app: None)
+        self.assertRaises(ValueError, SessionRunner, max_workers = 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,378 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"Tests for timings.py"
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.append(".")
+from pywinauto import timings
+from pywinauto.timings import Timings
+
+
+class TimingsCalibrationTests(unittest.TestCase):
+    "Unit tests for the timings calibration"
+
+    def setUp(self):
+        "Start with the default timings and an empty calibration"
+        Timings.Defaults()
+        self.calibration = timings.TimingsCalibration()
+
+    def tearDown(self):
+        "Restore the default timings"
+        Timings.Defaults()
+
+    def testNotRecordedWhenStopped(self):
+        "Make sure that nothing is recorded before start()"
+        self.calibration.record('window_find_timeout', 1.)
+        self.assertEqual({}, self.calibration.observations)
+
+    def testUnknownSetting(self):
+        "Make sure that an unknown setting can't be recorded"
+        self.calibration.start()
+        self.assertRaises(AttributeError,
+                          self.calibration.record, 'unknown_timeout', 1.)
+
+    def testSampleOutermostOnly(self):
+        "Make sure that only the outermost sampled block is recorded"
+        self.calibration.start()
+        with self.calibration.sample('window_find_timeout'):
+            with self.calibration.sample('window_find_timeout'):
+                pass
+            with self.calibration.sample('exists_timeout'):
+                pass
+        with self.calibration.sample(None):
+            with self.calibration.sample('exists_timeout'):
+                pass
+        self.assertEqual(['window_find_timeout'], list(self.calibration.observations))
+        self.assertEqual(1, len(self.calibration.observations['window_find_timeout']))
+
+    def testSampleNotRecordedOnError(self):
+        "Make sure that a failed block is not recorded"
+        self.calibration.start()
+        try:
+            with self.calibration.sample('window_find_timeout'):
+                raise ValueError()
+        except ValueError:
+            pass
+        with self.calibration.sample('exists_timeout'):
+            pass
+        self.assertEqual(['exists_timeout'], list(self.calibration.observations))
+
+    def testPercentile(self):
+        "Test the nearest-rank percentile of the observations"
+        self.calibration.start()
+        for i in range(1, 101):
+            self.calibration.record('window_find_timeout', i / 100.)
+
+        self.assertAlmostEqual(.99, self.calibration.percentile('window_find_timeout', 99))
+        self.assertAlmostEqual(.5, self.calibration.percentile('window_find_timeout', 50))
+        self.assertAlmostEqual(1., self.calibration.percentile('window_find_timeout', 100))
+
+    def testProfile(self):
+        "Test the timings derived from the observations"
+        self.calibration.start()
+        for elapsed in (.1, .2, .2, .3):
+            self.calibration.record('window_find_timeout', elapsed)
+        self.calibration.stop()
+
+        profile = self.calibration.profile(percent=99, safety_factor=2.)
+        self.assertAlmostEqual(.6, profile['window_find_timeout'])
+        self.assertAlmostEqual(.05, profile['window_find_retry'])
+        self.assertEqual(['window_find_retry', 'window_find_timeout'], sorted(profile))
+
+    def testProfileMinTimeout(self):
+        "Make sure that a proposed timeout is never lower than min_timeout"
+        self.calibration.start()
+        self.calibration.record('exists_timeout', 0.)
+
+        profile = self.calibration.profile(min_timeout=.2)
+        self.assertAlmostEqual(.2, profile['exists_timeout'])
+        self.assertTrue(profile['exists_retry'] * 2 <= profile['exists_timeout'])
+
+    def testApply(self):
+        "Make sure that apply() changes the observed timings only"
+        self.calibration.start()
+        self.calibration.record('app_start_timeout', 1.)
+        self.calibration.apply(safety_factor=3.)
+
+        self.assertAlmostEqual(3., Timings.app_start_timeout)
+        self.assertAlmostEqual(5., Timings.window_find_timeout)
+
+    def testSaveLoad(self):
+        "Make sure that timings can be saved and loaded back"
+        handle, filename = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            Timings.window_find_timeout = 1.5
+            Timings.save(filename)
+
+            Timings.Defaults()
+            self.assertAlmostEqual(5., Timings.window_find_timeout)
+
+            Timings.load(filename)
+            self.assertAlmostEqual(1.5, Timings.window_find_timeout)
+        finally:
+            os.remove(filename)
+
+
+class TimingsOverrideTests(unittest.TestCase):
+    "Unit tests for the scoped timings overrides"
+
+    def setUp(self):
+        "Start with the default timings"
+        Timings.Defaults()
+
+    def tearDown(self):
+        "Restore the default timings"
+        Timings.Defaults()
+
+    def testOverride(self):
+        "Make sure that the timings are overridden inside the block only"
+        with Timings.override(after_click_wait=0, window_find_timeout=2):
+            self.assertEqual(0, Timings.after_click_wait)
+            self.assertEqual(2, Timings.window_find_timeout)
+            self.assertAlmostEqual(.09, Timings.window_find_retry)
+        self.assertAlmostEqual(.09, Timings.after_click_wait)
+        self.assertAlmostEqual(5., Timings.window_find_timeout)
+
+    def testOverrideProfile(self):
+        "Make sure that a dictionary of timings can be used"
+        with Timings.override({'exists_timeout': 1}, exists_retry=.1):
+            self.assertEqual(1, Timings.exists_timeout)
+            self.assertEqual(.1, Timings.exists_retry)
+
+    def testNestedOverride(self):
+        "Make sure that nested blocks inherit the outer overrides"
+        with Timings.override(after_click_wait=0, exists_timeout=1):
+            with Timings.override(exists_timeout=2):
+                self.assertEqual(0, Timings.after_click_wait)
+                self.assertEqual(2, Timings.exists_timeout)
+            self.assertEqual(1, Timings.exists_timeout)
+
+    def testOverrideRestoredOnException(self):
+        "Make sure that the overrides are removed after an exception"
+        try:
+            with Timings.override(after_click_wait=1):
+                raise ValueError()
+        except ValueError:
+            pass
+        self.assertAlmostEqual(.09, Timings.after_click_wait)
+
+    def testUnknownSetting(self):
+        "Make sure that an unknown setting can't be overridden"
+        def override_unknown():
+            with Timings.override(unknown_wait=1):
+                pass
+        self.assertRaises(AttributeError, override_unknown)
+
+    def testOverridePerThread(self):
+        "Make sure that other threads don't see the overrides"
+        results = []
+        def other_thread():
+            results.append(Timings.after_click_wait)
+
+        with Timings.override(after_click_wait=3):
+            thread = threading.Thread(target=other_thread)
+            thread.start()
+            thread.join()
+            self.assertEqual(3, Timings.after_click_wait)
+        self.assertEqual(1, len(results))
+        self.assertAlmostEqual(.09, results[0])
+
+
+class DeadlineTests(unittest.TestCase):
+    "Unit tests for the deadline propagation across nested waits"
+
+    def testNoDeadline(self):
+        "Make sure that a timeout is not changed without a deadline"
+        self.assertEqual(10, timings.clip_timeout(10))
+
+    def testClipTimeout(self):
+        "Make sure that a timeout is limited by the deadline"
+        with timings.deadline(1):
+            self.assertTrue(timings.clip_timeout(10) <= 1)
+            self.assertEqual(.5, timings.clip_timeout(.5))
+        self.assertEqual(10, timings.clip_timeout(10))
+
+    def testNestedDeadlineIsShorter(self):
+        "Make sure that a nested deadline can't extend the outer one"
+        with timings.deadline(.5):
+            with timings.deadline(10):
+                self.assertTrue(timings.clip_timeout(10) <= .5)
+            with timings.deadline(.1):
+                self.assertTrue(timings.clip_timeout(10) <= .1)
+            self.assertTrue(.1 < timings.clip_timeout(10) <= .5)
+
+    def testExpiredDeadline(self):
+        "Make sure that an expired deadline gives a zero timeout"
+        with timings.deadline(0):
+            self.assertEqual(0, timings.clip_timeout(10))
+            # the function is still checked once
+            self.assertEqual(1, timings.WaitUntil(10, .01, lambda: 1, 1))
+
+    def testWaitUntilRespectsDeadline(self):
+        "Make sure that WaitUntil times out by the outer deadline"
+        start = time.time()
+        with timings.deadline(.3):
+            self.assertRaises(timings.TimeoutError,
+                              timings.WaitUntil, 10, .05, lambda: False)
+        self.assertTrue(time.time() - start < 1)
+
+    def testNestedWaitsComposition(self):
+        "Make sure that the nested waits don't multiply the timeouts"
+        def inner_check():
+            # each check waits for something that never happens
+            try:
+                timings.WaitUntilPasses(5, .05, self.__raise_value_error, ValueError)
+            except timings.TimeoutError:
+                return False
+            return True
+
+        start = time.time()
+        with timings.deadline(.5):
+            self.assertRaises(timings.TimeoutError,
+                              timings.WaitUntil, 5, .05, inner_check)
+        self.assertTrue(time.time() - start < 1.5)
+
+    def testDeadlinePerThread(self):
+        "Make sure that a deadline doesn't affect other threads"
+        results = []
+        def other_thread():
+            results.append(timings.clip_timeout(10))
+
+        with timings.deadline(.1):
+            thread = threading.Thread(target=other_thread)
+            thread.start()
+            thread.join()
+        self.assertEqual([10], results)
+
+    @staticmethod
+    def __raise_value_error():
+        raise ValueError()
+
+
+class _SimulatedTarget(object):
+    """Application processing the keys at a rate with a bounded input queue
+
+    The time is virtual: sending a burst costs a fixed overhead,
+    the wait for idle lasts until the queue is processed.
+    """
+
+    def __init__(self, rate, capacity, overhead=.005):
+        self.rate = rate
+        self.capacity = capacity
+        self.overhead = overhead
+        self.queue = 0.
+        self.clock = 0.
+        self.typed = 0
+        self.dropped = 0
+
+    def send(self, keys):
+        "Queue a burst of keys (the keys which don't fit are dropped)"
+        self.clock += self.overhead
+        self.queue = max(0., self.queue - self.overhead * self.rate) + keys
+        if self.queue > self.capacity:
+            self.dropped += int(self.queue - self.capacity)
+            self.queue = self.capacity
+        self.typed += keys
+
+    def wait_idle(self, timeout):
+        "Return the time until the queue is processed (None after the timeout)"
+        latency = self.queue / self.rate
+        if latency > timeout:
+            self.clock += timeout
+            self.queue -= timeout * self.rate
+            return None
+        self.clock += latency
+        self.queue = 0.
+        return latency
+
+    def type(self, pacer, keys, timeout=1.):
+        "Type the keys in the bursts of the pacer"
+        while keys > 0:
+            burst = min(keys, pacer.burst_size)
+            self.send(burst)
+            pacer.update(self.wait_idle(timeout))
+            keys -= burst
+
+
+class PacingControllerTests(unittest.TestCase):
+    "Unit tests for the PacingController class"
+
+    def testUpdate(self):
+        "Make sure that the bursts grow while the target keeps up"
+        pacer = timings.PacingController(initial=4, maximum=64, target_latency=.05)
+        self.assertEqual([8, 16, 32, 64, 64], [pacer.update(.01) for _ in range(5)])
+        self.assertEqual(32, pacer.update(.1))
+        self.assertEqual(16, pacer.update(None))
+        # no more doubling after a slowdown
+        self.assertEqual([17, 18], [pacer.update(.01) for _ in range(2)])
+        self.assertEqual((9, 2), (pacer.bursts, pacer.slowdowns))
+
+    def testMinimum(self):
+        "Make sure that the bursts don't shrink below the minimum"
+        pacer = timings.PacingController(initial=2, minimum=2)
+        self.assertEqual(2, pacer.update(None))
+        self.assertRaises(ValueError, timings.PacingController, initial=0)
+        self.assertRaises(ValueError, timings.PacingController, initial=10, maximum=5)
+
+    def testDefaultTargetLatency(self):
+        "Make sure that the target latency is taken from the timings"
+        pacer = timings.PacingController(initial=8)
+        with Timings.override(pacing_target_latency=.5):
+            self.assertEqual(16, pacer.update(.3))
+        self.assertEqual(8, pacer.update(.3))
+
+    def testSimulatedThroughput(self):
+        "Make sure that the adaptive bursts are faster than the single keys"
+        adaptive = _SimulatedTarget(rate=2000, capacity=200)
+        adaptive.type(timings.PacingController(target_latency=.05), 20000)
+
+        single = _SimulatedTarget(rate=2000, capacity=200)
+        single.type(timings.PacingController(initial=1, maximum=1, target_latency=.05), 20000)
+
+        self.assertEqual(0, adaptive.dropped)
+        self.assertEqual(0, single.dropped)
+        self.assertTrue(adaptive.clock * 3 < single.clock)
+        # close to the rate of the target
+        self.assertTrue(20000 / adaptive.clock > 2000 * .8)
+
+    def testSimulatedSlowdown(self):
+        "Make sure that the bursts shrink when the target becomes busy"
+        target = _SimulatedTarget(rate=5000, capacity=300)
+        pacer = timings.PacingController(maximum=1000, target_latency=.05)
+        target.type(pacer, 20000)
+        fast_burst = pacer.burst_size
+
+        target.rate = 500
+        target.type(pacer, 5000)
+        self.assertEqual(0, target.dropped)
+        self.assertTrue(pacer.burst_size < fast_burst)
+        self.assertTrue(pacer.burst_size <= 500 * .05 * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -26,6 +26,7 @@ from __future__ import unicode_literals
 # pylint:  disable-msg=W0212,F0401,R0904
 
 import os, sys
+import time
 import codecs
 import unittest
 sys.path.append(".")
@@ -491,6 +492,21 @@ class EditTestCases(unittest.TestCase):
 
         self.assertEquals(self.ctrl.TextBlock(), expected_text)
 
+    def testTypeKeysFastText(self):
+        "Test typing plain text into the edit control by a message"
+        self.ctrl.Select(0, 0)
+        added_text = "Here is some more Text"
+        with Timings.override(after_sendkeys_key_wait=1):
+            start = time.time()
+            self.ctrl.type_keys(added_text, with_spaces = True, fast_text = True)
+            self.assertTrue(time.time() - start < 1)
+        self.assertEquals(self.ctrl.TextBlock(), added_text + self.test_data)
+
+    def testTypeKeysFastTextFallback(self):
+        "Test that the keys which are not plain text are typed"
+        self.ctrl.type_keys("%{HOME}abc{ENTER}", fast_text = True)
+        self.assertEquals(self.ctrl.TextBlock(), "abc\r\n" + self.test_data)
+
     def testSelect(self):
         "Test selecting some text of the edit control"
         self.ctrl.Select(10, 50)
@@ -0,0 +1,114 @@
+# GUI Application automation and testing library
+# Copyright (C) 2015 Intel Corporation
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public License
+# as published by the Free Software Foundation; either version 2.1
+# of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+#    Free Software Foundation, Inc.,
+#    59 Temple Place,
+#    Suite 330,
+#    Boston, MA 02111-1307 USA
+
+"""Tests for the Xlib back-end of mouse.py
+
+They need an X server with the XTest extension, e.g. a local Xvfb::
+
+    xvfb-run python -m unittest pywinauto.unittests.test_xmouse
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.append(".")
+mouse = None
+if sys.platform != 'win32' and os.environ.get('DISPLAY'):
+    try:
+        from pywinauto import mouse
+        from Xlib import X
+    except ImportError:
+        pass
+
+
+@unittest.skipIf(mouse is None, "needs an X server and python-xlib")
+class XlibMouseTests(unittest.TestCase):
+    "Unit tests for the batched XTest events"
+
+    def setUp(self):
+        "Count the syncs of the display"
+        self.syncs = 0
+        self.sync = mouse._display.sync
+
+        def sync():
+            self.syncs += 1
+            self.sync()
+
+        mouse._display.sync = sync
+        self.root = mouse._display.screen().root
+
+    def tearDown(self):
+        "Restore the sync of the display"
+        mouse._display.sync = self.sync
+
+    def pointer(self):
+        "Return the position and the buttons mask of the pointer"
+        reply = self.root.query_pointer()
+        return (reply.root_x, reply.root_y), reply.mask
+
+    def testMove(self):
+        "Make sure that a move is sent with one sync"
+        mouse.move((10, 20))
+        self.assertEqual(((10, 20), 0), self.pointer())
+        self.assertEqual(1, self.syncs)
+
+    def testPressRelease(self):
+        "Make sure that the button state is changed"
+        mouse.press(coords=(30, 40))
+        self.assertTrue(self.pointer()[1] & X.Button1Mask)
+        mouse.release(coords=(50, 60))
+        self.assertEqual(((50, 60), 0), self.pointer())
+        self.assertEqual(2, self.syncs)
+
+    def testScroll(self):
+        "Make sure that all the notches of a wheel are sent with one sync"
+        mouse.scroll((5, 5), 20)
+        mouse.scroll((5, 5), -20)
+        self.assertEqual(2, self.syncs)
+        self.assertEqual(((5, 5), 0), self.pointer())
+
+    def testBatch(self):
+        "Make sure that the actions of a batch are sent with one sync"
+        with mouse.batch():
+            for x in range(10):
+                mouse.click(coords=(x, x))
+            with mouse.batch():
+                mouse.scroll((70, 80), 3)
+            self.assertEqual(0, self.syncs)
+        self.assertEqual(1, self.syncs)
+        self.assertEqual(((70, 80), 0), self.pointer())
+
+    def testPath(self):
+        "Make sure that a path is sent with one sync"
+        mouse.move_path(mouse.path((0, 0), (100, 50), steps=20))
+        self.assertEqual(((100, 50), 0), self.pointer())
+        mouse.drag('left', mouse.path((100, 50), (10, 10), steps=20))
+        self.assertEqual(((10, 10), 0), self.pointer())
+        self.assertEqual(2, self.syncs)
+
+    def testDragUnsupportedButton(self):
+        "Make sure that a drag by a button which can't be held is not sent"
+        self.assertRaises(ValueError, mouse.drag, 'x', [(0, 0), (10, 10)])
+        self.assertEqual(0, self.syncs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -844,6 +844,10 @@ PSM_SETFINISHTEXTA = 1139 # Variable c_int
 PROP_SM_CXDLG = 212 # Variable c_int
 MCI_SET_ON = 8192 # Variable c_long
 SM_CXSCREEN = 0 # Variable c_int
+SM_XVIRTUALSCREEN = 76 # Variable c_int
+SM_YVIRTUALSCREEN = 77 # Variable c_int
+SM_CXVIRTUALSCREEN = 78 # Variable c_int
+SM_CYVIRTUALSCREEN = 79 # Variable c_int
 FS_LATIN1 = 1 # Variable c_long
 MK_S_ME = 262628 # Variable c_long
 HTSYSMENU = 3 # Variable c_int
@@ -3178,6 +3182,7 @@ OLE_E_WRONGCOMPOBJ = -2147221490 # Variable c_long
 DPD_DELETE_SPECIFIC_VERSION = 2 # Variable c_int
 DV_E_NOIVIEWOBJECT = -2147221395 # Variable c_long
 PROCESS_QUERY_INFORMATION = 1024 # Variable c_int
+PROCESS_QUERY_LIMITED_INFORMATION = 4096 # Windows Vista
 LVM_GETNUMBEROFWORKAREAS = 4169 # Variable c_int
 SERVICE_CONTROL_STOP = 1 # Variable c_int
 OLE_E_NOT_INPLACEACTIVE = -2147221488 # Variable c_long
@@ -9393,6 +9398,7 @@ ERROR_GLOBAL_ONLY_HOOK = 1429 # Variable c_long
 ERROR_BADDB = 1009 # Variable c_long
 WM_DESTROYCLIPBOARD = 775 # Variable c_int
 MOUSEEVENTF_ABSOLUTE = 32768 # Variable c_int
+MOUSEEVENTF_VIRTUALDESK = 16384 # Variable c_int
 MIXERLINE_COMPONENTTYPE_DST_LINE = 2 # Variable c_long
 ERROR_DS_NOT_INSTALLED = 1251 # Variable c_long
 REG_RESOURCE_LIST = 8 # Variable c_int
@@ -266,52 +266,49 @@ def LoWord(value):
     return value & 0xFFFF
 
 #====================================================================
-def WaitGuiThreadIdle(handle):
-    """Wait until the thread of the specified handle is ready"""
-    from . import win32defines
-
-    process_id = ctypes.c_int()
-    GetWindowThreadProcessId(handle, ctypes.byref(process_id))
+def WaitGuiThreadIdle(handle, timeout = None):
+    """Wait until the thread of the specified handle is ready
 
-    # ask the control if it has finished processing the message
-    hprocess = OpenProcess(
-        win32defines.PROCESS_QUERY_INFORMATION,
-        0,
-        process_id.value)
+    If **timeout** (seconds) is specified, wait until the thread
+    processes the queued messages. Return False if it doesn't
+    process them in time.
+    """
+    from . import win32defines
 
     # WaitForInputIdle call is removed because it's useful only
-    # while an app is starting (should be called only once)
+    # while an app is starting (should be called only once),
+    # so no process handle is needed any more
     if IsHungAppWindow(handle) == win32defines.TRUE:
         raise RuntimeError('Window (hwnd={0}) is not responding!'.format(handle))
 
-    CloseHandle(hprocess)
+    if timeout is None:
+        return True
+
+    # WM_NULL is answered as soon as the thread retrieves its messages
+    result = ctypes.c_size_t()
+    return bool(SendMessageTimeout(handle, win32defines.WM_NULL, 0, 0,
+                                   win32defines.SMTO_ABORTIFHUNG,
+                                   int(timeout * 1000), ctypes.byref(result)))
 
 #====================================================================
 def GetDpiAwarenessByPid(pid):
     """Get DPI awareness properties of a process specified by ID"""
         
+    from . import processhandles
+
     dpi_awareness = -1
-    hProcess = None
     if GetProcessDpiAwareness and pid:
-        hProcess = OpenProcess(
-                    win32defines.PROCESS_QUERY_INFORMATION, 
-                    0, 
-                    pid)
-        if not hProcess:
-            # process doesn't exist, exit with a default return value
-            return dpi_awareness
-
-        try:
-            dpi_awareness = ctypes.c_int()
+        with processhandles.query_handle(pid) as hProcess:
+            if not hProcess:
+                # process doesn't exist, exit with a default return value
+                return dpi_awareness
+
+            process_awareness = ctypes.c_int()
             hRes = GetProcessDpiAwareness(
                     hProcess, 
-                    ctypes.byref(dpi_awareness))
-            CloseHandle(hProcess)
+                    ctypes.byref(process_awareness))
             if hRes == 0:
-                return dpi_awareness.value
-        finally:
-            if hProcess:
-                CloseHandle(hProcess)
+                return process_awareness.value
 
     # GetProcessDpiAwareness is not supported or pid is not specified,
     # return a default value
@@ -58,6 +58,10 @@ try:
 except ImportError:
     requirements = ["pypiwin32"]
 
+if sys.version_info < (2, 7):
+    # collections.OrderedDict is used by pywinauto.cacheutils
+    requirements.append("ordereddict")
+
 # make sure the documentation is in the correct place for building
 # todo: see how to build the website
 #if "sdist" in sys.argv: